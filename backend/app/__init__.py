@@ -1,9 +1,12 @@
-from flask import Flask
+from flask import Flask, jsonify
 from flask_cors import CORS
 from pymongo import MongoClient
 from flask_bcrypt import Bcrypt
 import os
+import tempfile
 from dotenv import load_dotenv
+from app.utils.upload_pipeline import UploadRequest
+from werkzeug.exceptions import RequestEntityTooLarge
 
 # Initialize extensions
 bcrypt = Bcrypt()
@@ -15,6 +18,8 @@ def create_app():
     load_dotenv()
 
     app = Flask(__name__)
+    # Uploads are hashed as they are spooled, so they are read only once
+    app.request_class = UploadRequest
     
     # Configure CORS
     CORS(app, 
@@ -26,6 +31,42 @@ def create_app():
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY')
     app.config['MONGO_URI'] = os.getenv('MONGO_URI')
     app.config['UPLOAD_FOLDER'] = 'uploads'
+    app.config['UPLOAD_SPOOL_MEMORY'] = int(os.getenv('UPLOAD_SPOOL_MEMORY', 1024 * 1024))
+    # Larger request bodies are refused with a 413 before they are read
+    app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('UPLOAD_MAX_MB', 10)) * 1024 * 1024
+    app.config['PDF_MAX_PAGES'] = int(os.getenv('PDF_MAX_PAGES', 50))
+    app.config['EXTRACT_MAX_PAGES'] = int(os.getenv('EXTRACT_MAX_PAGES', 20))
+    app.config['PDF_EXTRACT_WORKERS'] = int(os.getenv('PDF_EXTRACT_WORKERS', os.cpu_count() or 1))
+    app.config['PDF_EXTRACT_PARALLEL_MIN_PAGES'] = int(os.getenv('PDF_EXTRACT_PARALLEL_MIN_PAGES', 8))
+    # /extract/batch: whole request body, and files per batch (ZIP members included)
+    app.config['EXTRACT_BATCH_MAX_MB'] = int(os.getenv('EXTRACT_BATCH_MAX_MB', 200))
+    app.config['EXTRACT_BATCH_MAX_FILES'] = int(os.getenv('EXTRACT_BATCH_MAX_FILES', 200))
+    # extracted_texts records expire this long after their last use
+    app.config['EXTRACTED_TEXT_TTL_DAYS'] = int(os.getenv('EXTRACTED_TEXT_TTL_DAYS', 7))
+    # LLM response cache: in-process entries, and per-route TTL overrides ("route=seconds;...")
+    app.config['LLM_CACHE_MEMORY_ENTRIES'] = int(os.getenv('LLM_CACHE_MEMORY_ENTRIES', 1024))
+    app.config['LLM_CACHE_TTLS'] = os.getenv('LLM_CACHE_TTLS', '')
+    # Prompt token budgets per LLM route ("route=tokens;..."), over the defaults in prompt_budget
+    app.config['PROMPT_TOKEN_BUDGETS'] = os.getenv('PROMPT_TOKEN_BUDGETS', '')
+    # Identical in-flight LLM requests share one call; lock files coordinate worker processes
+    app.config['LLM_LOCK_DIR'] = os.getenv('LLM_LOCK_DIR', os.path.join(tempfile.gettempdir(), 'resume-llm-locks'))
+    app.config['LLM_SINGLE_FLIGHT_WAIT'] = float(os.getenv('LLM_SINGLE_FLIGHT_WAIT', 120))
+    app.config['PDF_POOL_SIZE'] = int(os.getenv('PDF_POOL_SIZE', 2))
+    app.config['PDF_POOL_MAX_RENDERS'] = int(os.getenv('PDF_POOL_MAX_RENDERS', 100))
+    app.config['PDF_RENDER_TIMEOUT'] = float(os.getenv('PDF_RENDER_TIMEOUT', 60))
+    app.config['PDF_CACHE_DIR'] = os.getenv('PDF_CACHE_DIR', 'pdf_cache')
+    app.config['PDF_CACHE_MEMORY_MB'] = int(os.getenv('PDF_CACHE_MEMORY_MB', 64))
+    app.config['PDF_CACHE_DISK_MB'] = int(os.getenv('PDF_CACHE_DISK_MB', 512))
+    app.config['PDF_JOB_WORKERS'] = int(os.getenv('PDF_JOB_WORKERS', 2))
+    app.config['PDF_JOB_QUEUE_DEPTH'] = int(os.getenv('PDF_JOB_QUEUE_DEPTH', 50))
+    app.config['PDF_JOB_RESULT_TTL'] = int(os.getenv('PDF_JOB_RESULT_TTL', 300))
+    # Finished job PDFs are held in memory per process; the oldest go first past this
+    app.config['PDF_JOB_RESULTS_MB'] = int(os.getenv('PDF_JOB_RESULTS_MB', 128))
+    app.config['PDF_BATCH_CONCURRENCY'] = int(os.getenv('PDF_BATCH_CONCURRENCY', 4))
+    app.config['PDF_ASSET_CACHE_DIR'] = os.getenv('PDF_ASSET_CACHE_DIR', 'asset_cache')
+    app.config['PDF_ASSET_FETCH'] = os.getenv('PDF_ASSET_FETCH', 'false').lower() == 'true'
+    app.config['WKHTMLTOPDF_PATH'] = os.getenv('WKHTMLTOPDF_PATH')
+    app.config['PDF_TEMPLATE_BACKENDS'] = os.getenv('PDF_TEMPLATE_BACKENDS', '')
     
     # Ensure upload folder exists
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -42,6 +83,12 @@ def create_app():
     # Initialize bcrypt
     bcrypt.init_app(app)
 
+    # Load PDF template stylesheets and compile resume HTML templates once
+    from app.utils.template_registry import load_template_styles
+    from app.utils.resume_html import load_resume_templates
+    load_template_styles()
+    load_resume_templates()
+
     # Register blueprints
     from app.routes.auth_routes import auth_bp
     from app.routes.resume_routes import resume_bp
@@ -67,4 +114,9 @@ def create_app():
 
         return response
 
+    # Oversized bodies (MAX_CONTENT_LENGTH) and documents (page limits) alike
+    @app.errorhandler(RequestEntityTooLarge)
+    def upload_too_large(e):
+        return jsonify({"error": e.description}), 413
+
     return app
@@ -0,0 +1,86 @@
+import zlib
+
+from bson import Binary
+from flask import current_app
+from pymongo.errors import OperationFailure
+
+from datetime import datetime, timedelta
+
+_indexes_ready = False
+
+
+class ExtractedText:
+    """Plain text of an uploaded document, stored once per file hash.
+
+    Saved uploads (``file_id``) are attached to the record, so later steps
+    of the analysis flow can refer to the text by either id. Records expire
+    ``EXTRACTED_TEXT_TTL_DAYS`` after their last use (TTL index on
+    ``expires_at``); the permanent layout in ``resume_layouts`` can always
+    rebuild them.
+    """
+
+    @staticmethod
+    def _expires_at():
+        return datetime.utcnow() + timedelta(days=current_app.config['EXTRACTED_TEXT_TTL_DAYS'])
+
+    @staticmethod
+    def ensure_indexes():
+        global _indexes_ready
+        if _indexes_ready:
+            return
+        collection = current_app.db.extracted_texts
+        collection.create_index("file_ids")
+        try:
+            collection.create_index("expires_at", expireAfterSeconds=0)
+        except OperationFailure:
+            # Index from an older definition; bring it in line
+            current_app.db.command(
+                "collMod", "extracted_texts",
+                index={"keyPattern": {"expires_at": 1}, "expireAfterSeconds": 0}
+            )
+        _indexes_ready = True
+
+    @staticmethod
+    def get_text(file_hash=None, file_id=None):
+        """``{"resume_hash", "text", "summary"}`` by hash or saved file id, or ``None``.
+
+        A hit pushes the record's expiry back.
+        """
+        if not file_hash and not file_id:
+            return None
+        record = current_app.db.extracted_texts.find_one_and_update(
+            {"_id": file_hash} if file_hash else {"file_ids": file_id},
+            {"$set": {"expires_at": ExtractedText._expires_at()}},
+            projection={"text": 1, "summary": 1}
+        )
+        if not record:
+            return None
+        return {
+            "resume_hash": record["_id"],
+            "text": zlib.decompress(record["text"]).decode("utf-8"),
+            "summary": record.get("summary")
+        }
+
+    @staticmethod
+    def save_text(file_hash, text, summary, file_id=None):
+        ExtractedText.ensure_indexes()
+        update = {
+            # Identical bytes give identical text: first writer wins
+            "$setOnInsert": {
+                "text": Binary(zlib.compress(text.encode("utf-8"))),
+                "summary": summary,
+                "chars": len(text),
+                "created_at": datetime.utcnow()
+            },
+            "$set": {"expires_at": ExtractedText._expires_at()}
+        }
+        if file_id:
+            update["$addToSet"] = {"file_ids": file_id}
+        return current_app.db.extracted_texts.update_one({"_id": file_hash}, update, upsert=True)
+
+    @staticmethod
+    def add_file_id(file_hash, file_id):
+        return current_app.db.extracted_texts.update_one(
+            {"_id": file_hash},
+            {"$addToSet": {"file_ids": file_id}}
+        )
@@ -15,8 +15,12 @@ class Resume:
         })
 
     @staticmethod
-    def get_resumes_by_user(user_id):
-        return current_app.db.resumes.find({"user_id": str(user_id)})
+    def get_resumes_by_user(user_id, projection=None):
+        return current_app.db.resumes.find({"user_id": str(user_id)}, projection)
+
+    @staticmethod
+    def get_resume_by_id(resume_id):
+        return current_app.db.resumes.find_one({"_id": ObjectId(resume_id)})
 
     @staticmethod
     def update_resume_title(resume_id, title):
@@ -0,0 +1,45 @@
+import json
+import zlib
+
+from bson import Binary
+from flask import current_app
+from pymongo.errors import DuplicateKeyError
+
+from datetime import datetime
+
+class ResumeLayout:
+    """Line-level layout of an uploaded document, stored once per file hash.
+
+    The columnar record is kept as zlib-compressed JSON; a typical resume
+    compresses to a few KB.
+    """
+
+    @staticmethod
+    def get_layout(file_hash):
+        record = current_app.db.resume_layouts.find_one({"_id": file_hash})
+        if not record:
+            return None
+        return json.loads(zlib.decompress(record["data"]))
+
+    @staticmethod
+    def save_layout(file_hash, layout):
+        data = zlib.compress(json.dumps(layout, separators=(",", ":")).encode("utf-8"))
+        version = layout.get("version")
+        try:
+            # Identical bytes give an identical layout: first writer of a version wins,
+            # and a record from an older extractor is replaced
+            return current_app.db.resume_layouts.update_one(
+                {"_id": file_hash, "version": {"$ne": version}},
+                {
+                    "$set": {
+                        "data": Binary(data),
+                        "version": version,
+                        "lines": len(layout["text"]),
+                        "created_at": datetime.utcnow()
+                    }
+                },
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Already stored at this version
+            return None
@@ -1,19 +1,30 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 from flask import current_app
-from app.utils.ai_helpers import client
-import json
+from app.utils.llm_gateway import get_llm_gateway
+from app.utils.llm_streaming import sse_event
+from app.utils.prompt_budget import Section, fit_prompt
 import re
-import ast
 import hashlib
 import os
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from io import BytesIO
 
-from app.utils.file_utils import extract_text, extract_json_from_response
+from app.utils.file_utils import extract_json_from_response
+from app.utils.layout_extraction import get_resume_text, stored_resume_text
+from app.models.extracted_text import ExtractedText
 from app.utils.scoring import calculate_overall_score
+from app.utils.upload_pipeline import upload_sha256, save_upload
 
 analysis_bp = Blueprint('analysis', __name__)
 
+# Completion tokens per call; the prompt budget leaves room for them
+ANALYSIS_MAX_TOKENS = 2000
+KEYWORD_GAPS_MAX_TOKENS = 1500
+QUESTIONS_MAX_TOKENS = 800
+
 
 def normalize_text(text):
     if not text:
@@ -53,59 +64,37 @@ def extract_keywords_from_text(text):
 
 # A helper function to hash file content
 def hash_file(file_storage):
-    hasher = hashlib.sha256()
-    file_storage.seek(0)
-    buf = file_storage.read(65536)
-    while len(buf) > 0:
-        hasher.update(buf)
-        buf = file_storage.read(65536)
-    file_storage.seek(0)
-    return hasher.hexdigest()
+    # Computed while the upload was spooled, no extra read
+    return upload_sha256(file_storage)
+
+def resume_text_from_upload(resume_file):
+    # Stored per file hash (extracted_texts), so re-analyses and later steps skip parsing
+    _, text = get_resume_text(resume_file)
+    return text
+
+def resume_text_from_request(data):
+    """``resume_text`` from the body, or the stored text of ``resume_hash`` / ``file_id``."""
+    if data.get('resume_text'):
+        return data['resume_text']
+    if data.get('resume_hash') or data.get('file_id'):
+        return stored_resume_text(data.get('resume_hash'), data.get('file_id'))
+    return None
 
 # A helper function to hash text
 def hash_text(text):
     return hashlib.sha256(text.encode('utf-8')).hexdigest()
 
 
-@analysis_bp.route("/analyze_resume", methods=["POST"])
-def analyze_resume_route():
-    """Analyze resume with or without job description"""
-    if 'resume_file' not in request.files:
-        return jsonify({"error": "Resume file is required."}), 400
-        
-    resume_file = request.files['resume_file']
-    jd_text = request.form.get('jd_text', '')
-    
-    old_score_from_form = request.form.get('old_score', type=int)
-
-    db = current_app.db
-    analyses_collection = db.analyses
+def analysis_prompt(resume_text, jd_text, old_score=None):
+    """Scoring prompt for a resume against a JD; ``None`` with neither a JD nor a previous score."""
+    json_structure = """{"overall_score": 0, "summary": "<string>", "analysis_breakdown": {"tailoring": { "score": <number>, "feedback": "<string>", "details": [{"criterion": "Hard Skills Match", "passed": <boolean>, "comment": "<string>"}, {"criterion": "Soft Skills Match", "passed": <boolean>, "comment": "<string>"}] }, "format": { "score": <number>, "feedback": "<string>", "details": [{"criterion": "File Format & Size", "passed": <boolean>, "comment": "<string>"}, {"criterion": "Resume Length", "passed": <boolean>, "comment": "<string>"}, 
+    {"criterion": "Concise Bullet Points", "passed": <boolean>, "comment": "<string>"}] }, "content": { "score": <number>, "feedback": "<string>", "details": [{"criterion": "ATS Parse Rate", "passed": <boolean>, "comment": "<string>"}, {"criterion": "Quantified Impact", "passed": <boolean>, "comment": "<string>"}, {"criterion": "Language Repetition", "passed": <boolean>, "comment": "<string>"}, {"criterion": "Spelling & Grammar", "passed": <boolean>, "comment": "<string>"}] }, "sections": { "score": <number>, "feedback": "<string>",
+      "details": [{"criterion": "Contact Information", "passed": <boolean>, "comment": "<string>"}, {"criterion": "Essential Sections", "passed": <boolean>, "comment": "<string>"}, {"criterion": "Personality Statement", "passed": <boolean>, "comment": "<string>"}, {"criterion": "EXPERIENCE", "passed": <boolean>, "comment": "<string>"}] }, "style": { "score": <number>, "feedback": "<string>", "details": [{"criterion": "Design Consistency", "passed": <boolean>, "comment": "<string>"}, {"criterion": "Professional Email", "passed": <boolean>, "comment": "<string>"}, 
+      {"criterion": "Active Voice", "passed": <boolean>, "comment": "<string>"}, {"criterion": "Avoids Buzzwords & Clichés", "passed": <boolean>, "comment": "<string>"}] }}}"""
     
-    current_resume_hash = hash_file(resume_file)
-    normalized_jd = normalize_text(jd_text)
-    jd_hash = hash_text(normalized_jd)
-    
-    existing_record = analyses_collection.find_one({
-        "resume_hash": current_resume_hash, 
-        "jd_hash": jd_hash
-    })
-
-    if existing_record:
-        analysis_to_return = existing_record['latest_analysis'].copy()
-        analysis_to_return['parsed_resume_text'] = extract_text(resume_file)
-        analysis_to_return['file_id'] = existing_record.get('file_id') 
-        return jsonify(analysis_to_return)
-
-    else:
-        json_structure = """{"overall_score": 0, "summary": "<string>", "analysis_breakdown": {"tailoring": { "score": <number>, "feedback": "<string>", "details": [{"criterion": "Hard Skills Match", "passed": <boolean>, "comment": "<string>"}, {"criterion": "Soft Skills Match", "passed": <boolean>, "comment": "<string>"}] }, "format": { "score": <number>, "feedback": "<string>", "details": [{"criterion": "File Format & Size", "passed": <boolean>, "comment": "<string>"}, {"criterion": "Resume Length", "passed": <boolean>, "comment": "<string>"}, 
-        {"criterion": "Concise Bullet Points", "passed": <boolean>, "comment": "<string>"}] }, "content": { "score": <number>, "feedback": "<string>", "details": [{"criterion": "ATS Parse Rate", "passed": <boolean>, "comment": "<string>"}, {"criterion": "Quantified Impact", "passed": <boolean>, "comment": "<string>"}, {"criterion": "Language Repetition", "passed": <boolean>, "comment": "<string>"}, {"criterion": "Spelling & Grammar", "passed": <boolean>, "comment": "<string>"}] }, "sections": { "score": <number>, "feedback": "<string>",
-          "details": [{"criterion": "Contact Information", "passed": <boolean>, "comment": "<string>"}, {"criterion": "Essential Sections", "passed": <boolean>, "comment": "<string>"}, {"criterion": "Personality Statement", "passed": <boolean>, "comment": "<string>"}, {"criterion": "EXPERIENCE", "passed": <boolean>, "comment": "<string>"}] }, "style": { "score": <number>, "feedback": "<string>", "details": [{"criterion": "Design Consistency", "passed": <boolean>, "comment": "<string>"}, {"criterion": "Professional Email", "passed": <boolean>, "comment": "<string>"}, 
-          {"criterion": "Active Voice", "passed": <boolean>, "comment": "<string>"}, {"criterion": "Avoids Buzzwords & Clichés", "passed": <boolean>, "comment": "<string>"}] }}}"""
-        
-        resume_text = extract_text(resume_file)
-        
-        # Improved prompt for more consistent and accurate analysis
-        base_prompt = f"""
+    # Improved prompt for more consistent and accurate analysis
+    def build(jd_text, resume_text):
+        return f"""
 You are an expert ATS (Applicant Tracking System) Resume Analyzer. You must provide ACCURATE, CONSISTENT analysis that matches exactly with the content you analyze.
 
 CRITICAL REQUIREMENTS:
@@ -162,62 +151,126 @@ Job Description:
 {jd_text}
 
 Resume Content:
-{resume_text[:15000]}
+{resume_text}
 
 IMPORTANT: Analyze the COMPLETE resume content. Your analysis and scores must be factually accurate and consistent.
 """
 
-        if old_score_from_form is not None:
-            prompt = f"""
-This is a RE-EVALUATION. Previous score was {old_score_from_form}/100.
+    base_prompt = fit_prompt(
+        "analyze_resume", build, max_tokens=ANALYSIS_MAX_TOKENS,
+        jd_text=Section(jd_text, priority=1, min_tokens=500, boilerplate=True),
+        resume_text=Section(resume_text, priority=2, min_tokens=1500)
+    )
+
+    if old_score is not None:
+        prompt = f"""
+This is a RE-EVALUATION. Previous score was {old_score}/100.
 Focus on improvements made, especially in tailoring and content alignment.
 
 {base_prompt}
 """
-        elif jd_text:
-            prompt = base_prompt
-        else:
+    elif jd_text:
+        prompt = base_prompt
+    else:
+        return None
+    return prompt
+
+
+def score_resume(prompt):
+    """Run the scoring prompt; the analysis dict with its weighted ``overall_score``."""
+    response_text = get_llm_gateway().complete(
+        "analyze_resume",
+        [{"role": "user", "content": prompt}],
+        temperature=0.1,
+        max_tokens=ANALYSIS_MAX_TOKENS
+    )
+    result_dict = extract_json_from_response(response_text)
+
+    # Calculate overall score from category scores with proper weighting
+    result_dict['overall_score'] = calculate_overall_score(result_dict)
+    return result_dict
+
+
+def save_resume_upload(resume_file, resume_hash):
+    """Keep the uploaded file for /optimize_resume; returns its ``file_id``."""
+    filename = secure_filename(resume_file.filename)
+    file_id = f"{uuid.uuid4()}{os.path.splitext(filename)[1]}"
+    save_upload(resume_file, os.path.join(current_app.config['UPLOAD_FOLDER'], file_id))
+    # Lets /get_keyword_gaps, /generate_questions and /optimize_resume take the file_id
+    ExtractedText.add_file_id(resume_hash, file_id)
+    return file_id
+
+
+def record_analysis(resume_hash, jd_hash, result_dict, file_id, old_score=None):
+    new_score = result_dict['overall_score']
+    update_operation = {
+        '$set': {
+            "resume_hash": resume_hash,
+            "jd_hash": jd_hash,
+            "latest_score": new_score,
+            "latest_analysis": result_dict,
+            "file_id": file_id
+        },
+        '$push': { "score_history": new_score }
+    }
+    
+    initial_score_to_set = old_score if old_score is not None else new_score
+    update_operation['$setOnInsert'] = {'initial_score': initial_score_to_set}
+    
+    current_app.db.analyses.update_one(
+        {"resume_hash": resume_hash, "jd_hash": jd_hash},
+        update_operation,
+        upsert=True
+    )
+
+
+@analysis_bp.route("/analyze_resume", methods=["POST"])
+def analyze_resume_route():
+    """Analyze resume with or without job description"""
+    if 'resume_file' not in request.files:
+        return jsonify({"error": "Resume file is required."}), 400
+        
+    resume_file = request.files['resume_file']
+    jd_text = request.form.get('jd_text', '')
+    
+    old_score_from_form = request.form.get('old_score', type=int)
+
+    db = current_app.db
+    analyses_collection = db.analyses
+    
+    current_resume_hash = hash_file(resume_file)
+    normalized_jd = normalize_text(jd_text)
+    jd_hash = hash_text(normalized_jd)
+    
+    existing_record = analyses_collection.find_one({
+        "resume_hash": current_resume_hash, 
+        "jd_hash": jd_hash
+    })
+
+    if existing_record:
+        analysis_to_return = existing_record['latest_analysis'].copy()
+        # Older records carry their own copy of the text
+        resume_text = existing_record.get('parsed_resume_text') or resume_text_from_upload(resume_file)
+        analysis_to_return['parsed_resume_text'] = resume_text
+        analysis_to_return['resume_hash'] = current_resume_hash
+        analysis_to_return['file_id'] = existing_record.get('file_id') 
+        return jsonify(analysis_to_return)
+
+    else:
+        # Parsed once per file; another JD for the same resume reuses the stored text
+        resume_text = resume_text_from_upload(resume_file)
+        
+        prompt = analysis_prompt(resume_text, jd_text, old_score_from_form)
+        if prompt is None:
             return jsonify({"error": "Job description is required for analysis"}), 400
         
         try:
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo", 
-                messages=[{"role": "user", "content": prompt}], 
-                temperature=0.1,
-                max_tokens=2000
-            )
-            result_dict = extract_json_from_response(response.choices[0].message.content)
-
-            # Calculate overall score from category scores with proper weighting
-            result_dict['overall_score'] = calculate_overall_score(result_dict)
-            new_score = result_dict['overall_score']
-            
-            resume_file.seek(0)
-            filename = secure_filename(resume_file.filename)
-            file_id = f"{uuid.uuid4()}{os.path.splitext(filename)[1]}"
-            resume_file.save(os.path.join(current_app.config['UPLOAD_FOLDER'], file_id))
-
-            update_operation = {
-                '$set': {
-                    "resume_hash": current_resume_hash,
-                    "jd_hash": jd_hash,
-                    "latest_score": new_score,
-                    "latest_analysis": result_dict,
-                    "file_id": file_id
-                },
-                '$push': { "score_history": new_score }
-            }
-            
-            initial_score_to_set = old_score_from_form if old_score_from_form is not None else new_score
-            update_operation['$setOnInsert'] = {'initial_score': initial_score_to_set}
-            
-            analyses_collection.update_one(
-                {"resume_hash": current_resume_hash, "jd_hash": jd_hash},
-                update_operation,
-                upsert=True
-            )
+            result_dict = score_resume(prompt)
+            file_id = save_resume_upload(resume_file, current_resume_hash)
+            record_analysis(current_resume_hash, jd_hash, result_dict, file_id, old_score_from_form)
 
             result_dict['parsed_resume_text'] = resume_text
+            result_dict['resume_hash'] = current_resume_hash
             result_dict['file_id'] = file_id 
             return jsonify(result_dict)
         except Exception as e:
@@ -225,21 +278,14 @@ Focus on improvements made, especially in tailoring and content alignment.
             return jsonify({"error": f"AI analysis failed. Please check the logs."}), 500
 
 
-@analysis_bp.route("/get_keyword_gaps", methods=["POST"])
-def get_keyword_gaps():
-    """Identify missing and matched keywords between resume and JD with improved accuracy"""
-    data = request.get_json()
-    jd_text = data.get('jd_text')
-    resume_text = data.get('resume_text')
-    
-    if not jd_text or not resume_text:
-        return jsonify({"error": "JD and Resume text required."}), 400
-
+def keyword_gaps(jd_text, resume_text):
+    """Missing and matched keywords between a resume and a JD, cross-checked locally."""
     # Pre-process texts for better matching
     resume_keywords = extract_keywords_from_text(resume_text)
     jd_keywords = extract_keywords_from_text(jd_text)
 
-    prompt = f"""
+    def build(jd_text, resume_text):
+        return f"""
 You are an expert ATS keyword analyzer. Perform ACCURATE keyword matching between the resume and job description.
 
 ANALYSIS RULES:
@@ -272,57 +318,69 @@ Resume Text:
 
 CRITICAL: Double-check your matching. If a skill appears in both texts, it MUST be in present_keywords, NOT missing_keywords.
 """
+
+    # The local keyword check above still sees the whole texts
+    prompt = fit_prompt(
+        "get_keyword_gaps", build, max_tokens=KEYWORD_GAPS_MAX_TOKENS,
+        jd_text=Section(jd_text, priority=1, min_tokens=500, boilerplate=True),
+        resume_text=Section(resume_text, priority=2, min_tokens=1000)
+    )
     
-    try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.1,
-            max_tokens=1500
-        )
-        response_text = response.choices[0].message.content
-        result_dict = extract_json_from_response(response_text)
+    response_text = get_llm_gateway().complete(
+        "get_keyword_gaps",
+        [{"role": "user", "content": prompt}],
+        temperature=0.1,
+        max_tokens=KEYWORD_GAPS_MAX_TOKENS
+    )
+    result_dict = extract_json_from_response(response_text)
+    
+    # Post-process to ensure accuracy - cross-check with our keyword extraction
+    if 'missing_keywords' in result_dict and 'present_keywords' in result_dict:
+        # Verify matching using our pre-processed keywords
+        verified_missing = []
+        verified_present = []
         
-        # Post-process to ensure accuracy - cross-check with our keyword extraction
-        if 'missing_keywords' in result_dict and 'present_keywords' in result_dict:
-            # Verify matching using our pre-processed keywords
-            verified_missing = []
-            verified_present = []
-            
-            for keyword in result_dict.get('missing_keywords', []):
-                keyword_lower = normalize_text(keyword)
-                # Check if keyword actually exists in resume
-                found_in_resume = any(keyword_lower in resume_kw for resume_kw in resume_keywords)
-                if not found_in_resume:
-                    verified_missing.append(keyword)
-                else:
-                    verified_present.append(keyword)
-            
-            for keyword in result_dict.get('present_keywords', []):
-                keyword_lower = normalize_text(keyword)
-                found_in_resume = any(keyword_lower in resume_kw for resume_kw in resume_keywords)
-                if found_in_resume and keyword not in verified_present:
-                    verified_present.append(keyword)
-            
-            result_dict['missing_keywords'] = verified_missing
-            result_dict['present_keywords'] = verified_present
+        for keyword in result_dict.get('missing_keywords', []):
+            keyword_lower = normalize_text(keyword)
+            # Check if keyword actually exists in resume
+            found_in_resume = any(keyword_lower in resume_kw for resume_kw in resume_keywords)
+            if not found_in_resume:
+                verified_missing.append(keyword)
+            else:
+                verified_present.append(keyword)
         
-        return jsonify(result_dict)
-    except Exception as e:
-        return jsonify({"error": f"Keyword analysis failed: {str(e)}"}), 500
+        for keyword in result_dict.get('present_keywords', []):
+            keyword_lower = normalize_text(keyword)
+            found_in_resume = any(keyword_lower in resume_kw for resume_kw in resume_keywords)
+            if found_in_resume and keyword not in verified_present:
+                verified_present.append(keyword)
+        
+        result_dict['missing_keywords'] = verified_missing
+        result_dict['present_keywords'] = verified_present
+    
+    return result_dict
 
 
-@analysis_bp.route("/generate_questions", methods=["POST"])
-def generate_questions_route():
-    """Generate targeted questions to fill resume gaps with example answers"""
+@analysis_bp.route("/get_keyword_gaps", methods=["POST"])
+def get_keyword_gaps():
+    """Identify missing and matched keywords between resume and JD with improved accuracy"""
     data = request.get_json()
     jd_text = data.get('jd_text')
-    resume_text = data.get('resume_text')
+    resume_text = resume_text_from_request(data)
     
     if not jd_text or not resume_text:
         return jsonify({"error": "JD and Resume text required."}), 400
-        
-    prompt = f"""
+
+    try:
+        return jsonify(keyword_gaps(jd_text, resume_text))
+    except Exception as e:
+        return jsonify({"error": f"Keyword analysis failed: {str(e)}"}), 500
+
+
+def interview_questions(jd_text, resume_text):
+    """Questions (with example answers) that would close the resume's gaps for a JD."""
+    def build(jd_text, resume_text):
+        return f"""
 Analyze the gaps between this resume and job description. Generate 5-8 strategic questions that will help extract information to significantly improve the ATS score.
 
 QUESTION CRITERIA:
@@ -360,17 +418,115 @@ Job Description:
 Resume Text:
 {resume_text}
 """
+
+    prompt = fit_prompt(
+        "generate_questions", build, max_tokens=QUESTIONS_MAX_TOKENS,
+        jd_text=Section(jd_text, priority=1, min_tokens=500, boilerplate=True),
+        resume_text=Section(resume_text, priority=2, min_tokens=1000)
+    )
+    
+    response_text = get_llm_gateway().complete(
+        "generate_questions",
+        [{"role": "user", "content": prompt}],
+        temperature=0.2,
+        max_tokens=QUESTIONS_MAX_TOKENS
+    )
+    result_dict = extract_json_from_response(response_text)
+    return result_dict
+
+
+@analysis_bp.route("/generate_questions", methods=["POST"])
+def generate_questions_route():
+    """Generate targeted questions to fill resume gaps with example answers"""
+    data = request.get_json()
+    jd_text = data.get('jd_text')
+    resume_text = resume_text_from_request(data)
     
+    if not jd_text or not resume_text:
+        return jsonify({"error": "JD and Resume text required."}), 400
+        
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2,
-            max_tokens=800
-        )
-        response_text = response.choices[0].message.content
-        result_dict = extract_json_from_response(response_text)
-        return jsonify(result_dict)
+        return jsonify(interview_questions(jd_text, resume_text))
     except Exception as e:
         return jsonify({"error": f"Failed to generate questions: {str(e)}"}), 500
 
+
+
+@analysis_bp.route("/analysis/full", methods=["POST"])
+def full_analysis_route():
+    """Analysis, keyword gaps and interview questions for one resume and JD.
+
+    The resume is read and extracted once, and the three LLM calls run
+    concurrently. Each part is sent as a server-sent event (``analysis``,
+    ``keyword_gaps``, ``questions``, or ``error`` with its ``part``) as soon
+    as it is ready, followed by ``done``.
+    """
+    if 'resume_file' not in request.files:
+        return jsonify({"error": "Resume file is required."}), 400
+
+    resume_file = request.files['resume_file']
+    jd_text = request.form.get('jd_text', '')
+    old_score_from_form = request.form.get('old_score', type=int)
+    if not jd_text.strip():
+        return jsonify({"error": "Job description is required for analysis"}), 400
+
+    current_resume_hash = hash_file(resume_file)
+    jd_hash = hash_text(normalize_text(jd_text))
+    existing_record = current_app.db.analyses.find_one({
+        "resume_hash": current_resume_hash,
+        "jd_hash": jd_hash
+    })
+
+    # Everything that reads the request's upload happens here: it is closed once the view returns
+    resume_text = (existing_record or {}).get('parsed_resume_text') or resume_text_from_upload(resume_file)
+    saved = {"file_id": (existing_record or {}).get('file_id')}
+    if not existing_record:
+        prompt = analysis_prompt(resume_text, jd_text, old_score_from_form)
+        # A copy to keep for /optimize_resume, saved only once the analysis succeeds
+        resume_file.seek(0)
+        upload = FileStorage(BytesIO(resume_file.read()), filename=resume_file.filename)
+
+    def analysis():
+        if existing_record:
+            result_dict = existing_record['latest_analysis'].copy()
+        else:
+            result_dict = score_resume(prompt)
+            saved["file_id"] = save_resume_upload(upload, current_resume_hash)
+            record_analysis(current_resume_hash, jd_hash, result_dict, saved["file_id"], old_score_from_form)
+        result_dict['parsed_resume_text'] = resume_text
+        result_dict['resume_hash'] = current_resume_hash
+        result_dict['file_id'] = saved["file_id"]
+        return result_dict
+
+    parts = {
+        "analysis": (analysis, "AI analysis failed. Please check the logs."),
+        "keyword_gaps": (lambda: keyword_gaps(jd_text, resume_text), "Keyword analysis failed"),
+        "questions": (lambda: interview_questions(jd_text, resume_text), "Failed to generate questions"),
+    }
+    app = current_app._get_current_object()
+
+    def run(fn):
+        with app.app_context():
+            return fn()
+
+    def generate():
+        executor = ThreadPoolExecutor(max_workers=len(parts))
+        try:
+            futures = {executor.submit(run, fn): part for part, (fn, _) in parts.items()}
+            for future in as_completed(futures):
+                part = futures[future]
+                try:
+                    yield sse_event(part, future.result())
+                except Exception as e:
+                    app.logger.error(f"Full analysis: {part} failed: {str(e)}")
+                    yield sse_event("error", {"part": part, "error": f"{parts[part][1]}: {str(e)}"})
+            yield sse_event("done", {"resume_hash": current_resume_hash, "file_id": saved["file_id"]})
+        finally:
+            # Client went away: don't start calls nobody will read
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
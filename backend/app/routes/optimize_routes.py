@@ -4,7 +4,10 @@ from io import BytesIO
 from flask import Blueprint, request, jsonify, send_file, current_app
 # We will use your find_and_replace_in_doc function
 from app.utils.file_utils import find_and_replace_in_doc, extract_json_from_response
-from app.utils.ai_helpers import client
+from app.utils.llm_gateway import get_llm_gateway
+from app.utils.llm_streaming import json_string_field, sse_text_response
+from app.utils.prompt_budget import Section, fit_prompt
+from app.utils.upload_pipeline import UploadTooLargeError
 import json # <-- Make sure you have this import for the new route
 
 optimize_bp = Blueprint('optimize', __name__)
@@ -43,6 +46,8 @@ def optimize_resume_route():
     if not file_path.lower().endswith('.docx'):
         return jsonify({"error": "Optimization is for .docx only."}), 400
     
+    # Body paragraphs only: the edits below can't reach headers, footers or tables,
+    # so the model must not anchor on text from them
     original_doc = docx.Document(file_path)
     original_resume_text = "\n".join([p.text for p in original_doc.paragraphs if p.text.strip()])
     
@@ -51,7 +56,8 @@ def optimize_resume_route():
         if a.strip():
             formatted_answers.append(f"Question: {q}\nAnswer: {a}\n")
     
-    prompt = f"""
+    def build(jd_text, answers, resume_text):
+        return f"""
 You are an expert Career Strategist. Your mission is to surgically enhance a resume to align with a Job Description. Your suggestions must be strong enough to justify a score increase from {old_score}/100 to at least {target_score}/100.
 **Perform these three actions:**
 1.  **ADD MISSING SKILLS:** Identify 3-6 critical skills from the Job Description that are missing from the resume's SKILLS section.
@@ -59,8 +65,8 @@ You are an expert Career Strategist. Your mission is to surgically enhance a res
 3.  **TRANSFORM EXISTING BULLETS:** Rewrite 2-3 existing bullet points to be more impactful with resume and JD point of view.
 **CONTEXT:**
 **Job Description:**\n{jd_text}
-**Candidate Answers:**\n{"".join(formatted_answers)}
-**Original Resume:**\n{original_resume_text}
+**Candidate Answers:**\n{answers}
+**Original Resume:**\n{resume_text}
 **REQUIRED JSON OUTPUT FORMAT:**
 You MUST return ONLY a valid JSON object with EXACTLY three keys: "skills_to_add", "project_enhancements", and "bullet_point_changes".
 - `skills_to_add`: An array of strings for missing skills. Example: `["Hadoop", "React", "Scrum"]` so on..
@@ -102,18 +108,24 @@ You MUST return ONLY a valid JSON object with EXACTLY three keys: "skills_to_add
 }}
 Now, generate the JSON output.
 """
+
+    # Suggestions anchor on the resume's own bullets, so its text is cut last
+    prompt = fit_prompt(
+        "optimize_resume", build,
+        jd_text=Section(jd_text, priority=1, min_tokens=500, boilerplate=True),
+        answers=Section("".join(formatted_answers), priority=2),
+        resume_text=Section(original_resume_text, priority=3, min_tokens=2000)
+    )
     
     try:
-        response = client.chat.completions.create(
+        response_text = get_llm_gateway().complete(
+            "optimize_resume",
+            [{"role": "user", "content": prompt}],
             # model="gpt-4o",
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
             temperature=0.2,
             response_format={"type": "json_object"},
             timeout=120.0
         )
-        
-        response_text = response.choices[0].message.content
         optimization_data = extract_json_from_response(response_text)
         
         skills_to_add = optimization_data.get("skills_to_add", [])
@@ -262,6 +274,8 @@ def parse_final_resume_to_json():
         from app.utils.file_utils import extract_text_builder
         # This gets the text from the FINAL .docx file sent from the frontend
         final_optimized_text = extract_text_builder(file, file.filename)
+    except UploadTooLargeError as e:
+        return jsonify({"error": e.description}), 413
     except Exception as e:
         return jsonify({"error": f"Failed to extract text from optimized file: {str(e)}"}), 500
     
@@ -350,13 +364,12 @@ Now, generate the JSON object based on the provided text.
 """
 
     try:
-        final_response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": final_prompt}],
+        final_json_data = json.loads(get_llm_gateway().complete(
+            "parse_optimized_resume",
+            [{"role": "user", "content": final_prompt}],
             temperature=0.1,
             response_format={"type": "json_object"}
-        )
-        final_json_data = json.loads(final_response.choices[0].message.content)
+        ))
         return jsonify(final_json_data)
         
     except Exception as e:
@@ -367,16 +380,11 @@ Now, generate the JSON object based on the provided text.
     
     
 
-@optimize_bp.route("/generate-or-enhance-summary", methods=["POST"])
-def generate_or_enhance_summary():
-    """
-    Generate or enhance a professional summary based on the user's input.
-    - If 'existingSummary' is provided, enhances only that text.
-    - If 'existingSummary' is empty, generates a new summary using 'experience', 'skills', and 'projects'.
-    Expects a JSON payload with 'existingSummary', 'experience', 'skills', and 'projects' fields.
-    Returns a JSON object with a 'summary' field containing the generated or enhanced summary.
+def summary_prompt(data):
+    """Prompt that enhances ``existingSummary``, or writes a summary from experience, skills and projects.
+
+    ``None`` when there is neither a summary nor anything to write one from.
     """
-    data = request.get_json()
     existing_summary = data.get('existingSummary', '').strip()
     experience = data.get('experience', [])
     skills = data.get('skills', [])
@@ -409,7 +417,7 @@ You are an expert Career Strategist tasked with enhancing an existing profession
         # Generate mode: Create a new summary using experience, skills, and projects
         # Validate input
         if not any([experience, skills, projects]):
-            return jsonify({"error": "At least one of experience, skills, or projects is required when generating a new summary."}), 400
+            return None
 
         # Format experience for the prompt
         formatted_experience = []
@@ -460,17 +468,31 @@ You are an expert Career Strategist tasked with generating a concise, impactful
   "summary": "Results-driven Software Engineer with over 5 years of experience developing scalable web applications at leading tech firms. Proficient in Java, Python, and cloud technologies, with a proven track record of delivering high-impact projects that enhance system performance. Skilled in leading cross-functional teams to meet tight deadlines while maintaining code quality."
 }}
 """
-    
+    return prompt
+
+
+@optimize_bp.route("/generate-or-enhance-summary", methods=["POST"])
+def generate_or_enhance_summary():
+    """
+    Generate or enhance a professional summary based on the user's input.
+    - If 'existingSummary' is provided, enhances only that text.
+    - If 'existingSummary' is empty, generates a new summary using 'experience', 'skills', and 'projects'.
+    Expects a JSON payload with 'existingSummary', 'experience', 'skills', and 'projects' fields.
+    Returns a JSON object with a 'summary' field containing the generated or enhanced summary.
+    """
+    data = request.get_json()
+    prompt = summary_prompt(data)
+    if prompt is None:
+        return jsonify({"error": "At least one of experience, skills, or projects is required when generating a new summary."}), 400
+
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
+        response_text = get_llm_gateway().complete(
+            "generate_summary",
+            [{"role": "user", "content": prompt}],
             temperature=0.3,  # Moderate temperature for balanced creativity and consistency
             response_format={"type": "json_object"},
             timeout=60.0
         )
-        
-        response_text = response.choices[0].message.content
         summary_data = json.loads(response_text)
         
         if not summary_data.get("summary"):
@@ -487,3 +509,24 @@ You are an expert Career Strategist tasked with generating a concise, impactful
     except Exception as e:
         current_app.logger.error(f"Unexpected error during summary generation/enhancement: {str(e)}")
         return jsonify({"error": f"Failed to process summary: {str(e)}"}), 500
+
+
+@optimize_bp.route("/generate-or-enhance-summary/stream", methods=["POST"])
+def generate_or_enhance_summary_stream():
+    """``/generate-or-enhance-summary`` as server-sent events.
+
+    The model still answers in JSON, as for the plain route (and from the
+    same cache); only the text of its ``summary`` field is forwarded.
+    """
+    prompt = summary_prompt(request.get_json())
+    if prompt is None:
+        return jsonify({"error": "At least one of experience, skills, or projects is required when generating a new summary."}), 400
+
+    chunks = get_llm_gateway().stream(
+        "generate_summary",
+        [{"role": "user", "content": prompt}],
+        temperature=0.3,
+        response_format={"type": "json_object"},
+        timeout=60.0
+    )
+    return sse_text_response(json_string_field(chunks, "summary"), "summary", "Failed to process summary")
@@ -1,45 +1,39 @@
+import io
+import zipfile
 from io import BytesIO
-import os
-import pdfkit
-from flask import Blueprint, request, jsonify, send_file, current_app
-from app.utils.file_utils import extract_text_builder
-from app.utils.ai_helpers import client
+from flask import Blueprint, request, jsonify, send_file, current_app, Response, stream_with_context
+from werkzeug.utils import secure_filename
+from app.utils.batch_extraction import extract_batch, read_uploads
+from app.utils.layout_extraction import get_resume_layout, layout_text
+from app.utils.resume_parser import parse_resume, low_confidence_fields, fill_text, fill_prompt, merge_fill, FIELD_SCHEMAS
+from app.utils.upload_pipeline import UploadTooLargeError
+from app.utils.llm_gateway import get_llm_gateway
+from app.utils.llm_streaming import sse_text_response, stream_text
+from app.utils.prompt_budget import Section, fit_prompt
 # from app.routes.auth_routes import token_required
 from app.utils.auth_utils import token_required  # Import the decorator
 from app.models.resume import Resume
-from bson import ObjectId
 from flask_cors import CORS  # ✅ Make sure this is imported
 from app.data.skills_data import ALL_SKILLS
 from app.data.interests import INTERESTS
 from app.data.languages import LANGUAGES
-from playwright.sync_api import sync_playwright
-from app.data.domain_mapping import DOMAIN_KEYWORDS  # <-- import here
+from app.utils.pdf_renderer import render_pdf, render_pdf_batch, render_resume_pdf
+from app.utils.resume_html import has_resume_template
+from app.utils.browser_pool import get_browser_pool
+from app.utils.pdf_backends import get_pdf_backends
+from app.utils.pdf_cache import get_pdf_cache
+from app.utils.pdf_jobs import get_pdf_job_queue, job_timings, QueueFullError
 import json
+import time
 
 
-# 27/07
-# Define the upload folder for PDFs
-UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), "app", "pdfs")
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
-
-path_wkhtmltopdf = r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe'
-config = pdfkit.configuration(wkhtmltopdf=path_wkhtmltopdf)
-
-options = {
-    'enable-local-file-access': None,
-    'page-size': 'A4',
-    'dpi': 300,
-    'zoom': 1.3,  # Makes text clearer and larger
-    'encoding': "UTF-8",
-    'no-outline': None,
-    'print-media-type': None,
-}
-
-
+resume_bp = Blueprint('resume', __name__)
 
+# Same default the builder uses for resumes saved without a template
+DEFAULT_TEMPLATE = "microsoft"
 
-resume_bp = Blueprint('resume', __name__)
+# Completion tokens for /extract; the prompt budget leaves room for them
+EXTRACT_MAX_TOKENS = 2000
 
 CORS(resume_bp, origins=["http://localhost:5173"], methods=["GET", "POST", "PUT", "DELETE"], supports_credentials=True)
 
@@ -135,6 +129,63 @@ def get_user_resumes(current_user):
 
 
 
+class _ZipStream(io.RawIOBase):
+    """Write-only sink that lets zipfile build an archive in chunks."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+@resume_bp.route('/my-resumes/export.zip', methods=['GET'])
+@token_required
+def export_resumes_zip(current_user):
+    resumes = list(Resume.get_resumes_by_user(current_user["_id"], {"title": 1, "template": 1, "content": 1}))
+
+    items = []
+    skipped = []
+    used_names = set()
+    for resume in resumes:
+        base = secure_filename(resume.get("title") or "") or str(resume["_id"])
+        name = f"{base}.pdf"
+        if name in used_names:
+            name = f"{base}-{resume['_id']}.pdf"
+        used_names.add(name)
+        items.append((name, resume.get("content"), resume.get("template") or DEFAULT_TEMPLATE))
+
+    concurrency = current_app.config.get('PDF_BATCH_CONCURRENCY', 4)
+    timeout = current_app.config.get('PDF_RENDER_TIMEOUT', 60.0)
+
+    def generate():
+        sink = _ZipStream()
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+            # Each PDF is written to the archive, and flushed to the client, as soon as it finishes
+            for name, pdf_bytes, error in render_pdf_batch(items, concurrency, timeout):
+                if error is not None:
+                    skipped.append(f"{name}: {error}")
+                    continue
+                archive.writestr(name, pdf_bytes)
+                yield sink.drain()
+            if skipped:
+                archive.writestr("export_errors.txt", "\n".join(skipped))
+        yield sink.drain()
+
+    response = Response(stream_with_context(generate()), mimetype="application/zip")
+    response.headers["Content-Disposition"] = 'attachment; filename="resumes.zip"'
+    return response
+
+
 @resume_bp.route('/save', methods=['POST'])
 @token_required
 def save_resume(current_user):
@@ -161,16 +212,8 @@ def save_resume(current_user):
 
 
 
-@resume_bp.route("/enhance-field", methods=["POST"])
-def enhance_field():
-    data = request.json
-    field_type = data.get('fieldType')  # 'experience', 'project', 'achievement', etc.
-    text = data.get('text', '')
-    context = data.get('context', {})  # Additional context like job title, company, etc.
-
-    if not field_type or not text:
-        return jsonify({"error": "Field type and text are required"}), 400
-
+def enhance_field_prompt(field_type, text, context):
+    """Enhancement prompt for a resume field of ``field_type``."""
     # Define enhancement prompts for different field types
     prompts = {
         "experience": f"""Improve this work experience description for a resume:
@@ -269,18 +312,28 @@ Return only the enhanced text.""",
 Please make it more concise, professional and impactful while preserving the original meaning."""
     }
 
-    # Select the appropriate prompt
-    prompt = prompts.get(field_type, prompts["default"])
+    return prompts.get(field_type, prompts["default"])
+
+
+@resume_bp.route("/enhance-field", methods=["POST"])
+def enhance_field():
+    data = request.json
+    field_type = data.get('fieldType')  # 'experience', 'project', 'achievement', etc.
+    text = data.get('text', '')
+    context = data.get('context', {})  # Additional context like job title, company, etc.
+
+    if not field_type or not text:
+        return jsonify({"error": "Field type and text are required"}), 400
+
+    prompt = enhance_field_prompt(field_type, text, context)
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
+        enhanced_text = get_llm_gateway().complete(
+            "enhance_field",
+            [{"role": "user", "content": prompt}],
             temperature=0.7,
             max_tokens=500
-        )
-        
-        enhanced_text = response.choices[0].message.content.strip()
+        ).strip()
         
          # Post-process to replace common bullet characters with '•'
         enhanced_text = enhanced_text.replace('- ', '• ').replace('* ', '• ')
@@ -290,6 +343,27 @@ Please make it more concise, professional and impactful while preserving the ori
         return jsonify({"error": str(e)}), 500
 
 
+
+@resume_bp.route("/enhance-field/stream", methods=["POST"])
+def enhance_field_stream():
+    """``/enhance-field`` as server-sent events: the text arrives as it is written."""
+    data = request.json
+    field_type = data.get('fieldType')
+    text = data.get('text', '')
+    context = data.get('context', {})
+
+    if not field_type or not text:
+        return jsonify({"error": "Field type and text are required"}), 400
+
+    # Same request as /enhance-field, so the two share cached responses
+    chunks = get_llm_gateway().stream(
+        "enhance_field",
+        [{"role": "user", "content": enhance_field_prompt(field_type, text, context)}],
+        temperature=0.7,
+        max_tokens=500
+    )
+    return sse_text_response(stream_text(chunks, bullets=True), "enhancedText", "Enhancement failed")
+
 # def detect_domain(domain_text):
 #     domain_text = domain_text.lower()
 #     for domain_key, keywords in DOMAIN_KEYWORDS.items():
@@ -298,10 +372,8 @@ Please make it more concise, professional and impactful while preserving the ori
 #             return domain_key
 #     print("⚠️ Defaulted to software")
 #     return "software"
-@resume_bp.route('/generate-objective', methods=['POST'])
-def generate_objective():
-    data = request.json
-
+def objective_prompt(data):
+    """Career objective prompt from the first education, project and internship entries."""
     # Safely extract data with proper fallbacks
     education = data.get('education', [{}])[0] if data.get('education') else {}
     projects = data.get('projects', [{}])[0] if data.get('projects') else {}
@@ -348,23 +420,45 @@ def generate_objective():
     3. Keep it concise (40-60 words)
     4. Sound professional but not generic
     """
+    return prompt
+
+
+@resume_bp.route('/generate-objective', methods=['POST'])
+def generate_objective():
+    data = request.json
+    prompt = objective_prompt(data)
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
+        generated_text = get_llm_gateway().complete(
+            "generate_objective",
+            [
                 {"role": "system", "content": "You are a professional resume writer."},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.3,
             max_tokens=150
-        )
-        generated_text = response.choices[0].message.content.strip()
+        ).strip()
         return jsonify({"objective": generated_text})
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+
+@resume_bp.route('/generate-objective/stream', methods=['POST'])
+def generate_objective_stream():
+    """``/generate-objective`` as server-sent events."""
+    chunks = get_llm_gateway().stream(
+        "generate_objective",
+        [
+            {"role": "system", "content": "You are a professional resume writer."},
+            {"role": "user", "content": objective_prompt(request.json)}
+        ],
+        temperature=0.3,
+        max_tokens=150
+    )
+    return sse_text_response(stream_text(chunks), "objective", "Objective generation failed")
+
+
 @resume_bp.route("/suggest-skills", methods=["POST"])
 def suggest_skills():
     data = request.json
@@ -420,8 +514,37 @@ def extract_resume():
     file = request.files["resume"]
     
     try:
-        raw_text = extract_text_builder(file, file.filename)
-        truncated_text = raw_text[:1000000]
+        # Shared per-file-hash layout (see layout_extraction)
+        _, layout = get_resume_layout(file)
+        resume_text = layout_text(layout)
+
+        # Rule-based first pass; the LLM only sees the fields it could not fill confidently
+        parsed, confidence, sources = parse_resume(layout)
+        missing = low_confidence_fields(confidence)
+        if not missing:
+            print("[extract] parsed without the LLM")
+            return jsonify(parsed)
+
+        # Mostly unparsed (no recognisable sections): the full prompt below does better
+        if len(missing) <= len(FIELD_SCHEMAS) // 2:
+            print(f"[extract] asking the LLM for: {', '.join(missing)}")
+            prompt = fit_prompt(
+                "extract_resume_fill", lambda text: fill_prompt(missing, text), max_tokens=EXTRACT_MAX_TOKENS,
+                text=Section(fill_text(missing, sources, resume_text))
+            )
+            result = get_llm_gateway().complete(
+                "extract_resume_fill",
+                [{"role": "user", "content": prompt}],
+                temperature=0.1,
+                max_tokens=EXTRACT_MAX_TOKENS
+            )
+            try:
+                return jsonify(merge_fill(parsed, missing, result))
+            except json.JSONDecodeError:
+                return jsonify({
+                    "error": "AI returned invalid JSON",
+                    "ai_response": result
+                }), 500
 
         prompt = f"""Extract all resume information and return it as JSON in the *exact structure* below.
 
@@ -507,15 +630,18 @@ def extract_resume():
             ]
     }}"""  # Your existing prompt
         
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": f"{prompt}\n\nResume Text:\n{truncated_text}"}],
+        # Long resumes are trimmed to the route's token budget rather than failing the call
+        full_prompt = fit_prompt(
+            "extract_resume", lambda text: f"{prompt}\n\nResume Text:\n{text}", max_tokens=EXTRACT_MAX_TOKENS,
+            text=Section(resume_text)
+        )
+        result = get_llm_gateway().complete(
+            "extract_resume",
+            [{"role": "user", "content": full_prompt}],
             temperature=0.1,
-            max_tokens=2000
+            max_tokens=EXTRACT_MAX_TOKENS
         )
         
-        result = response.choices[0].message.content
-        
         try:
             parsed = json.loads(result)
         except json.JSONDecodeError:
@@ -526,6 +652,8 @@ def extract_resume():
             
         return jsonify(parsed)
 
+    except UploadTooLargeError as e:
+        return jsonify({"error": e.description}), 413
     except Exception as e:
         return jsonify({
             "error": str(e),
@@ -536,6 +664,40 @@ def extract_resume():
 
 
 
+@resume_bp.route("/extract/batch", methods=["POST"])
+def extract_resume_batch():
+    """Text of many resumes (files under ``resumes``, ZIPs expanded), streamed as NDJSON.
+
+    One line per file, in completion order; a final ``{"done": true}`` line
+    carries the totals.
+    """
+    # Whole folders at once: a larger body limit than single uploads
+    request.max_content_length = current_app.config['EXTRACT_BATCH_MAX_MB'] * 1024 * 1024
+    uploads = read_uploads(request.files.getlist("resumes"))
+    if not uploads:
+        return jsonify({"error": "No resume files provided"}), 400
+
+    def generate():
+        started = time.perf_counter()
+        count = errors = 0
+        for result in extract_batch(uploads):
+            count += 1
+            errors += "error" in result
+            yield json.dumps(result) + "\n"
+        print(f"[extract-batch] {count} files, {errors} errors, {time.perf_counter() - started:.2f}s")
+        yield json.dumps({
+            "done": True,
+            "files": count,
+            "errors": errors,
+            "ms": round((time.perf_counter() - started) * 1000, 1)
+        }) + "\n"
+
+    response = Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+    # Let each line through proxies as soon as it is written
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
 # @resume_bp.route("/enhance-summary", methods=["POST"])
 # def enhance_summary():
 #     data = request.json
@@ -574,1445 +736,109 @@ def extract_resume():
 #         return jsonify({"error": str(e)}), 500
 
 
+@resume_bp.route('/pdf-stats', methods=['GET'])
+def pdf_stats():
+    return jsonify({
+        "pool": get_browser_pool().stats(),
+        "backends": get_pdf_backends().stats(),
+        "cache": get_pdf_cache().stats(),
+        "job_queue_depth": get_pdf_job_queue().depth(),
+    })
+
+
+@resume_bp.route('/llm-stats', methods=['GET'])
+def llm_stats():
+    return jsonify(get_llm_gateway().stats())
+
+
 @resume_bp.route('/download_pdf', methods=['POST'])
 def download_pdf():
     try:
         data = request.get_json()
         html_content = data["html"]
         template_id = data["template"]
-        output_path = os.path.join(UPLOAD_FOLDER, f"resume_{template_id}.pdf")
-        print(f"Output path: {output_path}")  # Debug print
-        print(f"HTML content length: {len(html_content)}")  # Debug length
-
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            # Set the HTML content and wait for network to stabilize
-            page.set_content(html_content, wait_until="networkidle")
-            
-            # Manually add styles based on template
-            if template_id == "google":
-                page.add_style_tag(content="""
-                    body { font-family: Arial, sans-serif; color: #333; }
-  @page {
-  size: A4;
-  margin: 0;
-    margin: 10mm;
-}
-
-body {
-  margin: 0;
-  padding: 0;
-  background: white;
-}
-
-.resume-t2 {
-  width: 100%;
-  max-width: 170mm;
-  min-height: 297mm;
-  margin: 0 auto;
-  background: #fff;
-  padding: 10mm;
-  box-sizing: border-box;
-}
-
-.header-t2 {
-  text-align: center;
-  border-bottom: 2px solid #000;
-  padding-bottom: 8px;
-  margin-bottom: 12px;
-}
-
-.header-t2 h1 {
-  font-size: 24px;
-  margin: 0;
-  text-transform: uppercase;
-  letter-spacing: 2px;
-  font-weight: bold;
-}
-
-.contact-info-t2 {
-  font-size: 10px;
-  margin-top: 4px;
-  color: #444;
-}
-
-.section-t2 {
-  margin-bottom: 12px;
-}
-
-.section-title-t2 {
-  font-size: 13px;
-  font-weight: bold;
-  text-transform: uppercase;
-  letter-spacing: 1px;
-  border-bottom: 1px solid #ccc;
-  padding-bottom: 4px;
-  margin-bottom: 8px;
-}
-
-.details-t2 {
-  color: #444;
-  margin-top: 4px;
-  font-size: 11px;
-}
-
-.item-t2 .font-semibold {
-  font-size: 11px;
-  font-weight: 600;
-}
-
-.item-t2 ul li,
-.section-t2 ul li,
-.item-t2 p:not(.font-semibold),
-.item-t2 .text-gray-700 {
-  font-size: 10px;
-}
-
-.item-t2 ul,
-.section-t2 ul {
-  padding-left: 20px;
-  margin: 4px 0;
-  list-style: disc;
-}
-
-.skills-section ul {
-  display: grid;
-  grid-template-columns: repeat(2, 1fr);
-  gap: 0.5rem;
-  padding-left: 20px;
-}
-
-.item-t2 .flex.justify-between {
-  display: flex;
-  justify-content: space-between;
-  align-items: flex-start;
-  width: 100%;
-}
-
-.info-location{
-   text-transform: capitalize;
-}
-
-.info-capital{
-  text-transform: capitalize;
-}
-
-.info-skill{
-  text-transform: capitalize;
-}
-
-.info-language{
-  text-transform : capitalize;
-}
-
-.info-interest{
-  text-transform: capitalize;
-}
-
-.info-project{
-  text-transform: capitalize;
-}
-
-.info-internship{
-  text-transform: capitalize;
-}
-
-
-@media print {
-  body, html {
-    width: 210mm;
-    height: 297mm;
-  }
-
-  .resume-t2 {
-    box-shadow: none;
-    margin: 0;
-    padding: 10mm;
-    width: 100%;
-    height: 100%;
-  }
-
-  .no-print {
-    display: none;
-  }
-}
-}
-
-                """)
-            elif template_id == "meta":
-                page.add_style_tag(content="""
-                    body { font-family: 'Roboto', sans-serif; color: #1a202c;  }
-                    .meta-container {
-  font-family: Arial, sans-serif;
-    width: 170mm;
-  min-height: 297mm;
-}
-
-.resume-inner {
-  padding: 10mm; 
-  box-sizing: border-box;
-}
-
-.meta-name {
-  font-size: 24px;
-  text-align: center;
-}
-
-.meta-contact,
-.meta-links {
-  font-size: 10px;
-  text-align: center;
-}
-
-.meta-section {
-  margin-top: 15px;
-  margin-bottom: 15px;
-}
-
-.meta-section-heading {
-  font-size: 13px;
-  text-align: center;
-  font-weight: bold;
-}
-
-.meta-list {
-  font-size: 11px;
-  text-align: justify;
-}
-
-.meta-item {
-  font-size: 11px;
-  margin-bottom: 10px;
-}
-
-.meta-text {
-  font-size: 11px;
-  text-align: justify;
-}
-
-.meta-bullets {
-  font-size: 11px;
-  text-align: justify;
-  padding-left: 20px;
-    list-style-type: disc; /* ✅ Add this */
-}
-
-.meta-dates {
-  font-weight: bold;
-}
-
-.meta-flex {
-  display: flex;
-  justify-content: space-between;
-  align-items: center;
-}
-
-/* new added */
-.info-location{
-    text-transform: capitalize;
-}
-
-
-.info-capital{
-  text-transform: capitalize;
-}
-
-.info-skill{
-  text-transform : capitalize;
-}
-
-.info-language{
-  text-transform : capitalize;
-}
-
-.info-interest{
-  text-transform: capitalize;
-}
-
-.info-project{
-  text-transform: capitalize;
-}
-
-.info-internship{
-  text-transform: capitalize;
-}
-
-                """)
-            elif template_id == "microsoft":
-                page.add_style_tag(content="""
-
-body {
-  font-family: 'Segoe UI', sans-serif;
-  color: #2f2f2f;
-  margin: 0;
-  padding: 0;
-  background: white;
-}
-
-@page {
-  size: A4;
-  margin: 10mm;
-}
-
-.resume-container {
-  width: 170mm;
-  min-height: 297mm;
-  background: white;
-  padding: 2.5rem;
-  color: #2d3748;
-  margin: 0 auto;
-}
-
-.resume-header {
-  text-align: center;
-  margin-bottom: 1.5rem;
-}
-
-.info{
-  margin-right: 11.5px;
-}
-
-.resume-header h1 {
-  font-size: 1.5rem;
-  font-weight: bold;
-  color: #2563eb;
-  text-transform: uppercase;
-  margin-bottom: 0.5rem;
-}
-
-.resume-header p {
-  font-size: 0.75rem;
-  color: #718096;
-}
-
-.section-title {
-  display: flex;
-  align-items: center;
-  margin: 1rem 0;
-}
-
-.section-title span {
-  flex-grow: 1;
-  border-top: 1px solid #60a5fa;
-}
-
-.section-title h2 {
-  margin: 0 1rem;
-  font-size: 0.9rem;
-  font-weight: bold;
-  text-transform: uppercase;
-  color: #2563eb;
-  letter-spacing: 0.1em;
-}
-
-.section-text {
-  font-size: 0.75rem;
-}
-
-.work-item,
-.project-item,
-.education-item,
-.achievement-item,
-.certification-item {
-  margin-bottom: 1rem;
-}
-
-.work-item h3,
-.project-item h3,
-.education-item .degree,
-.achievement-item h3,
-.certification-item p {
-  font-size: 0.8rem;
-  font-weight: bold;
-  margin: 0;
-}
-
-.work-item p,
-.project-tech,
-.education-item p {
-  font-size: 0.75rem;
-  color: #4a5568;
-  margin: 0;
-}
-
-.date-right {
-  font-size: 0.75rem;
-  color: #718096;
-  text-align: right;
-  white-space: nowrap;
-  flex-shrink: 0;
-}
-
-.education-row,
-.project-row {
-  display: flex;
-  justify-content: space-between;
-  align-items: center;
-  gap: 1rem;
-}
-
-.project-tech {
-  font-size: 0.75rem;
-  font-style: italic;
-  color: #4a5568;
-  margin: 0.25rem 0;
-}
-
-.project-points,
-.work-list,
-.achievement-item ul {
-  font-size: 0.75rem;
-  color: #4a5568;
-  list-style: disc;
-  padding-left: 1.25rem;
-  margin-top: 0.25rem;
-}
-
-/* education-item */
-/* Add these styles to your existing CSS */
-.education-item {
-  display: flex;
-  justify-content: space-between;
-  margin-bottom: 1rem;
-  width: 100%;
-}
-
-.education-left {
-  flex: 1;
-  min-width: 0; /* Prevents overflow */
-}
-
-.education-right {
-  flex-shrink: 0; /* Prevents date from wrapping */
-  margin-left: 1rem;
-}
-
-.degree {
-  font-size: 0.8rem;
-  font-weight: bold;
-  margin: 0;
-  white-space: normal;
-}
-
-.university {
-  font-size: 0.75rem;
-  color: #4a5568;
-  margin: 0.1rem 0;
-}
-
-.gpa {
-  font-size: 0.75rem;
-  color: #4a5568;
-  font-style: italic;
-  margin: 0;
-}
-
-.dates {
-  font-size: 0.75rem;
-  color: #718096;
-  white-space: nowrap;
-  text-align: right;
-}
-
-/* Work Experience Section */
-                                   
-.work-item {
-  margin-bottom: 1rem;
-  page-break-inside: avoid;
-}
-
-.work-row {
-  display: flex;
-  justify-content: space-between;
-  align-items: flex-start;
-  gap: 1rem;
-  margin-bottom: 0.25rem;
-}
-
-.work-info {
-  flex: 1;
-  min-width: 0; /* Prevents text overflow */
-}
-
-.work-info h3 {
-  font-size: 0.8rem;
-  font-weight: bold;
-  margin: 0 0 0.1rem 0;
-  line-height: 1.3;
-}
-
-.work-info p {
-  font-size: 0.75rem;
-  color: #4a5568;
-  margin: 0;
-  line-height: 1.3;
-}
-
-.date-right {
-  font-size: 0.75rem;
-  color: #718096;
-  white-space: nowrap;
-  flex-shrink: 0;
-  text-align: right;
-  padding-top: 0.1rem; /* Minor alignment adjustment */
-}
-
-.work-list {
-  font-size: 0.75rem;
-  color: #4a5568;
-  list-style: disc;
-  padding-left: 1.25rem;
-  margin-top: 0.25rem;
-  margin-bottom: 0;
-}
-
-.work-list li {
-  margin-bottom: 0.1rem;
-  line-height: 1.3;
-}
-
-.skills-grid {
-  display: flex; /* Use flex instead of grid for better PDF support */
-  gap: 3rem; /* This creates the space between columns */
-}
-
-.skills-grid ul {
-  flex: 1; /* Makes both columns equal width */
-  list-style: none; /* Remove default bullets */
-  padding-left: 1rem; /* Indent list items */
-  margin: 0; /* Remove default margins */
-}
-
-.skills-grid li {
-  font-size: 0.75rem;
-  position: relative;
-  padding-left: 1rem;
-  margin-bottom: 0.25rem;
-   color: #4a5568; 
-}
-
-.skills-grid li::before {
-  content: "•";
-  position: absolute;
-  left: 0;
-  color: #4a5568;
-}
-
-
-.list-disc {
-  padding-left: 1.25rem;
-}
-
-.list-style {
-  list-style: disc;
-  list-style-position: inside;
-  font-size: 0.75rem;
-  color: #4a5568;
-  margin: 0.25rem 0;
-}
-
-@media print {
-  body,
-  html {
-    width: 210mm;
-    height: 297mm;
-  }
-
-  .resume-container {
-    width: 170mm;
-    min-height: 297mm;
-    box-shadow: none;
-    padding: 2.5rem;
-    margin: 0 auto;
-    background: white;
-  }
-
-  section,
-  .work-item,
-  .project-item,
-  .education-item,
-  .achievement-item {
-    page-break-inside: avoid;
-    break-inside: avoid;
-  }
-
-  .section-title h2 {
-    color: #2563eb !important;
-  }
-  
-  .info-location{
-   text-transform: capitalize;
-}
-
-.info-capital{
-  text-transform: capitalize;
-}
-
-.info-skill{
-  text-transform: capitalize;
-}
-
-.info-language{
-  text-transform : capitalize;
-}
-
-.info-interest{
-  text-transform: capitalize;
-}
-
-.info-project{
-  text-transform: capitalize;
-}
-
-.info-internship{
-  text-transform: capitalize;
-}
-
-}
-
-        }
-
-                """)
-                
-            elif template_id == "template4":
-                page.add_style_tag(content="""
-                       .resume {
-  font-family: 'Helvetica Neue', Arial, sans-serif;
-  width: 170mm;
-  margin: 0 auto;
-    min-height: 297mm;
-  background-color: white;
-  color: #333;
-  box-sizing: border-box;
-}
-
-.resume-inner {
-  padding: 10mm;  /* reliable in PDF */
-  box-sizing: border-box;
-}
-
-
-/* Header */
-.resume-headerr {
-  text-align: left;
-  margin-bottom: 20px;
-}
-
-.resume-headerr h1 {
-  font-size: 29px;
-  color:black;
-  font-weight: bold;
-}
-
-.resume-headerr h2 {
-  font-size: 15px;
-  margin-bottom: 10px;
-}
-
-.contact-info {
-  font-size: 12px;
-  color: #555;
-  margin-bottom: 20px;
-}
-
-.contact-info span {
-  margin-right: 5px;
-}
-
-/* Summary */
-.summary {
-  margin-bottom: 20px;
-  padding-top: 0;
-  border-top: none;
-}
-
-.section-title {
-  font-size: 14px;
-  font-weight: bold;
-  text-transform: uppercase;
-   border-bottom: 1px solid black !important; 
-  margin-bottom: 10px;
-  color: #333;
-}
-
-.summary-text {
-  font-size: 12px;
-  line-height: 1.5;
-}
-
-/* Two-column layout */
-.resume-body {
-  display: grid;
-  grid-template-columns: 1fr 2fr;
-  gap: 30px;
-}
-
-.left-column,
-.right-column {
-  display: flex;
-  flex-direction: column;
-  gap: 20px;
-}
-
-/* Skills */
-.skills {
-  padding-bottom: 10px;
-}
-
-.skills-grid {
-  display: flex;
-  flex-wrap: wrap;
-  gap: 5px;
-}
-
-.skill-item {
-  padding: 5px 10px;
-  border-radius: 4px;
-  font-size: 12px;
-  background-color: #f0f0f0;
-  /* text-decoration: underline; */
-  /* line-height: 15px; */
-  white-space: nowrap;
-}
-
-/* Education Section */
-.education {
-  margin-top: 20px;
-}
-
-.education-container {
-  margin-bottom: 1.5rem;
-}
-
-.education-upper {
-  margin-bottom: 0.3rem;
-}
-
-.education-lower {
-  display: flex;
-  justify-content: space-between;
-  align-items: flex-start;
-}
-
-.school-info {
-  flex: 1;
-}
-
-.date-info {
-  margin-left: 1rem;
-  text-align: right;
-}
-
-.degree {
-  font-size: 13px;
-  font-weight: bold;
-  margin: 0;
-  color: #333;
-}
-
-.university {
-  font-size: 12px;
-  color: #4a5568;
-  margin: 0 0 0.1rem 0;
-}
-
-.gpa {
-  font-size: 0.75rem;
-  color: #4a5568;
-  font-style: italic;
-  margin: 0;
-}
-
-.dates {
-  font-size: 0.75rem;
-  color: #718096;
-  white-space: nowrap;
-}
-
-.info-capital {
-  text-transform: capitalize;
-}
-
-
-/* Common item styling */
-.project-item,
-.experience-item,
-.achievement-item,
-.education-item {
-  margin-bottom: 15px;
-}
-
-.project-item h4,
-.experience-item h4,
-.achievement-item h4,
-.education-item h4 {
-  font-size: 14px;
-  font-weight: bold;
-  margin-bottom: 5px;
-}
-
-.project-details,
-.company,
-.cert-details,
-.school {
-  font-size: 12px;
-  font-style: italic;
-  color: #777;
-  margin-bottom: 5px;
-}
-
-.project-details a {
-  color: #10c0d4;
-  text-decoration: none;
-}
-
-.project-title{
-  font-size: 14px;
-}
-
-.project-details a:hover {
-  text-decoration: underline;
-}
-
-
-.certifications {
-  margin-top: 20px;
-}
-
-
-
-.certifications .section-title {
-  font-size: 14px;
-  font-weight: bold;
-  text-transform: uppercase;
-  margin-bottom: 10px;
-  color: #333;
-}
-
-.certification-item {
-  margin-bottom: 15px;
-}
-
-.certification-item h4 {
-  font-size: 13.5px;
-  font-weight: bold;
-  margin-bottom: 3px;
-  color: #111;
-}
-
-.cert-details {
-  font-size: 12px;
-  color: #777;
-  font-style: italic;
-}
-
-
-.cert-details .date {
-  font-style: normal;
-  color: #333;
-}
-
-ul {
-  list-style-type: none;
-  padding-left: 0;
-  margin: 5px 0;
-}
-
-li {
-  font-size: 12px;
-  margin-bottom: 5px;
-  position: relative;
-  padding-left: 15px;
-}
-
-li::before {
-  content: "•";
-  position: absolute;
-  left: 0;
-  color: #333;
-  font-size: 12px;
-}
-
-/* Footer */
-.interests {
-  margin-top: 20px;
-}
-
-.interests-list {
-  list-style: none;
-  padding-left: 0;
-  margin-top: 10px;
-}
-
-.interest-item {
-  display: flex;
-  align-items: flex-start;
-  gap: 10px;
-  margin-bottom: 10px;
-}
-
-
-
-.interest-text {
-  font-size: 12px;
-  color: #333;
-}
-
-.languages {
-  margin-top: 20px;
-}
-
-.languages-list {
-  list-style: none;
-  padding-left: 0;
-  margin-top: 10px;
-}
-
-.language-item {
-  display: flex;
-  align-items: flex-start;
-  gap: 10px;
-  margin-bottom: 10px;
-}
-
-
-
-.language-text {
-  font-size: 12px;
-  color: #333;
-}
-
-.capitalize{
-  text-transform: capitalize;
-}
-             
-                                   
-                                   """)
-                
-            elif template_id == "template5":
-                page.add_style_tag(content="""
-                
-                
-
-
-
-
-.resume-container {
-width: 170mm;
-  margin: 0 auto;
-    min-height: 297mm;
-  background-color: white;
-  color: #333;
-  box-sizing: border-box;
-}
-
-.resume-inner {
-  padding: 10mm;  /* reliable in PDF */
-  box-sizing: border-box;
-}
-/* Header */
-.resume-header {
-  text-align: center;
-  margin-bottom: 20px;
-}
-
-.resume-header h1 {
-  font-size: 24px;
-  font-weight: bold;
-  color: #0072ce;
-}
-
-.resume-header h2 {
-  font-size: 16px;
-  font-weight: normal;
-  margin-top: 4px;
-}
-
-.contact-info {
-  font-size: 13px;
-  margin-top: 8px;
-  color: #444;
-}
-
-.contact-info span:not(:last-child)::after {
-  content: "\2022";
-  margin: 0 8px;
-}
-
-/* Section */
-.resume-section {
-  margin-top: 20px;
-}
-
-.section-title {
-  font-size: 14px;
-  font-weight: bold;
-  text-transform: uppercase;
-  margin-bottom: 10px;
-  border-bottom: 1px solid #ccc;
-  padding-bottom: 4px;
-  color: #0072ce;
-
-}
-
-.summary-section {
-  margin-top: 20px;
-  margin-bottom: 14px;
-  padding-bottom: 10px;
-}
-
-.section-title-centered {
-  text-align: center;
-  font-size: 14px;
-  font-weight: 600;
-  color: #1e90ff; /* blue color */
-  border-bottom: 1px solid #1e90ff;
-  /* padding-bottom: 6px; */
-  margin-bottom: 10px;
-}
-
-
-.summary-text {
-  font-size: 12px;
-  color: #333;
-}
-
-
-/* Achievements Grid */
-.achievements{
-    margin-bottom: 14px;
-}
-
-.achievements-grid {
-  display: grid;
-  grid-template-columns: repeat(3, 1fr);
-  gap: 20px;
-}
-
-.achievement-box {
-  font-size: 12px;
-}
-
-.achievement-title {
-  font-size: 12px;
-  font-weight: 600;
-  color: #1e90ff;
-  margin-bottom: 4px;
-}
-
-.achievement-desc {
-  font-size: 12px;
-  color: #333;
-  line-height: 1.4;
-}
-/* Experience */
-.experience-section {
-  margin-bottom: 20px;
-}
-
-.experience-item {
-  margin-bottom: 20px;
-}
-
-.experience-header {
-  display: flex;
-  justify-content: space-between;
-  align-items: flex-start;
-  margin-bottom: 5px;
-}
-
-.left-info .company {
-  font-weight: bold;
-  font-size: 14px;
-  color: #333;
-}
-
-.left-info .job-title {
-  font-size: 13px;
-  font-weight: 500;
-  color: #1e90ff;
-}
-
-.right-info {
-  text-align: right;
-  font-size: 12px;
-  color: #444;
-}
-
-.experience-details {
-  list-style-type: disc;
-  margin-top: 5px;
-}
-
-.experience-details li {
-  font-size: 13px;
-  margin-bottom: 5px;
-  line-height: 1.5;
-    list-style-type: none;
-}
-
-
-/* Education */
-.education-list {
-  display: flex;
-  flex-direction: column;
-  gap: 20px;
-}
-
-.education-item {
-  display: flex;
-  justify-content: space-between;
-  align-items: flex-start;
-}
-
-.edu-left {
-  max-width: 70%;
-}
-
-.edu-school {
-  font-size: 13px;
-  font-weight: 600;
-  color: #000;
-  /* margin-bottom: 2px; */
-}
-
-.template5-edu-degree {
-  font-size: 13px;
-   margin: 0; /* Remove default margins */
-  line-height: 0.9; /* Consistent line height */
-}
-
-.edu-right {
-  text-align: right;
-  font-size: 12px;
-  color: #555;
-  display: flex;
-  flex-direction: column;
-  align-items: flex-end; /* Right-align the content */
-}
-
-.edu-location {
-  margin-bottom: 2px;
-}
-
-.template5-edu-dates {
-    font-size: 13px;
-  margin: 0;
-   line-height: 1.5;
-}
-
-/* skill section */
-.skills-section {
-  margin-bottom: 20px;
-}
-
-.skills-inline {
-  font-size: 13px;
-  color: #333;
-  line-height: 1;
-  display: flex;
-  flex-wrap: wrap;
-  gap: 5px; /* space between skill groups */
-}
-
-.dot-separator {
-  font-weight: bold;
-  color: #333; /* darker dot */
-  margin: 0 6px;
-}
-
-
-/* languages */
-.language-section {
-  margin-top: 20px;
-}
-
-.language-list {
-  display: grid;
-  grid-template-columns: repeat(3, 1fr); /* 3 columns */
-  gap: 0 10rem;
-}
-
-.language-item {
- 
-  padding: 0.2rem 1rem;
-
-  font-size: 13px;
-  color: #1f2937; /* text-gray-800 */
-  text-align: center;
-  font-weight: 500;
-}
-
-
-/* interest section */
-
-/* Interest Section */
-.interest-section {
-  margin-top: 20px;
-}
-
-.interest-list {
-  display: grid;
-  grid-template-columns: repeat(3, 1fr);
-  gap: 0;
-}
-
-
-.interest-item {
-  display: flex;
-  align-items: flex-start;
-  padding: 0 8px;
-  color: #1f2937;
-  font-size: 13px;
-  line-height: 1;
-}
-
-.bullet-dot {
-  width: 3px;
-  height: 3px;
-  margin-right: 6px;
-  margin-top: 6px;
-  background-color: #007bff;
-  border-radius: 50%;
-  display: inline-block;
-  flex-shrink: 0;
-}
-
-
-/* Certification Section */
-.certification-section {
-  margin-top: 20px;
-  margin-bottom: 14px;
-}
-
-.certification-list {
-  display: flex;
-  flex-direction: column;
-  padding: 0 8px;
-}
-
-.certification-item {
-  font-size: 12px;
-  color: #333;
-  line-height: 1;
-}
- """)
-                
-            elif template_id == "template6":
-                page.add_style_tag(content="""
-
-body{
-  margin:0;
-  padding:0;
-}
-
-.resume-inner {
-  padding: 7mm;  /* reliable in PDF */
-  box-sizing: border-box;
-}
-
-
-.template6-resume {
-    width: 170mm;
-  min-height: 297mm;
-  margin: 0 auto;
-  font-family: Arial, sans-serif;
-  color: #333;
-    box-sizing: border-box;
-}
-
-/* HEADER */
-.template6-header {
-  background-color: #e94b35;
-  color: white;
-  text-align: center;
-    padding: 20px;
-}
-
-.template6-header h1 {
-  margin: 0;
-  font-size: 24px;
-  font-weight: bold;
-  text-transform: uppercase;
-}
-
-.template6-contact-info {
-  font-size: 12px;
-  margin-top: 8px;
-}
-
-.template6-contact-info span {
-  margin: 0 6px;
-}
-
-/* SECTION LAYOUT */
-
-.template6-summary-section {
-  display: flex;
-  align-items: flex-start;  
-  border-bottom: 1px solid #ddd;
-  padding: 15px 0;
-}
-
-.template6-summary-left {
-  width: 40mm;
-  font-weight: bold;
-  color: #e94b35;
-  font-size: 13px;
-  text-transform: uppercase;
-}
-
-.template6-summary-right {
-  flex:1;
-}
-
-.template6-summary-right p {
-  margin: 0;
-  line-height: 1;
-  text-align: justify;
-  font-size: 13px;
-}
-
-.template6-section {
-  display: flex;
-  align-items: flex-start;  
-  border-bottom: 1px solid #ddd;
-  padding: 15px 0;
-}
-
-.template6-section:last-child {
-  border-bottom: none;
-}
-
-.template6-left {
-  width: 40mm;        
-  min-width: 40mm;
-  font-weight: bold;
-  color: #e94b35;
-  font-size: 13px;
-  text-transform: uppercase;  
-}
-
-
-
-.template6-right {
-  flex:1;
-  font-size: 13px;
-  
-}
-
-/* EXPERIENCE */
-.template6-projects .template6-experience {
-  margin-bottom: 15px;
-}
-
-.template6-job-header {
-  display: flex;
-  justify-content: space-between;
-  font-size: 13px;
-  font-weight: bold;
-}
-
-.template6-date {
-  font-weight: normal;
-  font-size:10px;
-}
-
-.template6-projects .template6-company {
-  font-style: italic;
-  font-size: 13px;
-  margin-bottom: 6px;
-}
-
-.template6-experience ul {
-  margin: 0;
-}
-
-.template6-experience li {
-  font-size: 12px;
-  margin-bottom: 4px;
-}
-
-/* SKILLS */
-.template6-skills-grid {
-  display: grid;
-  grid-template-columns: 1fr 1fr;
-  font-size: 12px;
-}
-
-.template6-skill-item {
-  margin-bottom: 4px;
-}
-
-/* EDUCATION */
-.template6-education-degree {
-  font-weight: bold;
-  font-size: 13px;
-}
-
-.template6-school {
-  font-style: italic;
-  font-size: 12px;
-}
-
-
-/* certificaton section style  */
-/* CERTIFICATIONS */
-.template6-certification {
-  font-size: 13px;
-  margin-bottom: 6px;
-}
-
-.template6-certification:last-child {
-  margin-bottom: 0;
-}
-
-/* achievement section */
-/* ACHIEVEMENTS */
-.template6-achievement {
-  margin-bottom: 10px;
-  font-size: 13px;
-}
-
-.template6-achievement-title {
-  font-weight: bold;
-  margin-bottom: 3px;
-}
-
-.template6-achievement-desc {
-  font-size: 12px;
-  color: #555;
-  margin-left: 10px;
-}
-
-
-    """)
-
-            pdf_options = {
-    "path": output_path,
-    "format": "A4",
-    "print_background": True,
-    "margin": {
-        "top": "0mm",    # Increased from 0 to 10mm
-        "right": "0mm",  # Added right margin
-        "bottom": "0mm", # Added bottom margin
-        "left": "0mm"    # Added left margin
-    },
-     # This ensures CSS @page rules are respected
-}
-            
-            page.pdf(**pdf_options)
-            browser.close()
-
-        response = send_file(output_path, as_attachment=True, download_name="resume.pdf")
-        def remove_file():
-            if os.path.exists(output_path):
-                os.remove(output_path)
-        import threading
-        threading.Timer(5.0, remove_file).start()
-        return response
+
+        # Rendered straight to memory: no temp file, no cleanup thread
+        pdf_bytes = render_pdf(html_content, template_id)
+
+        return send_file(
+            BytesIO(pdf_bytes),
+            as_attachment=True,
+            download_name="resume.pdf",
+            mimetype="application/pdf"
+        )
 
     except Exception as e:
         print(f"Error details: {str(e)}")
-        return {"message": f"PDF generation failed: {str(e)}"}, 500
\ No newline at end of file
+        return {"message": f"PDF generation failed: {str(e)}"}, 500
+
+@resume_bp.route('/download_pdf/<resume_id>', methods=['GET'])
+@token_required
+def download_saved_resume_pdf(current_user, resume_id):
+    """Render a saved resume server-side from its stored content."""
+    try:
+        resume = Resume.get_resume_by_id(resume_id)
+        if not resume or resume.get("user_id") != str(current_user["_id"]):
+            return jsonify({'error': 'Resume not found'}), 404
+
+        template_id = request.args.get("template") or resume.get("template") or DEFAULT_TEMPLATE
+        if not has_resume_template(template_id):
+            return jsonify({'error': f'Unknown template: {template_id}'}), 400
+
+        pdf_bytes = render_resume_pdf(resume.get("content"), template_id)
+
+        return send_file(
+            BytesIO(pdf_bytes),
+            as_attachment=True,
+            download_name="resume.pdf",
+            mimetype="application/pdf"
+        )
+
+    except Exception as e:
+        print(f"Error details: {str(e)}")
+        return {"message": f"PDF generation failed: {str(e)}"}, 500
+
+
+@resume_bp.route('/pdf-jobs', methods=['POST'])
+def create_pdf_job():
+    data = request.get_json()
+    html_content = data.get("html") if data else None
+    template_id = data.get("template") if data else None
+
+    if not html_content or not template_id:
+        return jsonify({"error": "html and template are required"}), 400
+
+    jobs = get_pdf_job_queue()
+    try:
+        job_id = jobs.submit(html_content, template_id)
+    except QueueFullError as e:
+        response = jsonify({"error": str(e), "queue_depth": jobs.depth()})
+        response.headers["Retry-After"] = "5"
+        return response, 429
+
+    return jsonify({"job_id": job_id, "status": "queued", "queue_depth": jobs.depth()}), 202
+
+
+@resume_bp.route('/pdf-jobs/<job_id>', methods=['GET'])
+def get_pdf_job(job_id):
+    job = get_pdf_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    timings = job_timings(job)
+    if job["status"] == "done":
+        response = send_file(
+            BytesIO(job["pdf"]),
+            as_attachment=True,
+            download_name="resume.pdf",
+            mimetype="application/pdf"
+        )
+        response.headers["X-Queue-Time-Ms"] = str(timings["queue_ms"])
+        response.headers["X-Render-Time-Ms"] = str(timings["render_ms"])
+        return response
+
+    body = {"job_id": job_id, "status": job["status"], **timings}
+    if job["status"] == "failed":
+        body["error"] = job["error"]
+        return jsonify(body), 500
+    return jsonify(body), 200
@@ -0,0 +1,193 @@
+import base64
+import hashlib
+import mimetypes
+import os
+import re
+
+import requests
+from flask import current_app
+
+# Pages resolve every asset against this host; the browser never reaches it,
+# requests to it are answered from local disk by AssetInliner.handle_route.
+ASSET_HOST = "http://pdf-assets.local"
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+FONTS_DIR = os.path.join(BACKEND_DIR, "fonts")
+
+# family -> [(file, weight, style)] for the fonts shipped in backend/fonts
+LOCAL_FONTS = {
+    "Arial": [
+        ("arial.ttf", "normal", "normal"),
+        ("arialbd.ttf", "bold", "normal"),
+        ("ariali.ttf", "normal", "italic"),
+        ("arialbi.ttf", "bold", "italic"),
+    ],
+    "Arial Narrow": [
+        ("ARIALN.TTF", "normal", "normal"),
+        ("ARIALNB.TTF", "bold", "normal"),
+        ("ARIALNI.TTF", "normal", "italic"),
+        ("ARIALNBI.TTF", "bold", "italic"),
+    ],
+    "Arial Black": [
+        ("ariblk.ttf", "normal", "normal"),
+    ],
+}
+
+# Remote assets at or under this size are embedded as data URIs
+DATA_URI_MAX_BYTES = 64 * 1024
+
+# 1x1 transparent GIF used for images that are not available offline
+BLANK_IMAGE = "data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7"
+
+_LINK_TAG_RE = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+_HREF_RE = re.compile(r"""href\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+_SRC_RE = re.compile(r"""(<(?:img|source)\b[^>]*?\bsrc\s*=\s*)(["'])(https?:)?(//[^"']+)\2""", re.IGNORECASE)
+_CSS_URL_RE = re.compile(r"""url\(\s*(["']?)(https?:)?(//[^"')]+)\1\s*\)""", re.IGNORECASE)
+_IMPORT_RE = re.compile(r"""@import\s+(?:url\()?\s*["']?(?:https?:)?//[^;]+;""", re.IGNORECASE)
+
+
+def local_font_css():
+    """@font-face rules that point the bundled fonts at the local asset host."""
+    rules = []
+    for family, faces in LOCAL_FONTS.items():
+        for filename, weight, style in faces:
+            rules.append(
+                f"@font-face{{font-family:'{family}';src:url('{ASSET_HOST}/fonts/{filename}');"
+                f"font-weight:{weight};font-style:{style}}}"
+            )
+    return "".join(rules)
+
+
+class AssetInliner:
+    """Rewrites external references in resume HTML to locally cached copies.
+
+    Small assets become data URIs, larger ones are served from ``cache_dir``
+    through the page's request interception. With ``fetch_missing`` off
+    (air-gapped deployments) uncached remote assets are dropped instead of
+    fetched, so a render never waits on the network.
+    """
+
+    def __init__(self, cache_dir, fetch_missing=False, fetch_timeout=5.0):
+        self.cache_dir = cache_dir
+        self.fetch_missing = fetch_missing
+        self.fetch_timeout = fetch_timeout
+        self._fonts = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _cache_name(self, url):
+        ext = os.path.splitext(url.split("?", 1)[0])[1][:8]
+        return hashlib.sha256(url.encode("utf-8")).hexdigest() + ext
+
+    def _cached(self, url):
+        path = os.path.join(self.cache_dir, self._cache_name(url))
+        if not os.path.exists(path) and self.fetch_missing:
+            try:
+                resp = requests.get(url, timeout=self.fetch_timeout)
+                resp.raise_for_status()
+            except requests.RequestException as e:
+                print(f"[assets] could not fetch {url}: {e}")
+                return None
+            with open(path, "wb") as f:
+                f.write(resp.content)
+        return path if os.path.exists(path) else None
+
+    def _local_url(self, url):
+        path = self._cached(url)
+        if path is None:
+            return None
+        size = os.path.getsize(path)
+        if size > DATA_URI_MAX_BYTES:
+            return f"{ASSET_HOST}/cache/{os.path.basename(path)}"
+        mime = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        with open(path, "rb") as f:
+            return f"data:{mime};base64,{base64.b64encode(f.read()).decode('ascii')}"
+
+    def _rewrite_css(self, css):
+        css = _IMPORT_RE.sub("", css)
+
+        def replace(match):
+            local = self._local_url((match.group(2) or "https:") + match.group(3))
+            return f"url('{local}')" if local else "url('')"
+
+        return _CSS_URL_RE.sub(replace, css)
+
+    def _rewrite_link(self, match):
+        tag = match.group(0)
+        href = _HREF_RE.search(tag)
+        if not href or not re.match(r"(https?:)?//", href.group(1)) or "stylesheet" not in tag.lower():
+            return tag
+        url = href.group(1)
+        path = self._cached("https:" + url if url.startswith("//") else url)
+        if path is None:
+            # Typically a web-font stylesheet; the bundled fonts cover it
+            return ""
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            return f"<style>{self._rewrite_css(f.read())}</style>"
+
+    def inline(self, html):
+        html = _LINK_TAG_RE.sub(self._rewrite_link, html)
+
+        def replace_src(match):
+            scheme = match.group(3) or "https:"
+            local = self._local_url(scheme + match.group(4))
+            return f"{match.group(1)}{match.group(2)}{local or BLANK_IMAGE}{match.group(2)}"
+
+        html = _SRC_RE.sub(replace_src, html)
+        # Covers <style> blocks and style="" attributes alike
+        return self._rewrite_css(html)
+
+    def resolve(self, url):
+        """Map an asset-host URL to ``(body, content_type)``, or None."""
+        if not url.startswith(ASSET_HOST + "/"):
+            return None
+        kind, _, name = url[len(ASSET_HOST) + 1:].partition("/")
+        if kind == "fonts":
+            # A handful of files requested by every render: keep them in memory
+            if name not in self._fonts:
+                path = os.path.join(FONTS_DIR, os.path.basename(name))
+                if not os.path.isfile(path):
+                    return None
+                with open(path, "rb") as f:
+                    self._fonts[name] = (f.read(), "font/ttf")
+            return self._fonts[name]
+        if kind == "cache":
+            base = self.cache_dir
+        else:
+            return None
+        path = os.path.join(base, os.path.basename(name))
+        if not os.path.isfile(path):
+            return None
+        with open(path, "rb") as f:
+            body = f.read()
+        return body, mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+    def install(self, page):
+        page.route("**/*", self.handle_route)
+
+    def handle_route(self, route):
+        """Playwright route handler: serve local assets, block everything else."""
+        asset = self.resolve(route.request.url)
+        if asset is None:
+            route.abort()
+        else:
+            route.fulfill(status=200, body=asset[0], content_type=asset[1])
+
+    async def handle_route_async(self, route):
+        asset = self.resolve(route.request.url)
+        if asset is None:
+            await route.abort()
+        else:
+            await route.fulfill(status=200, body=asset[0], content_type=asset[1])
+
+
+_inliner = None
+
+
+def get_asset_inliner():
+    global _inliner
+    if _inliner is None:
+        _inliner = AssetInliner(
+            cache_dir=current_app.config.get('PDF_ASSET_CACHE_DIR', 'asset_cache'),
+            fetch_missing=current_app.config.get('PDF_ASSET_FETCH', False),
+        )
+    return _inliner
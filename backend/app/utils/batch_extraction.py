@@ -0,0 +1,159 @@
+import hashlib
+import io
+import time
+import zipfile
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app
+from werkzeug.utils import secure_filename
+
+from app.models.resume_layout import ResumeLayout
+from app.utils.layout_extraction import cached_layout, extract_layout_bytes, layout_text
+from app.utils.pdf_extraction import get_extraction_pool, reset_extraction_pool
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+
+def _zip_members(name, data, max_file_size):
+    """Yield ``(filename, data, error)`` for the resumes inside an uploaded ZIP."""
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile:
+        yield name, None, "Not a valid ZIP archive."
+        return
+    with archive:
+        for info in archive.infolist():
+            member = info.filename
+            base = member.rsplit("/", 1)[-1]
+            if info.is_dir() or member.startswith("__MACOSX/") or base.startswith("."):
+                continue
+            label = f"{name}/{member}"
+            if not base.lower().endswith(SUPPORTED_EXTENSIONS):
+                yield label, None, "Unsupported file type; upload a .pdf, .docx or .txt file."
+                continue
+            if info.file_size > max_file_size:
+                yield label, None, f"File is over the {max_file_size // (1024 * 1024)} MB limit."
+                continue
+            with archive.open(info) as f:
+                # Sizes in the ZIP directory can lie
+                data = f.read(max_file_size + 1)
+            if len(data) > max_file_size:
+                yield label, None, f"File is over the {max_file_size // (1024 * 1024)} MB limit."
+                continue
+            yield label, data, None
+
+
+def read_uploads(files):
+    """``[(filename, bytes)]`` for uploaded files.
+
+    The request closes its upload streams once the view returns, before a
+    streamed response body runs, so batch uploads are read up front.
+    """
+    uploads = []
+    for file_storage in files:
+        file_storage.seek(0)
+        uploads.append((secure_filename(file_storage.filename or "") or "upload", file_storage.read()))
+    return uploads
+
+
+def iter_batch_files(uploads, max_files, max_file_size):
+    """Yield ``(filename, data, error)`` for each uploaded resume, expanding ZIPs.
+
+    Files past ``max_files`` are reported once as an error and not read.
+    """
+    count = 0
+    for name, data in uploads:
+        if name.lower().endswith(".zip"):
+            entries = _zip_members(name, data, max_file_size)
+        elif name.lower().endswith(SUPPORTED_EXTENSIONS):
+            error = None
+            if len(data) > max_file_size:
+                data, error = None, f"File is over the {max_file_size // (1024 * 1024)} MB limit."
+            entries = [(name, data, error)]
+        else:
+            entries = [(name, None, "Unsupported file type; upload a .pdf, .docx, .txt or .zip file.")]
+        for entry in entries:
+            count += 1
+            if count > max_files:
+                yield entry[0], None, f"Batch limit of {max_files} files reached; the rest were skipped."
+                return
+            yield entry
+
+
+def _result(filename, file_hash, layout, seconds, cached):
+    return {
+        "filename": filename,
+        "resume_hash": file_hash,
+        "text": layout_text(layout),
+        "lines": len(layout["text"]),
+        "cached": cached,
+        "ms": round(seconds * 1000, 1),
+    }
+
+
+def extract_batch(uploads):
+    """Extract many uploads (see ``read_uploads``) concurrently, yielding one result dict per file as it completes.
+
+    Layouts already stored for a file's hash are returned straight away.
+    The rest are extracted whole-file in the extraction process pool, one
+    task per file, so throughput scales with ``PDF_EXTRACT_WORKERS``; new
+    layouts are stored as their results come back. Failures become
+    ``{"filename", "error", "ms"}`` entries and do not stop the batch.
+    """
+    config = current_app.config
+    limits = (config.get('EXTRACT_MAX_PAGES'), config.get('PDF_MAX_PAGES'))
+    pool = get_extraction_pool()
+
+    # Identical files in one batch share a single extraction
+    pending = {}
+    try:
+        for filename, data, error in iter_batch_files(
+            uploads, config.get('EXTRACT_BATCH_MAX_FILES', 200), config['MAX_CONTENT_LENGTH']
+        ):
+            if error is not None:
+                yield {"filename": filename, "error": error, "ms": 0}
+                continue
+            started = time.perf_counter()
+            file_hash = hashlib.sha256(data).hexdigest()
+            if file_hash in pending:
+                pending[file_hash][2].append(filename)
+                continue
+            layout = cached_layout(file_hash)
+            if layout is not None:
+                yield _result(filename, file_hash, layout, time.perf_counter() - started, True)
+                continue
+            try:
+                future = pool.submit(extract_layout_bytes, data, filename, *limits)
+            except Exception as e:
+                # Pool broken or shut down: report this file and carry on with the next pool
+                print(f"[extract-batch] could not queue {filename}: {e}")
+                reset_extraction_pool()
+                pool = get_extraction_pool()
+                yield {"filename": filename, "error": str(e), "ms": 0}
+                continue
+            pending[file_hash] = (future, data, [filename])
+
+        futures = {future: file_hash for file_hash, (future, _, _) in pending.items()}
+        for future in as_completed(futures):
+            file_hash = futures[future]
+            _, data, filenames = pending.pop(file_hash)
+            try:
+                try:
+                    layout, seconds = future.result()
+                except BrokenProcessPool as e:
+                    # A worker died; finish this file here and start a new pool next time
+                    print(f"[extract-batch] process pool broken, extracting {filenames[0]} inline: {e}")
+                    reset_extraction_pool()
+                    layout, seconds = extract_layout_bytes(data, filenames[0], *limits)
+            except Exception as e:
+                for filename in filenames:
+                    yield {"filename": filename, "error": str(e), "ms": 0}
+                continue
+            ResumeLayout.save_layout(file_hash, layout)
+            for i, filename in enumerate(filenames):
+                yield _result(filename, file_hash, layout, seconds, i > 0)
+    finally:
+        # Client went away: drop files not yet started
+        for future, _, _ in pending.values():
+            future.cancel()
@@ -0,0 +1,169 @@
+import atexit
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from flask import current_app
+from playwright.sync_api import sync_playwright
+
+from app.utils.asset_inliner import get_asset_inliner
+
+
+class _BrowserWorker(threading.Thread):
+    """Owns one headless Chromium and a pre-opened page.
+
+    Playwright's sync API is bound to the thread that started it, so every
+    browser lives on its own worker thread and renders are handed to it
+    through the pool's task queue.
+    """
+
+    def __init__(self, tasks, max_renders, name, on_new_page=None):
+        super().__init__(name=name, daemon=True)
+        self._tasks = tasks
+        self._max_renders = max_renders
+        self._on_new_page = on_new_page
+        self._playwright = None
+        self._browser = None
+        self._page = None
+        self.renders = 0
+        self.recycles = 0
+        self.busy = False
+
+    def run(self):
+        with sync_playwright() as p:
+            self._playwright = p
+            try:
+                self._launch()
+            except Exception as e:
+                print(f"[browser-pool] {self.name} warm start failed: {e}")
+
+            while True:
+                task = self._tasks.get()
+                if task is None:
+                    break
+                fn, future = task
+                if not future.set_running_or_notify_cancel():
+                    continue
+                self.busy = True
+                try:
+                    page = self._checkout_page()
+                    result = fn(page)
+                except Exception as e:
+                    future.set_exception(e)
+                    if not self._is_healthy():
+                        self._discard()
+                else:
+                    future.set_result(result)
+                    self.renders += 1
+                    if self.renders >= self._max_renders:
+                        self._discard()
+                finally:
+                    self.busy = False
+
+            self._discard()
+
+    def _launch(self):
+        self._browser = self._playwright.chromium.launch(headless=True)
+        self._page = self._browser.new_page()
+        if self._on_new_page is not None:
+            self._on_new_page(self._page)
+        self.renders = 0
+
+    def _is_healthy(self):
+        return (
+            self._browser is not None
+            and self._browser.is_connected()
+            and self._page is not None
+            and not self._page.is_closed()
+        )
+
+    def _checkout_page(self):
+        # Health check before every render: a crashed or recycled browser
+        # is replaced here rather than failing the request.
+        if not self._is_healthy():
+            self._discard()
+            self._launch()
+        return self._page
+
+    def _discard(self):
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except Exception:
+                pass
+            self.recycles += 1
+        self._browser = None
+        self._page = None
+
+
+class BrowserPool:
+    """A fixed set of warm headless browsers shared by all PDF renders.
+
+    ``run(fn)`` borrows a page, calls ``fn(page)`` on the browser's own
+    thread and returns its result. Browsers are health-checked before each
+    render and recycled after ``max_renders`` renders.
+    """
+
+    def __init__(self, size=2, max_renders=100, render_timeout=60.0, on_new_page=None):
+        self.size = size
+        self.render_timeout = render_timeout
+        self._tasks = queue.Queue()
+        self._workers = [
+            _BrowserWorker(self._tasks, max_renders, name=f"pdf-browser-{i}", on_new_page=on_new_page)
+            for i in range(size)
+        ]
+        for worker in self._workers:
+            worker.start()
+        self._closed = False
+
+    def run(self, fn, timeout=None):
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+        future = Future()
+        self._tasks.put((fn, future))
+        try:
+            result = future.result(timeout=timeout or self.render_timeout)
+        except FutureTimeoutError:
+            # Still queued: drop it so it doesn't take a browser after the caller gave up
+            future.cancel()
+            raise
+        return result
+
+    def stats(self):
+        return {
+            "size": self.size,
+            "queued": self._tasks.qsize(),
+            "busy": sum(1 for w in self._workers if w.busy),
+            "renders": sum(w.renders for w in self._workers),
+            "recycles": sum(w.recycles for w in self._workers),
+        }
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            self._tasks.put(None)
+        for worker in self._workers:
+            worker.join(timeout=5)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """Return the process-wide browser pool, starting it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = BrowserPool(
+                    size=current_app.config.get('PDF_POOL_SIZE', 2),
+                    max_renders=current_app.config.get('PDF_POOL_MAX_RENDERS', 100),
+                    render_timeout=current_app.config.get('PDF_RENDER_TIMEOUT', 60.0),
+                    # Pages only ever load assets from local disk
+                    on_new_page=get_asset_inliner().install,
+                )
+                atexit.register(_pool.close)
+    return _pool
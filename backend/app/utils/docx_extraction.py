@@ -0,0 +1,157 @@
+import re
+import zipfile
+
+from lxml import etree
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+P, R, T, TAB, BR, CR = (W + tag for tag in ("p", "r", "t", "tab", "br", "cr"))
+TBL, BODY = W + "tbl", W + "body"
+
+_PART_RE = re.compile(r"word/(header|footer)(\d*)\.xml$")
+_OFF = ("0", "false", "off")
+
+
+def _val(elem, name):
+    return elem.get(W + name) if elem is not None else None
+
+
+def _run_format(rpr):
+    """``(size in pt, bold)`` set directly on a run or style; ``None`` when unset."""
+    if rpr is None:
+        return None, None
+    sz = _val(rpr.find(W + "sz"), "val")
+    b = rpr.find(W + "b")
+    bold = None if b is None else _val(b, "val") not in _OFF
+    return (int(sz) / 2 if sz and sz.isdigit() else None), bold
+
+
+def _paragraph_styles(archive):
+    """``{styleId: (name, size, bold)}`` for paragraph styles, inheritance resolved.
+
+    The document's default paragraph style is also stored under ``None``.
+    """
+    try:
+        root = etree.fromstring(archive.read("word/styles.xml"), _parser())
+    except KeyError:
+        return {}
+    default_size, _ = _run_format(root.find(f"{W}docDefaults/{W}rPrDefault/{W}rPr"))
+
+    raw = {}
+    for style in root.iter(W + "style"):
+        if style.get(W + "type") != "paragraph":
+            continue
+        size, bold = _run_format(style.find(W + "rPr"))
+        if style.get(W + "default") in ("1", "true"):
+            # Paragraphs without a w:pStyle use this one
+            raw[None] = (_val(style.find(W + "name"), "val"), style.get(W + "styleId"), None, None)
+        raw[style.get(W + "styleId")] = (
+            _val(style.find(W + "name"), "val"), _val(style.find(W + "basedOn"), "val"), size, bold
+        )
+
+    def resolve(style_id, seen=()):
+        name, based_on, size, bold = raw[style_id]
+        if based_on in raw and based_on not in seen and (size is None or bold is None):
+            _, parent_size, parent_bold = resolve(based_on, seen + (style_id,))
+            size = parent_size if size is None else size
+            bold = parent_bold if bold is None else bold
+        return name, size, bold
+
+    styles = {}
+    for style_id in raw:
+        name, size, bold = resolve(style_id)
+        styles[style_id] = (name, size or default_size, bool(bold))
+    return styles
+
+
+def _parser():
+    # No DTDs or entity expansion in untrusted uploads
+    return etree.XMLParser(resolve_entities=False, no_network=True)
+
+
+def _paragraph(p, styles):
+    """``(text, size, bold, style name)`` of a ``w:p`` whose nested paragraphs are already cleared."""
+    style_id = _val(p.find(f"{W}pPr/{W}pStyle"), "val")
+    style_name, style_size, style_bold = styles.get(style_id, (None, None, False))
+
+    parts, sizes, bold = [], [], False
+    for r in p.iter(R):
+        text = "".join(
+            node.text or "" if node.tag == T else "\t" if node.tag == TAB else "\n"
+            for node in r.iter(T, TAB, BR, CR)
+        )
+        if not text:
+            continue
+        parts.append(text)
+        if not text.strip():
+            continue
+        run_size, run_bold = _run_format(r.find(W + "rPr"))
+        if run_size:
+            sizes.append(run_size)
+        bold = bold or (style_bold if run_bold is None else run_bold)
+    text = "".join(parts).strip()
+    return text, max(sizes) if sizes else style_size, bold, style_name
+
+
+def _iter_part(archive, name, styles):
+    """Stream the paragraphs of one XML part in document order.
+
+    Paragraphs nested in table cells and text boxes end before their
+    container, so each comes out once, in reading order. Every paragraph is
+    cleared once read, and finished top-level blocks are dropped from the
+    partial tree, so memory stays flat however long the document is.
+    """
+    with archive.open(name) as part:
+        for _, elem in etree.iterparse(
+            part, events=("end",), tag=(P, TBL), resolve_entities=False, no_network=True
+        ):
+            if elem.tag == P and next(elem.iterancestors(MC_FALLBACK), None) is None:
+                # (mc:Fallback repeats the text box content of its mc:Choice)
+                row = _paragraph(elem, styles)
+                if row[0]:
+                    yield row
+            parent = elem.getparent()
+            if parent is None or parent.tag != BODY:
+                if elem.tag == P:
+                    elem.clear(keep_tail=True)
+                continue
+            elem.clear(keep_tail=True)
+            while elem.getprevious() is not None:
+                del parent[0]
+
+
+def _side_parts(archive, kind):
+    names = [n for n in archive.namelist() if (m := _PART_RE.match(n)) and m.group(1) == kind]
+    return sorted(names, key=lambda n: int(_PART_RE.match(n).group(2) or 0))
+
+
+def docx_paragraphs(source):
+    """Yield ``(text, size, bold, style, part)`` for every paragraph of a .docx.
+
+    Reads the raw WordprocessingML rather than building a python-docx
+    object model: headers first, then the body (including table cells and
+    text boxes), then footers. ``part`` is ``"header"``, ``"footer"`` or
+    ``None`` for the body. Header and footer lines repeated across
+    first/even/default variants are yielded once. ``source`` is a path or
+    binary file object; stop iterating to stop reading.
+    """
+    with zipfile.ZipFile(source) as archive:
+        styles = _paragraph_styles(archive)
+        for kind in ("header", None, "footer"):
+            if kind is None:
+                for row in _iter_part(archive, "word/document.xml", styles):
+                    yield row + (None,)
+                continue
+            seen = set()
+            for name in _side_parts(archive, kind):
+                for row in _iter_part(archive, name, styles):
+                    if row[0] not in seen:
+                        seen.add(row[0])
+                        yield row + (kind,)
+
+
+def docx_text_lines(source):
+    """Text of every paragraph of a .docx, in reading order."""
+    for text, *_ in docx_paragraphs(source):
+        yield text
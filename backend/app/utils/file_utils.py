@@ -47,31 +47,33 @@
 
 
 
-import fitz
-import docx
 from werkzeug.utils import secure_filename
 import json
-from thefuzz import fuzz
 import re # Added for a more robust JSON extraction
+from contextlib import closing
+from app.utils.docx_extraction import docx_text_lines
+from app.utils.pdf_extraction import extract_pdf_pages, take_chars
+from app.utils.upload_pipeline import docx_source
 
-def extract_text_builder(file, filename):
+def extract_text_builder(file, filename, max_pages=None, max_chars=None):
     filename = filename.lower()
     if filename.endswith(".pdf"):
-        doc = fitz.open(stream=file.read(), filetype="pdf")
-        return " ".join(page.get_text() for page in doc)
+        return " ".join(extract_pdf_pages(file, max_pages, max_chars))
     elif filename.endswith(".docx"):
-        return "\n".join(para.text for para in docx.Document(file).paragraphs)
+        with closing(docx_text_lines(docx_source(file))) as lines:
+            return "\n".join(take_chars(lines, max_chars))
     elif filename.endswith(".txt"):
-        return file.read().decode("utf-8", errors="ignore")
+        return file.read(max_chars or -1).decode("utf-8", errors="ignore")
     return ""
 
-def extract_text(file_storage):
+def extract_text(file_storage, max_pages=None, max_chars=None):
     filename = secure_filename(file_storage.filename)
-    file_storage.seek(0)
+    # Reads the spooled upload in place (see upload_pipeline)
     if filename.lower().endswith(".pdf"):
-        return " ".join(page.get_text() for page in fitz.open(stream=file_storage.read(), filetype="pdf"))
+        return " ".join(extract_pdf_pages(file_storage, max_pages, max_chars))
     elif filename.lower().endswith(".docx"):
-        return "\n".join(p.text for p in docx.Document(file_storage).paragraphs)
+        with closing(docx_text_lines(docx_source(file_storage))) as lines:
+            return "\n".join(take_chars(lines, max_chars))
     return ""
 
 def extract_json_from_response(response_text):
@@ -0,0 +1,190 @@
+import io
+import re
+import time
+from contextlib import closing
+from statistics import median
+
+import fitz
+from flask import current_app
+from werkzeug.utils import secure_filename
+
+from app.models.extracted_text import ExtractedText
+from app.models.resume_layout import ResumeLayout
+from app.utils.docx_extraction import docx_paragraphs
+from app.utils.pdf_extraction import page_lines, read_pdf_pages
+from app.utils.upload_pipeline import docx_source, upload_sha256
+
+# One list per field, one entry per text line; "part" is "header"/"footer" for .docx side parts
+LAYOUT_FIELDS = ("text", "page", "bbox", "size", "bold", "style", "part")
+LAYOUT_VERSION = 3
+
+_HEADING_MAX_WORDS = 5
+
+
+def _columns(rows):
+    layout = {field: [] for field in LAYOUT_FIELDS}
+    for row in rows:
+        # Trailing fields a source does not have are None
+        for i, field in enumerate(LAYOUT_FIELDS):
+            layout[field].append(row[i] if i < len(row) else None)
+    layout["version"] = LAYOUT_VERSION
+    return layout
+
+
+def _docx_rows(source):
+    with closing(docx_paragraphs(source)) as paragraphs:
+        for text, size, bold, style, part in paragraphs:
+            # .docx has no fixed pagination or coordinates
+            yield text, None, None, size, bold, style, part
+
+
+def _text_rows(text):
+    return ((line.strip(), None, None, None, False, None) for line in text.splitlines() if line.strip())
+
+
+def extract_layout(file_storage, max_pages=None):
+    """Columnar ``LAYOUT_FIELDS`` record for an uploaded PDF, .docx or .txt."""
+    filename = secure_filename(file_storage.filename or "").lower()
+    if filename.endswith(".pdf"):
+        with closing(read_pdf_pages(file_storage, page_lines, max_pages)) as pages:
+            return _columns(row for lines in pages for row in lines)
+    if filename.endswith(".docx"):
+        return _columns(_docx_rows(docx_source(file_storage)))
+    if filename.endswith(".txt"):
+        file_storage.seek(0)
+        return _columns(_text_rows(file_storage.read().decode("utf-8", errors="ignore")))
+    return _columns([])
+
+
+def extract_layout_bytes(data, filename, max_pages=None, page_limit=None):
+    """Pool worker: ``extract_layout`` for a file held in memory.
+
+    Needs no app context, so limits are passed in. PDF pages are read
+    serially; callers parallelise across files instead. Returns
+    ``(layout, seconds)``.
+    """
+    started = time.perf_counter()
+    filename = filename.lower()
+    if filename.endswith(".pdf"):
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            if page_limit and doc.page_count > page_limit:
+                raise ValueError(f"PDF has {doc.page_count} pages; at most {page_limit} are accepted.")
+            page_count = min(doc.page_count, max_pages) if max_pages else doc.page_count
+            layout = _columns(row for i in range(page_count) for row in page_lines(doc[i]))
+    elif filename.endswith(".docx"):
+        layout = _columns(_docx_rows(io.BytesIO(data)))
+    elif filename.endswith(".txt"):
+        layout = _columns(_text_rows(data.decode("utf-8", errors="ignore")))
+    else:
+        raise ValueError("Unsupported file type; upload a .pdf, .docx or .txt file.")
+    return layout, time.perf_counter() - started
+
+
+def cached_layout(file_hash):
+    """Stored layout for ``file_hash``, or ``None`` if missing or from an older extractor."""
+    layout = ResumeLayout.get_layout(file_hash)
+    if layout is None or layout.get("version") != LAYOUT_VERSION:
+        return None
+    return layout
+
+
+def get_resume_layout(file_storage, max_pages=None):
+    """Layout of an upload, extracted on first sight of its content hash only.
+
+    Returns ``(file_hash, layout)``.
+    """
+    file_hash = upload_sha256(file_storage)
+    layout = cached_layout(file_hash)
+    if layout is None:
+        layout = extract_layout(file_storage, max_pages)
+        ResumeLayout.save_layout(file_hash, layout)
+    return file_hash, layout
+
+
+def layout_text(layout, max_chars=None):
+    """Plain text of a layout, one line per line, pages separated by a blank line."""
+    parts = []
+    previous_page = None
+    for text, page in zip(layout["text"], layout["page"]):
+        if parts and page != previous_page:
+            parts.append("")
+        parts.append(text)
+        previous_page = page
+    text = "\n".join(parts)
+    return text[:max_chars] if max_chars else text
+
+
+def is_heading(layout, i, body_size=None):
+    """Whether line ``i`` looks like a section heading."""
+    text = layout["text"][i]
+    if len(text.split()) > _HEADING_MAX_WORDS or text.endswith((".", ",", ";")):
+        return False
+    style = layout["style"][i] or ""
+    if style.lower().startswith(("heading", "title")):
+        return True
+    size = layout["size"][i]
+    larger = bool(size and body_size and size >= body_size * 1.15)
+    letters = re.sub(r"[^A-Za-z]", "", text)
+    return larger or layout["bold"][i] and (letters.isupper() or len(text.split()) <= 3)
+
+
+def layout_sections(layout):
+    """Split a layout into ``[(heading, [line indexes])]`` in document order.
+
+    Lines before the first heading (name, contact details) come under a
+    ``None`` heading.
+    """
+    sizes = [size for size in layout["size"] if size]
+    body_size = median(sizes) if sizes else None
+    sections = [(None, [])]
+    for i in range(len(layout["text"])):
+        if is_heading(layout, i, body_size):
+            sections.append((layout["text"][i], []))
+        else:
+            sections[-1][1].append(i)
+    return [section for section in sections if section[0] is not None or section[1]]
+
+
+def layout_summary(layout):
+    """Small structural summary stored next to a document's text."""
+    return {
+        "sections": [heading for heading, _ in layout_sections(layout) if heading],
+        "lines": len(layout["text"]),
+        "pages": len({page for page in layout["page"] if page is not None}) or None,
+    }
+
+
+def get_resume_text(file_storage, max_pages=None):
+    """Plain text of an upload, stored per content hash in ``extracted_texts``.
+
+    Returns ``(file_hash, text)``.
+    """
+    file_hash = upload_sha256(file_storage)
+    stored = ExtractedText.get_text(file_hash)
+    if stored:
+        return file_hash, stored["text"]
+    _, layout = get_resume_layout(file_storage, max_pages)
+    text = layout_text(layout)
+    ExtractedText.save_text(file_hash, text, layout_summary(layout))
+    return file_hash, text
+
+
+def stored_resume_text(file_hash=None, file_id=None):
+    """Text of an earlier upload by content hash or saved ``file_id``, or ``None``.
+
+    Expired texts are rebuilt from the permanent layout.
+    """
+    stored = ExtractedText.get_text(file_hash, file_id)
+    if stored:
+        return stored["text"]
+    if not file_hash and file_id:
+        # The analysis that saved the upload knows its hash
+        analysis = current_app.db.analyses.find_one({"file_id": file_id}, {"resume_hash": 1})
+        file_hash = analysis["resume_hash"] if analysis else None
+    # Any layout version will do for plain text
+    layout = ResumeLayout.get_layout(file_hash) if file_hash else None
+    if layout is None:
+        return None
+    text = layout_text(layout)
+    ExtractedText.save_text(file_hash, text, layout_summary(layout), file_id)
+    return text
@@ -0,0 +1,305 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from flask import current_app
+from pymongo.errors import PyMongoError
+
+from app.utils.ai_helpers import client
+from app.utils.single_flight import SingleFlight
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+
+# Seconds a response is reused for, per calling route; 0 turns caching off.
+# Creative rewrites are kept briefly, analyses of fixed inputs for longer.
+ROUTE_TTLS = {
+    "enhance_field": 3600,
+    "generate_objective": 3600,
+    "generate_summary": 3600,
+    "extract_resume": 7 * 86400,
+    "extract_resume_fill": 7 * 86400,
+    "analyze_resume": 86400,
+    "get_keyword_gaps": 86400,
+    "generate_questions": 86400,
+    "optimize_resume": 3600,
+    "parse_optimized_resume": 86400,
+}
+
+
+def parse_route_settings(value):
+    """Parse per-route numbers such as ``"enhance_field=600;get_keyword_gaps=0"`` into a dict."""
+    settings = {}
+    for entry in (value or "").split(";"):
+        route, _, number = entry.partition("=")
+        if route.strip() and number.strip().isdigit():
+            settings[route.strip()] = int(number)
+    return settings
+
+
+def normalize_messages(messages):
+    """Messages with insignificant whitespace removed, for cache keys."""
+    normalized = []
+    for message in messages:
+        lines = (re.sub(r"[ \t]+", " ", line).strip() for line in message["content"].splitlines())
+        normalized.append({"role": message["role"], "content": "\n".join(line for line in lines if line)})
+    return normalized
+
+
+def make_cache_key(model, messages, temperature, max_tokens, response_format=None):
+    """Content address for a completion request."""
+    payload = {
+        "model": model,
+        "messages": normalize_messages(messages),
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "response_format": response_format,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class LlmGateway:
+    """Single entry point for chat completions, with a two-tier response cache.
+
+    Identical requests (same model, normalized messages, temperature,
+    max_tokens and response format) are answered from an in-process LRU,
+    then from the shared ``llm_cache`` collection, before the API is
+    called. Entries live for the calling route's TTL. Concurrent identical
+    requests that miss the cache share one API call (``SingleFlight``),
+    across threads and worker processes. Token use is counted per route
+    here and added to ``llm_usage`` per day, route and model.
+    """
+
+    def __init__(self, db, memory_entries, route_ttls=None, flights=None):
+        self.db = db
+        self.flights = flights or SingleFlight()
+        self.memory_entries = memory_entries
+        self.route_ttls = dict(ROUTE_TTLS, **(route_ttls or {}))
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._indexes_ready = False
+        self._routes = {}
+
+    def _count(self, route, **deltas):
+        with self._lock:
+            counts = self._routes.setdefault(route, {
+                "calls": 0, "memory_hits": 0, "db_hits": 0, "coalesced": 0, "misses": 0, "errors": 0,
+                "prompt_tokens": 0, "completion_tokens": 0, "tokens_saved": 0, "api_ms": 0.0,
+            })
+            for name, delta in deltas.items():
+                counts[name] += delta
+
+    def _get_memory(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return entry
+
+    def _put_memory(self, key, expires_at, content, tokens):
+        with self._lock:
+            self._memory[key] = (expires_at, content, tokens)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _ensure_indexes(self):
+        if self._indexes_ready:
+            return
+        self.db.llm_cache.create_index("expires_at", expireAfterSeconds=0)
+        self._indexes_ready = True
+
+    def _get_db(self, key):
+        try:
+            record = self.db.llm_cache.find_one({"_id": key, "expires_at": {"$gt": datetime.utcnow()}})
+        except PyMongoError as e:
+            print(f"[llm] cache read failed: {e}")
+            return None
+        if not record:
+            return None
+        # Stored in UTC; the memory tier keeps epoch seconds
+        expires_at = time.time() + (record["expires_at"] - datetime.utcnow()).total_seconds()
+        return expires_at, record["content"], record.get("total_tokens", 0)
+
+    def _put_db(self, key, route, model, ttl, content, usage):
+        now = datetime.utcnow()
+        try:
+            self._ensure_indexes()
+            self.db.llm_cache.update_one(
+                {"_id": key},
+                {"$set": {
+                    "route": route,
+                    "model": model,
+                    "content": content,
+                    "total_tokens": usage["prompt_tokens"] + usage["completion_tokens"],
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=ttl),
+                }},
+                upsert=True
+            )
+        except PyMongoError as e:
+            print(f"[llm] cache write failed: {e}")
+
+    def _record_usage(self, route, model, usage):
+        day = datetime.utcnow().strftime("%Y-%m-%d")
+        try:
+            self.db.llm_usage.update_one(
+                {"_id": f"{day}:{route}:{model}"},
+                {
+                    "$setOnInsert": {"day": day, "route": route, "model": model},
+                    "$inc": {"calls": 1, **usage}
+                },
+                upsert=True
+            )
+        except PyMongoError as e:
+            print(f"[llm] usage write failed: {e}")
+
+    def complete(self, route, messages, model=DEFAULT_MODEL, temperature=None, max_tokens=None,
+                 response_format=None, timeout=None, cache=True):
+        """Text of the first choice for ``messages``, served from cache when possible.
+
+        ``route`` names the caller, for its cache TTL and usage accounting.
+        """
+        self._count(route, calls=1)
+        ttl = self.route_ttls.get(route, 0) if cache else 0
+        key = make_cache_key(model, messages, temperature, max_tokens, response_format)
+        if ttl:
+            content = self._cached(route, key)
+            if content is not None:
+                return content
+
+        request = self._request(model, messages, temperature, max_tokens, response_format, timeout)
+
+        def call():
+            started = time.perf_counter()
+            try:
+                response = client.chat.completions.create(**request)
+            except Exception:
+                self._count(route, errors=1)
+                raise
+            content = response.choices[0].message.content
+            usage = self._usage(response.usage)
+            self._finish(route, model, key, ttl, content, usage, (time.perf_counter() - started) * 1000)
+            return {"content": content, "tokens": usage["prompt_tokens"] + usage["completion_tokens"]}
+
+        # Double clicks, several tabs: identical requests in flight share one call
+        result, shared = self.flights.do(key, call, wait_timeout=timeout)
+        if shared:
+            self._count(route, coalesced=1, tokens_saved=result["tokens"])
+        return result["content"]
+
+    def stream(self, route, messages, model=DEFAULT_MODEL, temperature=None, max_tokens=None,
+               response_format=None, timeout=None, cache=True):
+        """Like ``complete``, but yields the text in pieces as the model produces it.
+
+        A cached response is yielded whole. A streamed response is cached
+        under the same key ``complete`` uses, so each answers the other's
+        repeats; streams are not coalesced, every caller gets its own.
+        """
+        self._count(route, calls=1)
+        ttl = self.route_ttls.get(route, 0) if cache else 0
+        key = make_cache_key(model, messages, temperature, max_tokens, response_format)
+        if ttl:
+            content = self._cached(route, key)
+            if content is not None:
+                yield content
+                return
+
+        request = self._request(model, messages, temperature, max_tokens, response_format, timeout)
+        request["stream"] = True
+        # The final chunk then carries the token counts
+        request["stream_options"] = {"include_usage": True}
+        started = time.perf_counter()
+        parts = []
+        usage = None
+        try:
+            with client.chat.completions.create(**request) as response:
+                for chunk in response:
+                    if chunk.usage is not None:
+                        usage = chunk.usage
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        if not parts:
+                            print(f"[llm] {route}: first token in {(time.perf_counter() - started) * 1000:.0f}ms")
+                        parts.append(chunk.choices[0].delta.content)
+                        yield parts[-1]
+        except Exception:
+            self._count(route, errors=1)
+            raise
+        self._finish(route, model, key, ttl, "".join(parts), self._usage(usage),
+                     (time.perf_counter() - started) * 1000)
+
+    def _cached(self, route, key):
+        entry = self._get_memory(key)
+        if entry is not None:
+            self._count(route, memory_hits=1, tokens_saved=entry[2])
+            return entry[1]
+        entry = self._get_db(key)
+        if entry is not None:
+            self._put_memory(key, *entry)
+            self._count(route, db_hits=1, tokens_saved=entry[2])
+            return entry[1]
+        return None
+
+    @staticmethod
+    def _request(model, messages, temperature, max_tokens, response_format, timeout):
+        request = {"model": model, "messages": messages}
+        for name, value in (("temperature", temperature), ("max_tokens", max_tokens),
+                            ("response_format", response_format), ("timeout", timeout)):
+            if value is not None:
+                request[name] = value
+        return request
+
+    @staticmethod
+    def _usage(usage):
+        return {
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+            "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+        }
+
+    def _finish(self, route, model, key, ttl, content, usage, elapsed_ms):
+        """Account for a completed API call and cache its response."""
+        self._count(route, misses=1, api_ms=elapsed_ms, **usage)
+        self._record_usage(route, model, usage)
+        print(f"[llm] {route}: {usage['prompt_tokens']}+{usage['completion_tokens']} tokens in {elapsed_ms:.0f}ms")
+        if ttl and content:
+            self._put_memory(key, time.time() + ttl, content, usage["prompt_tokens"] + usage["completion_tokens"])
+            self._put_db(key, route, model, ttl, content, usage)
+
+    def stats(self):
+        with self._lock:
+            routes = {route: dict(counts, api_ms=round(counts["api_ms"], 1)) for route, counts in self._routes.items()}
+            memory_entries = len(self._memory)
+        totals = {}
+        for counts in routes.values():
+            for name, value in counts.items():
+                totals[name] = round(totals.get(name, 0) + value, 1)
+        return {"memory_entries": memory_entries, "totals": totals, "routes": routes}
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway():
+    """Return the process-wide LLM gateway, creating it on first use."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LlmGateway(
+                    current_app.db,
+                    memory_entries=current_app.config.get('LLM_CACHE_MEMORY_ENTRIES', 1024),
+                    route_ttls=parse_route_settings(current_app.config.get('LLM_CACHE_TTLS')),
+                    flights=SingleFlight(
+                        current_app.config.get('LLM_LOCK_DIR'),
+                        wait_timeout=current_app.config.get('LLM_SINGLE_FLIGHT_WAIT', 120),
+                    ),
+                )
+    return _gateway
@@ -0,0 +1,132 @@
+import json
+import re
+
+from flask import Response, stream_with_context
+
+# Characters the model uses for bullets, rewritten to the one the templates expect
+_BULLET_MARKERS = "-*"
+
+# Escapes that are a single character after the backslash
+_JSON_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+def sse_event(event, payload):
+    """One server-sent event with a JSON ``data`` line."""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+def stream_text(chunks, bullets=False):
+    """Yield ``chunks`` as they would read after ``.strip()``, optionally with ``'- '``/``'* '`` bullets as ``'• '``.
+
+    The whole-response routes strip the completion and replace bullet
+    markers in one go. Streamed, a marker and its space can arrive in
+    different chunks, and trailing whitespace is only known to be trailing
+    at the end, so both are held back until the next chunk decides them.
+    """
+    pending = ""
+    started = False
+    for chunk in chunks:
+        text = pending + chunk
+        if not started:
+            text = text.lstrip()
+            if not text:
+                pending = ""
+                continue
+            started = True
+        if bullets:
+            text = text.replace('- ', '• ').replace('* ', '• ')
+        keep = len(text.rstrip())
+        if bullets and text and keep == len(text) and text[-1] in _BULLET_MARKERS:
+            keep -= 1
+        pending = text[keep:]
+        if keep:
+            yield text[:keep]
+    if pending.strip():
+        yield pending.strip()
+
+
+def json_string_field(chunks, key):
+    """Yield the decoded value of the string field ``key`` from a streamed JSON object.
+
+    For completions requested with ``response_format=json_object``: text
+    before the field is skipped and the value is decoded escape by escape as
+    it arrives, so the client sees prose rather than JSON. The rest of the
+    stream is still consumed once the field ends.
+    """
+    start = re.compile(r'"%s"\s*:\s*"' % re.escape(key))
+    buffer = ""
+    pos = None
+    for chunk in chunks:
+        buffer += chunk
+        if pos is None:
+            match = start.search(buffer)
+            if match is None:
+                continue
+            pos = match.end()
+        decoded = []
+        while pos < len(buffer):
+            char = buffer[pos]
+            if char == '"':
+                if decoded:
+                    yield "".join(decoded)
+                # Read the stream to its end so the gateway caches and accounts for it
+                for _ in chunks:
+                    pass
+                return
+            if char != "\\":
+                decoded.append(char)
+                pos += 1
+                continue
+            # An escape split across chunks waits for the rest of it
+            if pos + 1 >= len(buffer):
+                break
+            escape = buffer[pos + 1]
+            if escape == "u":
+                if pos + 6 > len(buffer):
+                    break
+                code = int(buffer[pos + 2:pos + 6], 16)
+                if 0xD800 <= code < 0xDC00:
+                    # High surrogate: decode together with the low half that follows
+                    if pos + 12 > len(buffer):
+                        break
+                    decoded.append(json.loads(f'"{buffer[pos:pos + 12]}"'))
+                    pos += 12
+                else:
+                    decoded.append(chr(code))
+                    pos += 6
+            else:
+                decoded.append(_JSON_ESCAPES.get(escape, escape))
+                pos += 2
+        if decoded:
+            yield "".join(decoded)
+
+
+def sse_text_response(chunks, result_key, error_message="Streaming failed"):
+    """Stream text ``chunks`` as server-sent events.
+
+    Each chunk is a ``delta`` event (``{"text"}``). The ``done`` event
+    carries the whole text under ``result_key``, the key the matching
+    JSON route returns, and a failure part way through ends the stream
+    with an ``error`` event instead.
+    """
+    def generate():
+        parts = []
+        try:
+            for chunk in chunks:
+                parts.append(chunk)
+                yield sse_event("delta", {"text": chunk})
+        except Exception as e:
+            print(f"[llm-stream] {error_message}: {e}")
+            yield sse_event("error", {"error": f"{error_message}: {str(e)}"})
+            return
+        text = "".join(parts)
+        if not text:
+            yield sse_event("error", {"error": error_message})
+            return
+        yield sse_event("done", {result_key: text})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,235 @@
+import os
+import re
+import shutil
+import threading
+from io import BytesIO
+
+import fitz
+import pdfkit
+from flask import current_app
+
+from app.utils.asset_inliner import ASSET_HOST, FONTS_DIR, get_asset_inliner, local_font_css
+from app.utils.browser_pool import get_browser_pool
+
+PDF_OPTIONS = {
+    "format": "A4",
+    "print_background": True,
+    "margin": {"top": "0mm", "right": "0mm", "bottom": "0mm", "left": "0mm"},
+    # Margins come from the templates' CSS @page rules
+}
+
+PAGE_SHELL = (
+    '<!DOCTYPE html><html data-style-hash="{hash}"><head><meta charset="utf-8">'
+    "<style>" + local_font_css() + "</style><style>{css}</style></head><body>{body}</body></html>"
+)
+
+# Swaps the body only if the page already carries this template's stylesheet
+SWAP_BODY_JS = """([hash, html]) => {
+    if (document.documentElement.dataset.styleHash !== hash) return false;
+    document.body.innerHTML = html;
+    return true;
+}"""
+
+WAIT_FOR_ASSETS_JS = """async () => {
+    await Promise.all(Array.from(document.images, img =>
+        img.complete ? null : img.decode().catch(() => null)));
+    await document.fonts.ready;
+}"""
+
+# wkhtmltopdf flags the app used before rendering moved to Chromium
+WKHTMLTOPDF_OPTIONS = {
+    'enable-local-file-access': None,
+    'page-size': 'A4',
+    'dpi': 300,
+    'zoom': 1.3,  # Makes text clearer and larger
+    'encoding': "UTF-8",
+    'no-outline': None,
+    'print-media-type': None,
+    'quiet': None,
+}
+
+# Backends tried in order for each template. Every current template lays
+# out its rows with flexbox, which PyMuPDF's Story ignores without raising,
+# so none is routed to it by default; a flex-free template can be sent there
+# first with PDF_TEMPLATE_BACKENDS once its Story output has been checked.
+DEFAULT_BACKENDS = ("chromium", "wkhtmltopdf", "mupdf")
+TEMPLATE_BACKENDS = {}
+
+MM = 72 / 25.4
+_PAGE_MARGIN_RE = re.compile(r"@page\{[^}]*?margin:(\d+(?:\.\d+)?)mm")
+
+
+def load_body(page, html, style):
+    """Put ``html`` into a page pre-styled for ``style``'s template.
+
+    Pooled pages keep the last template's shell loaded, so consecutive renders
+    of the same template only replace ``document.body``.
+    """
+    if not page.evaluate(SWAP_BODY_JS, [style.hash, html]):
+        # Every asset is local (see asset_inliner), so "load" is deterministic
+        page.set_content(PAGE_SHELL.format(hash=style.hash, css=style.css, body=""), wait_until="load")
+        page.evaluate(SWAP_BODY_JS, [style.hash, html])
+    page.evaluate(WAIT_FOR_ASSETS_JS)
+
+
+def _asset_paths(html, fonts_base, cache_base):
+    """Point asset-host URLs at ``fonts_base``/``cache_base`` for non-browser backends."""
+    return (
+        html.replace(f"{ASSET_HOST}/fonts/", fonts_base)
+        .replace(f"{ASSET_HOST}/cache/", cache_base)
+    )
+
+
+class PdfBackend:
+    """Turns inlined body HTML plus a template stylesheet into PDF bytes."""
+
+    name = None
+
+    def available(self):
+        return True
+
+    def render(self, html, style):
+        raise NotImplementedError
+
+
+class ChromiumBackend(PdfBackend):
+    """Headless Chromium from the shared browser pool; renders every template."""
+
+    name = "chromium"
+
+    def render(self, html, style):
+        def render(page):
+            load_body(page, html, style)
+            return page.pdf(**PDF_OPTIONS)
+
+        return get_browser_pool().run(render)
+
+
+class WkhtmltopdfBackend(PdfBackend):
+    name = "wkhtmltopdf"
+
+    def __init__(self, binary_path=None, cache_dir=None):
+        self.binary_path = binary_path or shutil.which("wkhtmltopdf")
+        self.cache_dir = cache_dir
+
+    def available(self):
+        return bool(self.binary_path) and os.path.isfile(self.binary_path)
+
+    def render(self, html, style):
+        document = PAGE_SHELL.format(hash=style.hash, css=style.css, body=html)
+        document = _asset_paths(
+            document,
+            "file://" + FONTS_DIR + "/",
+            "file://" + os.path.abspath(self.cache_dir) + "/",
+        )
+        configuration = pdfkit.configuration(wkhtmltopdf=self.binary_path)
+        return pdfkit.from_string(document, False, configuration=configuration, options=WKHTMLTOPDF_OPTIONS)
+
+
+class MuPdfBackend(PdfBackend):
+    """Lays the HTML out with PyMuPDF's Story engine, no browser involved.
+
+    Story supports a CSS subset without flexbox or grid, so this is only
+    a good match for single-column templates.
+    """
+
+    name = "mupdf"
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+
+    def _archive(self):
+        archive = fitz.Archive()
+        archive.add(FONTS_DIR, "fonts")
+        if self.cache_dir and os.path.isdir(self.cache_dir):
+            archive.add(self.cache_dir, "cache")
+        return archive
+
+    def render(self, html, style):
+        match = _PAGE_MARGIN_RE.search(style.css)
+        margin = float(match.group(1)) * MM if match else 10 * MM
+        css = _asset_paths(local_font_css() + style.css, "fonts/", "cache/")
+
+        story = fitz.Story(html=_asset_paths(html, "fonts/", "cache/"), user_css=css, archive=self._archive())
+        page_rect = fitz.paper_rect("a4")
+        content_rect = page_rect + (margin, margin, -margin, -margin)
+
+        buffer = BytesIO()
+        writer = fitz.DocumentWriter(buffer)
+        more = True
+        while more:
+            device = writer.begin_page(page_rect)
+            more, _ = story.place(content_rect)
+            story.draw(device)
+            writer.end_page()
+        writer.close()
+        return buffer.getvalue()
+
+
+def parse_template_backends(value):
+    """Parse ``"meta=mupdf,chromium;google=wkhtmltopdf"`` into a dict of tuples."""
+    overrides = {}
+    for entry in (value or "").split(";"):
+        template_id, _, names = entry.partition("=")
+        names = tuple(name.strip() for name in names.split(",") if name.strip())
+        if template_id.strip() and names:
+            overrides[template_id.strip()] = names
+    return overrides
+
+
+class PdfBackendRegistry:
+    """Picks the backends for a template and falls back along the chain."""
+
+    def __init__(self, backends, template_backends=None, default_backends=DEFAULT_BACKENDS):
+        self.backends = {backend.name: backend for backend in backends}
+        self.template_backends = dict(TEMPLATE_BACKENDS, **(template_backends or {}))
+        self.default_backends = default_backends
+
+    def chain(self, template_id):
+        """Available backends for ``template_id``, most preferred first."""
+        names = self.template_backends.get(template_id, self.default_backends)
+        return [
+            self.backends[name] for name in names
+            if name in self.backends and self.backends[name].available()
+        ]
+
+    def render(self, html, style, chain):
+        """Render with the first backend in ``chain`` that succeeds.
+
+        Returns ``(pdf_bytes, backend_name)``; re-raises the last error if
+        every backend fails.
+        """
+        if not chain:
+            raise RuntimeError(f"No PDF backend available for template '{style.template_id}'")
+        error = None
+        for backend in chain:
+            try:
+                return backend.render(html, style), backend.name
+            except Exception as e:
+                print(f"[pdf-backends] {backend.name} failed for '{style.template_id}': {e}")
+                error = e
+        raise error
+
+    def stats(self):
+        return {name: backend.available() for name, backend in self.backends.items()}
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_pdf_backends():
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                cache_dir = get_asset_inliner().cache_dir
+                _registry = PdfBackendRegistry(
+                    [
+                        ChromiumBackend(),
+                        WkhtmltopdfBackend(current_app.config.get('WKHTMLTOPDF_PATH'), cache_dir),
+                        MuPdfBackend(cache_dir),
+                    ],
+                    template_backends=parse_template_backends(current_app.config.get('PDF_TEMPLATE_BACKENDS')),
+                )
+    return _registry
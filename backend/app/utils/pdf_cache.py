@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+
+
+def make_cache_key(html, template_id, style_hash, options):
+    """Content address for a render: normalized HTML + template + options."""
+    normalized = re.sub(r"\s+", " ", html).strip()
+    hasher = hashlib.sha256()
+    hasher.update(normalized.encode("utf-8"))
+    hasher.update(f"\0{template_id}\0{style_hash}\0".encode("utf-8"))
+    hasher.update(json.dumps(options, sort_keys=True).encode("utf-8"))
+    return hasher.hexdigest()
+
+
+class PdfRenderCache:
+    """Two-tier LRU cache of rendered PDF bytes.
+
+    Hot entries are kept in memory; everything is also written to a disk
+    directory bounded by ``disk_max_bytes`` so repeat downloads survive a
+    memory eviction or a worker restart.
+    """
+
+    def __init__(self, memory_max_bytes, disk_dir, disk_max_bytes):
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk = OrderedDict()
+        self._disk_bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+
+        os.makedirs(disk_dir, exist_ok=True)
+        # Rebuild the disk LRU order from modification times
+        entries = []
+        for name in os.listdir(disk_dir):
+            if name.endswith(".pdf"):
+                stat = os.stat(os.path.join(disk_dir, name))
+                entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.pdf")
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+            on_disk = key in self._disk
+
+        if on_disk:
+            try:
+                with open(self._path(key), "rb") as f:
+                    data = f.read()
+                os.utime(self._path(key))
+            except OSError:
+                data = None
+            if data is not None:
+                with self._lock:
+                    if key in self._disk:
+                        self._disk.move_to_end(key)
+                    self.disk_hits += 1
+                    self._put_memory(key, data)
+                return data
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, data):
+        with self._lock:
+            self._put_memory(key, data)
+            if key in self._disk or len(data) > self.disk_max_bytes:
+                return
+        tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(key))
+        with self._lock:
+            stale = []
+            # A concurrent put of the same key may have got here first
+            if key in self._disk:
+                self._disk.move_to_end(key)
+                return
+            self._disk[key] = len(data)
+            self._disk_bytes += len(data)
+            while self._disk_bytes > self.disk_max_bytes:
+                old_key, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                self.disk_evictions += 1
+                stale.append(old_key)
+        for old_key in stale:
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
+
+    def _put_memory(self, key, data):
+        if len(data) > self.memory_max_bytes:
+            return
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.memory_max_bytes:
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old)
+            self.memory_evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_evictions": self.memory_evictions,
+                "disk_evictions": self.disk_evictions,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_pdf_cache():
+    """Return the process-wide render cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PdfRenderCache(
+                    memory_max_bytes=current_app.config.get('PDF_CACHE_MEMORY_MB', 64) * 1024 * 1024,
+                    disk_dir=current_app.config.get('PDF_CACHE_DIR', 'pdf_cache'),
+                    disk_max_bytes=current_app.config.get('PDF_CACHE_DISK_MB', 512) * 1024 * 1024,
+                )
+    return _cache
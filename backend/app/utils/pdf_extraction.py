@@ -0,0 +1,153 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import closing
+
+import fitz
+from flask import current_app
+
+from app.utils.upload_pipeline import UploadTooLargeError, open_pdf, upload_path
+
+
+BOLD_FLAG = 1 << 4
+
+
+def page_text(page):
+    return page.get_text()
+
+
+def page_lines(page):
+    """``(text, page, bbox, size, bold, font)`` for every text line on ``page``."""
+    lines = []
+    for block in page.get_text("dict")["blocks"]:
+        for line in block.get("lines", []):
+            spans = [span for span in line["spans"] if span["text"].strip()]
+            if not spans:
+                continue
+            main = max(spans, key=lambda span: len(span["text"]))
+            lines.append((
+                "".join(span["text"] for span in line["spans"]).strip(),
+                page.number,
+                [round(v, 1) for v in line["bbox"]],
+                round(main["size"], 1),
+                any(span["flags"] & BOLD_FLAG for span in spans),
+                main["font"],
+            ))
+    return lines
+
+
+def _extract_page_range(path, start, stop, reader=page_text):
+    """Worker: ``reader(page)`` for pages ``start``..``stop - 1`` of the PDF at ``path``."""
+    with fitz.open(path) as doc:
+        return [reader(doc[i]) for i in range(start, stop)]
+
+
+def take_chars(texts, max_chars=None):
+    """Collect ``texts`` in order, stopping once ``max_chars`` is reached."""
+    taken = []
+    remaining = max_chars
+    for text in texts:
+        if remaining is not None:
+            text = text[:remaining]
+            remaining -= len(text)
+        taken.append(text)
+        if remaining is not None and remaining <= 0:
+            break
+    return taken
+
+
+def _page_ranges(page_count, workers):
+    size = -(-page_count // workers)
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def _pool_size():
+    return current_app.config.get('PDF_EXTRACT_WORKERS') or os.cpu_count() or 1
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_extraction_pool():
+    """Process pool for page extraction, started on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn, not fork: the app process runs browser and job threads
+                _pool = ProcessPoolExecutor(
+                    max_workers=_pool_size(), mp_context=multiprocessing.get_context("spawn")
+                )
+                atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+    return _pool
+
+
+def reset_extraction_pool():
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+
+def read_pdf_pages(file_storage, reader=page_text, max_pages=None):
+    """Yield ``reader(page)`` for the pages of an uploaded PDF, in page order.
+
+    Reading stops after ``max_pages`` pages (default ``EXTRACT_MAX_PAGES``),
+    or earlier if the caller stops iterating. Documents over
+    ``PDF_MAX_PAGES`` are rejected before anything is read.
+
+    Short documents are read on the request thread. Longer ones are split
+    into contiguous page ranges, one per pool worker, each opening the same
+    temp file; the GIL-bound PyMuPDF work then runs in parallel. ``reader``
+    must be a module-level function so it can be sent to the workers.
+    """
+    config = current_app.config
+    max_pages = max_pages or config.get('EXTRACT_MAX_PAGES')
+
+    with open_pdf(file_storage) as doc:
+        page_count = doc.page_count
+        page_limit = config.get('PDF_MAX_PAGES')
+        if page_limit and page_count > page_limit:
+            raise UploadTooLargeError(f"PDF has {page_count} pages; at most {page_limit} are accepted.")
+        if max_pages:
+            page_count = min(page_count, max_pages)
+        if page_count < config.get('PDF_EXTRACT_PARALLEL_MIN_PAGES', 8):
+            for i in range(page_count):
+                yield reader(doc[i])
+            return
+
+    pool = get_extraction_pool()
+    with upload_path(file_storage, suffix=".pdf") as path:
+        futures = [
+            pool.submit(_extract_page_range, path, start, stop, reader)
+            for start, stop in _page_ranges(page_count, _pool_size())
+        ]
+        yielded = 0
+        try:
+            for future in futures:
+                for result in future.result():
+                    yield result
+                    yielded += 1
+            return
+        except BrokenProcessPool as e:
+            # A worker died (e.g. OOM on a hostile file); start a new pool next time
+            print(f"[extract] process pool broken, extracting serially: {e}")
+            reset_extraction_pool()
+        finally:
+            # Ranges the caller no longer needs
+            for future in futures:
+                future.cancel()
+
+    # Only reached after a broken pool: carry on serially where it stopped
+    with open_pdf(file_storage) as doc:
+        for i in range(yielded, page_count):
+            yield reader(doc[i])
+
+
+def extract_pdf_pages(file_storage, max_pages=None, max_chars=None):
+    """Text of the pages of an uploaded PDF, stopping once ``max_chars`` is reached."""
+    with closing(read_pdf_pages(file_storage, page_text, max_pages)) as pages:
+        return take_chars(pages, max_chars)
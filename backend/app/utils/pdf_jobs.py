@@ -0,0 +1,160 @@
+import queue
+import threading
+import time
+import uuid
+
+from flask import current_app
+
+from app.utils.pdf_renderer import render_pdf
+
+
+class QueueFullError(Exception):
+    """Raised when the render queue is at capacity; callers should retry later."""
+
+
+class PdfJobQueue:
+    """Runs PDF renders off the request thread.
+
+    Jobs wait in a bounded queue and are picked up by ``workers`` render
+    threads. Finished jobs are kept for ``result_ttl`` seconds so the client
+    can poll for them, and while their PDFs total more than
+    ``max_result_bytes`` the oldest results are dropped early.
+
+    Job state lives in this process only: with several worker processes a
+    poll has to reach the process that took the job, or it gets a 404.
+    """
+
+    def __init__(self, app, workers=2, max_depth=50, result_ttl=300, max_result_bytes=128 * 1024 * 1024):
+        self._app = app
+        self.result_ttl = result_ttl
+        self.max_result_bytes = max_result_bytes
+        self._queue = queue.Queue(maxsize=max_depth)
+        self._jobs = {}
+        self._result_bytes = 0
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"pdf-job-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, html, template_id):
+        self._purge_expired()
+        job = {
+            "id": uuid.uuid4().hex,
+            "template": template_id,
+            "html": html,
+            "status": "queued",
+            "error": None,
+            "pdf": None,
+            "queued_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        with self._lock:
+            self._jobs[job["id"]] = job
+        try:
+            self._queue.put_nowait(job["id"])
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job["id"]]
+            raise QueueFullError("PDF render queue is full")
+        return job["id"]
+
+    def get(self, job_id):
+        self._purge_expired()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def _work(self):
+        # render_pdf reads pool/cache settings from the app config
+        with self._app.app_context():
+            while True:
+                job_id = self._queue.get()
+                with self._lock:
+                    job = self._jobs.get(job_id)
+                if job is None:
+                    continue
+                job["status"] = "running"
+                job["started_at"] = time.time()
+                pdf, error = None, None
+                try:
+                    pdf = render_pdf(job["html"], job["template"])
+                except Exception as e:
+                    print(f"[pdf-jobs] job {job_id} failed: {e}")
+                    error = str(e)
+                with self._lock:
+                    job["html"] = None
+                    job["pdf"] = pdf
+                    job["error"] = error
+                    job["status"] = "failed" if pdf is None else "done"
+                    job["finished_at"] = time.time()
+                    if pdf is not None:
+                        self._result_bytes += len(pdf)
+                    self._evict_results()
+                self._purge_expired()
+
+    def _forget(self, job_id):
+        # Caller holds the lock
+        job = self._jobs.pop(job_id)
+        if job["pdf"] is not None:
+            self._result_bytes -= len(job["pdf"])
+
+    def _evict_results(self):
+        # Caller holds the lock; the newest result is kept even if it alone is over
+        if self._result_bytes <= self.max_result_bytes:
+            return
+        finished = sorted(
+            (job for job in self._jobs.values() if job["pdf"] is not None),
+            key=lambda job: job["finished_at"]
+        )
+        for job in finished[:-1]:
+            if self._result_bytes <= self.max_result_bytes:
+                break
+            print(f"[pdf-jobs] dropping result of job {job['id']} to stay under {self.max_result_bytes} bytes")
+            self._forget(job["id"])
+
+    def _purge_expired(self):
+        cutoff = time.time() - self.result_ttl
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job["finished_at"] and job["finished_at"] < cutoff
+            ]
+            for job_id in expired:
+                self._forget(job_id)
+
+
+def job_timings(job):
+    """Queue wait and render time of a job, in milliseconds."""
+    now = time.time()
+    started = job["started_at"] or now
+    finished = job["finished_at"] or now
+    return {
+        "queue_ms": round((started - job["queued_at"]) * 1000),
+        "render_ms": round((finished - started) * 1000) if job["started_at"] else None,
+    }
+
+
+_jobs = None
+_jobs_lock = threading.Lock()
+
+
+def get_pdf_job_queue():
+    """Return the process-wide job queue, starting its workers on first use."""
+    global _jobs
+    if _jobs is None:
+        with _jobs_lock:
+            if _jobs is None:
+                _jobs = PdfJobQueue(
+                    current_app._get_current_object(),
+                    workers=current_app.config.get('PDF_JOB_WORKERS', 2),
+                    max_depth=current_app.config.get('PDF_JOB_QUEUE_DEPTH', 50),
+                    result_ttl=current_app.config.get('PDF_JOB_RESULT_TTL', 300),
+                    max_result_bytes=current_app.config.get('PDF_JOB_RESULTS_MB', 128) * 1024 * 1024,
+                )
+    return _jobs
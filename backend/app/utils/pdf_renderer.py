@@ -0,0 +1,185 @@
+import asyncio
+import json
+import queue
+import threading
+
+from playwright.async_api import async_playwright
+
+from app.utils.asset_inliner import get_asset_inliner
+from app.utils.pdf_backends import PAGE_SHELL, PDF_OPTIONS, SWAP_BODY_JS, WAIT_FOR_ASSETS_JS, get_pdf_backends
+from app.utils.pdf_cache import get_pdf_cache, make_cache_key
+from app.utils.resume_html import render_resume_html
+from app.utils.template_registry import get_template_style
+
+
+def content_cache_source(content):
+    """Stable text form of structured resume content for cache keying."""
+    return "content:" + json.dumps(content, sort_keys=True, ensure_ascii=False)
+
+
+def render_pdf(html, template_id):
+    """Render ``html`` with ``template_id``'s stylesheet and return the PDF bytes."""
+    return _render_cached(html, template_id, lambda: html)
+
+
+def render_resume_pdf(content, template_id):
+    """Render stored resume ``content`` server-side and return the PDF bytes.
+
+    The cache is keyed on the structured content, so the HTML is only
+    generated on a miss.
+    """
+    return _render_cached(
+        content_cache_source(content), template_id,
+        lambda: render_resume_html(content, template_id),
+    )
+
+
+def _cache_options(chain):
+    # Backends lay pages out differently, so the primary one is part of the key
+    return dict(PDF_OPTIONS, backend=chain[0].name if chain else None)
+
+
+def _render_cached(source, template_id, make_html):
+    style = get_template_style(template_id)
+    backends = get_pdf_backends()
+    chain = backends.chain(template_id)
+    cache = get_pdf_cache()
+    key = make_cache_key(source, template_id, style.hash, _cache_options(chain))
+
+    pdf_bytes = cache.get(key)
+    if pdf_bytes is not None:
+        # Repeat download: no rendering involved
+        return pdf_bytes
+
+    local_html = get_asset_inliner().inline(make_html())
+    pdf_bytes, backend_name = backends.render(local_html, style, chain)
+    # A fallback render is served but not cached, so the preferred backend
+    # gets another go next time
+    if backend_name == chain[0].name:
+        cache.put(key, pdf_bytes)
+    return pdf_bytes
+
+
+async def _load_body_async(page, html, style, timeout):
+    if not await page.evaluate(SWAP_BODY_JS, [style.hash, html]):
+        await page.set_content(
+            PAGE_SHELL.format(hash=style.hash, css=style.css, body=""), wait_until="load", timeout=timeout * 1000
+        )
+        await page.evaluate(SWAP_BODY_JS, [style.hash, html])
+    await page.evaluate(WAIT_FOR_ASSETS_JS)
+
+
+async def _render_batch_async(jobs, concurrency, results, inliner, timeout):
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        pages = asyncio.Queue()
+        for _ in range(concurrency):
+            page = await browser.new_page()
+            await page.route("**/*", inliner.handle_route_async)
+            pages.put_nowait(page)
+
+        async def render(page, html, style):
+            await _load_body_async(page, html, style, timeout)
+            return await page.pdf(**PDF_OPTIONS)
+
+        async def render_one(name, html, style):
+            page = await pages.get()
+            try:
+                # page.pdf and asset waits take no timeout of their own
+                results.put((name, await asyncio.wait_for(render(page, html, style), timeout), None))
+            except asyncio.TimeoutError:
+                results.put((name, None, TimeoutError(f"PDF render timed out after {timeout:g}s")))
+                # The page may still be busy with the abandoned render
+                await page.close()
+                page = await browser.new_page()
+                await page.route("**/*", inliner.handle_route_async)
+            except Exception as e:
+                results.put((name, None, e))
+            finally:
+                pages.put_nowait(page)
+
+        try:
+            await asyncio.gather(*(render_one(*job) for job in jobs))
+        finally:
+            await browser.close()
+
+
+def render_pdf_batch(items, concurrency=4, timeout=60.0):
+    """Render many ``(name, content, template_id)`` resumes in one browser session.
+
+    Yields ``(name, pdf_bytes, error)`` in completion order. Cache hits and
+    templates whose preferred backend is not Chromium are rendered inline;
+    the rest go to ``concurrency`` pages of a single Chromium running on a
+    helper thread, falling back along the template's backend chain on error.
+    Each Chromium render is given ``timeout`` seconds; if no result arrives
+    for twice that, the resumes still pending fail with a timeout.
+    """
+    cache = get_pdf_cache()
+    inliner = get_asset_inliner()
+    backends = get_pdf_backends()
+    jobs = []
+    pending = {}
+    for name, content, template_id in items:
+        style = get_template_style(template_id)
+        chain = backends.chain(template_id)
+        key = make_cache_key(content_cache_source(content), template_id, style.hash, _cache_options(chain))
+        pdf_bytes = cache.get(key)
+        if pdf_bytes is not None:
+            yield name, pdf_bytes, None
+            continue
+        try:
+            html = inliner.inline(render_resume_html(content, template_id))
+            if not chain or chain[0].name != "chromium":
+                pdf_bytes, backend_name = backends.render(html, style, chain)
+                if backend_name == chain[0].name:
+                    cache.put(key, pdf_bytes)
+                yield name, pdf_bytes, None
+                continue
+        except Exception as e:
+            yield name, None, e
+            continue
+        pending[name] = (key, html, style, chain)
+        jobs.append((name, html, style))
+
+    if not jobs:
+        return
+
+    results = queue.Queue()
+    done = object()
+
+    def run():
+        try:
+            asyncio.run(_render_batch_async(jobs, min(concurrency, len(jobs)), results, inliner, timeout))
+        except Exception as e:
+            # Browser failed to start or crashed: fail whatever is left
+            for name, _, _ in jobs:
+                results.put((name, None, e))
+        finally:
+            results.put(done)
+
+    threading.Thread(target=run, name="pdf-batch", daemon=True).start()
+
+    while pending:
+        try:
+            # Renders are bounded on the helper thread; this covers a browser that never starts or answers
+            item = results.get(timeout=timeout * 2)
+        except queue.Empty:
+            for name in list(pending):
+                del pending[name]
+                yield name, None, TimeoutError(f"PDF render timed out after {timeout:g}s")
+            break
+        if item is done:
+            break
+        name, pdf_bytes, error = item
+        if name not in pending:
+            continue
+        key, html, style, chain = pending.pop(name)
+        if pdf_bytes is not None:
+            cache.put(key, pdf_bytes)
+        elif len(chain) > 1:
+            try:
+                pdf_bytes, _ = backends.render(html, style, chain[1:])
+                error = None
+            except Exception as e:
+                error = e
+        yield name, pdf_bytes, error
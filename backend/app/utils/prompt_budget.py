@@ -0,0 +1,253 @@
+import math
+import re
+import threading
+
+from flask import current_app, has_app_context
+
+from app.utils.llm_gateway import DEFAULT_MODEL, parse_route_settings
+
+try:
+    import tiktoken
+except ImportError:
+    # Without it token counts are estimated from length
+    tiktoken = None
+
+# Context window (prompt + completion) per model, in tokens
+MODEL_CONTEXT = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+}
+_DEFAULT_CONTEXT = 16385
+
+# Prompt tokens allowed per calling route (the gateway's route names).
+# Routes not listed only have to fit the model's context.
+ROUTE_BUDGETS = {
+    "analyze_resume": 7000,
+    "get_keyword_gaps": 5000,
+    "generate_questions": 5000,
+    "extract_resume": 8000,
+    "extract_resume_fill": 6000,
+    "optimize_resume": 8000,
+}
+
+# Headroom for the chat format's own per-message tokens
+_MESSAGE_OVERHEAD = 64
+# Completion tokens assumed when a call does not cap them
+_DEFAULT_COMPLETION = 2000
+_CHARS_PER_TOKEN = 4
+# No token covers more characters than this; longer text is cut before it is counted
+_MAX_CHARS_PER_TOKEN = 32
+# Items of a bulleted run kept when lists are shortened, tried in turn;
+# comma-separated lines keep twice as many
+_LIST_KEEPS = (32, 16, 8)
+
+_BULLET = re.compile(r"^\s*(?:[-*•▪●◦‣]|\d{1,2}[.)])\s+")
+# Job-ad sections that say nothing about the role's requirements
+_BOILERPLATE_HEADING = re.compile(
+    r"^\W*(about (us|the company|the team)|who we are|our (company|mission|culture|values)|"
+    r"benefits|perks|what we offer|why (join|work)|compensation|salary|pay range|"
+    r"equal (employment )?opportunity|eeo|diversity|how to apply|application process|disclaimer|privacy)\b",
+    re.IGNORECASE
+)
+_BOILERPLATE_LINE = re.compile(
+    r"equal (employment )?opportunity|without regard to|reasonable accommodation|e-verify|drug[- ]free|"
+    r"background check|401\(?k\)?|paid time off|privacy (notice|policy)|recruitment agencies|"
+    r"to apply|apply (now|today|online)",
+    re.IGNORECASE
+)
+_HEADING_MAX_WORDS = 6
+
+_encodings = {}
+_encodings_lock = threading.Lock()
+
+
+def _encoding(model):
+    """The tokenizer for ``model``, or ``None`` to estimate instead."""
+    if tiktoken is None:
+        return None
+    if model not in _encodings:
+        with _encodings_lock:
+            if model not in _encodings:
+                try:
+                    try:
+                        _encodings[model] = tiktoken.encoding_for_model(model)
+                    except KeyError:
+                        _encodings[model] = tiktoken.get_encoding("cl100k_base")
+                except Exception as e:
+                    # The BPE files are downloaded on first use; offline, estimate
+                    print(f"[prompt-budget] no tokenizer for {model}, estimating: {e}")
+                    _encodings[model] = None
+    return _encodings[model]
+
+
+def count_tokens(text, model=DEFAULT_MODEL):
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / _CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text, max_tokens, model=DEFAULT_MODEL):
+    """``text`` cut to at most ``max_tokens`` tokens, at a line or word break where one is close."""
+    if max_tokens <= 0:
+        return ""
+    text = text[:max_tokens * _MAX_CHARS_PER_TOKEN]
+    encoding = _encoding(model)
+    if encoding is None:
+        cut = text[:max_tokens * _CHARS_PER_TOKEN]
+    else:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        cut = encoding.decode(tokens[:max_tokens])
+    if len(cut) == len(text):
+        return text
+    # Don't hand the model half a word or line
+    for separator in ("\n", " "):
+        end = cut.rfind(separator)
+        if end >= len(cut) * 0.9:
+            return cut[:end]
+    return cut
+
+
+def prompt_budget(route, max_tokens=None, model=DEFAULT_MODEL):
+    """Prompt tokens available to ``route`` when ``max_tokens`` are reserved for the completion.
+
+    ``PROMPT_TOKEN_BUDGETS`` (``"route=tokens;..."``) overrides the defaults.
+    """
+    budgets = dict(ROUTE_BUDGETS)
+    if has_app_context():
+        budgets.update(parse_route_settings(current_app.config.get('PROMPT_TOKEN_BUDGETS')))
+    context = MODEL_CONTEXT.get(model, _DEFAULT_CONTEXT)
+    available = context - (max_tokens or _DEFAULT_COMPLETION) - _MESSAGE_OVERHEAD
+    return min(budgets.get(route, available), available)
+
+
+def collapse_whitespace(text):
+    lines = (re.sub(r"[ \t\u00a0]+", " ", line).strip() for line in text.splitlines())
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def _is_heading(line):
+    words = line.split()
+    return 0 < len(words) <= _HEADING_MAX_WORDS and (line.endswith(":") or line.isupper())
+
+
+def drop_boilerplate(text):
+    """Job description without its company blurb, benefits, EEO and application sections."""
+    kept = []
+    skipping = False
+    for line in text.splitlines():
+        stripped = line.strip()
+        if _BOILERPLATE_HEADING.match(stripped) and (_is_heading(stripped) or len(stripped.split()) <= 3):
+            skipping = True
+            continue
+        if skipping and _is_heading(stripped):
+            skipping = False
+        if skipping or _BOILERPLATE_LINE.search(stripped):
+            continue
+        kept.append(line)
+    return "\n".join(kept).strip()
+
+
+def shorten_lists(text, keep):
+    """Long bulleted runs cut to their first ``keep`` items, long comma-separated lines to ``2 * keep``."""
+    kept = []
+    run = 0
+    for line in text.splitlines():
+        run = run + 1 if _BULLET.match(line) else 0
+        if run > keep:
+            continue
+        items = line.split(", ")
+        if len(items) > 2 * keep:
+            line = ", ".join(items[:2 * keep])
+        kept.append(line)
+    return "\n".join(kept)
+
+
+class Section:
+    """A variable part of a prompt.
+
+    Sections are trimmed in ``priority`` order, lowest first, and never
+    cut below ``min_tokens`` while a lower-priority one still has text.
+    ``boilerplate`` marks job-description text whose company and benefits
+    blurbs can go.
+    """
+
+    def __init__(self, text, priority=0, min_tokens=0, boilerplate=False):
+        self.text = text or ""
+        self.priority = priority
+        self.min_tokens = min_tokens
+        self.boilerplate = boilerplate
+
+
+# Lossy reductions, cheapest loss first: filler, then detail
+_REDUCERS = (
+    (drop_boilerplate, lambda section: section.boilerplate),
+) + tuple(
+    (lambda text, keep=keep: shorten_lists(text, keep), lambda section: True) for keep in _LIST_KEEPS
+)
+
+
+def fit_prompt(route, build, max_tokens=None, model=DEFAULT_MODEL, **sections):
+    """``build(**texts)``, with the ``sections`` texts trimmed until the prompt fits ``route``'s budget.
+
+    ``build`` takes one keyword argument per section and returns the
+    prompt; the rest of the prompt is fixed and always kept whole. When
+    the prompt is over budget, repeated whitespace goes first; then each
+    section in turn, lowest priority first, loses job-ad boilerplate and
+    the tails of long lists, never below its ``min_tokens``; as a last
+    resort sections are cut at the end.
+    """
+    budget = prompt_budget(route, max_tokens, model)
+    texts = {name: section.text for name, section in sections.items()}
+    fixed = count_tokens(build(**{name: "" for name in sections}), model)
+    available = max(budget - fixed, 0)
+    sizes = {name: count_tokens(text, model) for name, text in texts.items()}
+    before = sum(sizes.values())
+    if before <= available:
+        return build(**texts)
+
+    order = sorted(sections, key=lambda name: sections[name].priority)
+
+    def over():
+        return sum(sizes.values()) - available
+
+    # Whitespace carries nothing, so every section loses it first
+    for name in order:
+        if over() <= 0:
+            break
+        texts[name] = collapse_whitespace(texts[name])
+        sizes[name] = count_tokens(texts[name], model)
+
+    # Then content, one section at a time, lowest priority first; a reduction
+    # that would take a section below its floor is left to the final cut instead
+    for name in order:
+        section = sections[name]
+        for reduce, applies in _REDUCERS:
+            if over() <= 0 or sizes[name] <= section.min_tokens:
+                break
+            if not applies(section):
+                continue
+            reduced = reduce(texts[name])
+            reduced_size = count_tokens(reduced, model)
+            if reduced_size >= section.min_tokens:
+                texts[name], sizes[name] = reduced, reduced_size
+
+    # Still over: cut from the end, down to each section's floor, then past it
+    for floors in (True, False):
+        for name in order:
+            excess = over()
+            if excess <= 0:
+                break
+            floor = sections[name].min_tokens if floors else 0
+            keep = max(sizes[name] - excess, min(floor, sizes[name]))
+            if keep < sizes[name]:
+                texts[name] = truncate_tokens(texts[name], keep, model)
+                sizes[name] = count_tokens(texts[name], model)
+
+    print(f"[prompt-budget] {route}: sections {before} -> {sum(sizes.values())} tokens (budget {budget}, fixed {fixed})")
+    return build(**texts)
@@ -0,0 +1,72 @@
+import os
+import re
+from datetime import datetime
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+# Server-side ports of the builder's React templates, one per template id
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", "pdf")
+
+_BULLET_PREFIX_RE = re.compile(r"^\s*[•\-]\s*")
+
+
+def bullet_points(description):
+    """Same splitting the React templates do: list as-is, or one point per line."""
+    if not description:
+        return []
+    if isinstance(description, list):
+        return [str(point).strip() for point in description if point and str(point).strip()]
+    points = (_BULLET_PREFIX_RE.sub("", line).strip() for line in str(description).split("\n"))
+    return [point for point in points if point]
+
+
+def month_year(value):
+    """Format ISO month/date inputs as e.g. 'Jan 2023', leaving free text alone."""
+    if not value:
+        return ""
+    for fmt in ("%Y-%m", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(str(value), fmt).strftime("%b %Y")
+        except ValueError:
+            continue
+    return value
+
+
+_env = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    autoescape=select_autoescape(["html"]),
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+_env.filters["points"] = bullet_points
+_env.filters["month_year"] = month_year
+
+_templates = {}
+
+
+def load_resume_templates():
+    """Compile every resume template once. Called at startup."""
+    _templates.clear()
+    for filename in sorted(os.listdir(TEMPLATES_DIR)):
+        template_id, ext = os.path.splitext(filename)
+        if ext == ".html":
+            _templates[template_id] = _env.get_template(filename)
+    print(f"✅ Compiled {len(_templates)} resume HTML templates")
+    return _templates
+
+
+def has_resume_template(template_id):
+    if not _templates:
+        load_resume_templates()
+    return template_id in _templates
+
+
+def render_resume_html(content, template_id):
+    """Render stored resume ``content`` (the builder's form JSON) as body HTML."""
+    if not has_resume_template(template_id):
+        raise ValueError(f"Unknown template: {template_id}")
+    content = content or {}
+    # The builder keeps fresher/experienced in client state; fall back to
+    # whether the resume has any work experience.
+    mode = content.get("toggle") or ("experienced" if content.get("experience") else "fresher")
+    return _templates[template_id].render(r=content, mode=mode)
@@ -0,0 +1,440 @@
+import json
+import re
+
+from app.data.interests import INTERESTS
+from app.data.languages import LANGUAGES
+from app.data.skills_data import ALL_SKILLS
+from app.utils.layout_extraction import LAYOUT_FIELDS, layout_sections, layout_text
+
+# Fields at or above this confidence are returned as parsed; the rest go to the LLM
+CONFIDENT = 0.8
+
+# Same heading synonyms the /extract prompt lists, plus common variants
+SECTION_SYNONYMS = {
+    "summary": ["summary", "professional summary", "about me", "profile", "professional profile",
+                "objective", "career objective", "personal statement", "career summary"],
+    "experience": ["experience", "professional experience", "work experience", "work history",
+                   "employment history", "employment", "professional background", "occupation history",
+                   "career experience", "professsional background"],
+    "internships": ["internships", "internship", "internship experience"],
+    "education": ["education", "academic background", "academics", "qualifications",
+                  "educational qualifications", "academic qualifications"],
+    "projects": ["projects", "project experience", "work samples", "portfolio", "personal projects",
+                 "academic projects", "key projects"],
+    "achievements": ["achievements", "awards", "honors", "honours", "recognition", "accomplishments",
+                     "awards and achievements", "awards & achievements"],
+    "skills": ["skills", "technical skills", "key skills", "core competencies", "competencies",
+               "skills & tools", "technologies"],
+    "certifications": ["certifications", "certificates", "certification", "licenses & certifications",
+                       "licenses and certifications", "courses & certifications"],
+    "languages": ["languages", "languages known"],
+    "interests": ["interests", "hobbies", "hobbies & interests", "hobbies and interests"],
+}
+_HEADING_KEYS = {name: key for key, names in SECTION_SYNONYMS.items() for name in names}
+
+# The /extract output structure, one example per field, for partial LLM fills
+FIELD_SCHEMAS = {
+    "Name": '"Full Name"',
+    "jobTitle": '"Job Title"',
+    "email": '"email@example.com"',
+    "phone": '"123-456-7890"',
+    "location": '"City, Country"',
+    "linkedin": '"https://linkedin.com/..."',
+    "github": '"https://github.com/..."',
+    "summary": '"Professional summary..."',
+    "objective": '"Carrer Objectives"',
+    "experience": '[{"jobTitle": "Job Title", "company": "Company Name", "startDate": "Month Year", '
+                  '"endDate": "Month Year", "location": "working location", "description": ["Point 1", "Point 2"]}]',
+    "internships": '[{"role": "Job Title", "company": "Company Name", "startDate": "Month Year", '
+                   '"endDate": "Month Year", "location": "working location", "description": ["Point 1", "Point 2"]}]',
+    "education": '[{"degree": "Degree Name", "school": "School Name", "level": "type of education level", '
+                 '"startDate": "Year", "endDate": "Year", "location": "working location", "cgpa": "X.XX/10"}]',
+    "skills": '["Skill1", "Skill2"]',
+    "languages": '["Language1", "Language2"]',
+    "interests": '["Interest1", "Interest2"]',
+    "achievements": '[{"title": "Achievement Title", "description": "some description about the achievement"}]',
+    "projects": '[{"title": "Project Title", "startDate": "Month Year", "endDate": "Month Year", '
+                '"tech": "Tools/Tech Stack", "description": ["Point 1", "Point 2"]}]',
+    "certifications": '[{"name": "Certification name", "issuer": "name of the issuer", "date": "Month Year"}]',
+}
+HEADER_FIELDS = ("Name", "jobTitle", "email", "phone", "location", "linkedin", "github")
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_RE = re.compile(r"(?<![\w/])(\+?\d[\d\s().-]{8,}\d)(?![\w/])")
+LINKEDIN_RE = re.compile(r"(?:https?://)?(?:[\w-]+\.)?linkedin\.com/[^\s|,;]+", re.IGNORECASE)
+GITHUB_RE = re.compile(r"(?:https?://)?(?:www\.)?github\.com/[^\s|,;]+", re.IGNORECASE)
+URL_RE = re.compile(r"(?:https?://|www\.)\S+", re.IGNORECASE)
+LOCATION_RE = re.compile(r"^[A-Z][A-Za-z .'-]+,\s*[A-Z][A-Za-z .'-]+$")
+
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE = rf"(?:{_MONTH}\s*,?\s*'?\d{{2,4}}|\d{{1,2}}/\d{{4}}|\d{{4}})"
+DATE_RANGE_RE = re.compile(
+    rf"\(?({_DATE})\s*(?:-|–|—|to|till)\s*({_DATE}|present|current|now|till date|ongoing)\)?",
+    re.IGNORECASE,
+)
+DATE_RE = re.compile(rf"\(?{_DATE}\)?", re.IGNORECASE)
+BULLET_RE = re.compile(r"^\s*[•●▪◦‣∙·\-\*–➢►✓]\s*")
+CGPA_RE = re.compile(r"(?:c?gpa|cgpa|percentage|score)\s*[:\-]?\s*([\d.]+\s*(?:/\s*[\d.]+)?\s*%?)", re.IGNORECASE)
+DEGREE_RE = re.compile(
+    r"\b(?:bachelor|master|b\.?\s?tech|m\.?\s?tech|b\.?\s?e\b|m\.?\s?e\b|b\.?\s?sc|m\.?\s?sc|b\.?\s?com|m\.?\s?com|"
+    r"bca|mca|bba|mba|ph\.?\s?d|doctorate|diploma|associate|high school|higher secondary|senior secondary|"
+    r"hsc|ssc|class\s+(?:x|xii|10|12)(?:th)?|intermediate|b\.?\s?a\b|m\.?\s?a\b|b\.?\s?s\b|m\.?\s?s\b)",
+    re.IGNORECASE,
+)
+SCHOOL_RE = re.compile(r"\b(?:university|college|institute|school|academy|iit|nit|polytechnic|vidyalaya)\b", re.IGNORECASE)
+_SPLIT_RE = re.compile(r"\s*(?:[,|;•●▪]|\s-\s|\n)\s*")
+_CONTACT_SPLIT_RE = re.compile(r"\s*(?:\||•|●|·|\s[-–—]\s)\s*")
+_HEADER_SPLIT_RE = re.compile(r"\s*(?:\||•|●|·|\s[-–—]\s|,\s(?=[A-Z]))\s*|\s+at\s+")
+
+
+def _normalize_heading(text):
+    text = re.sub(r"[^a-z& ]", " ", text.lower())
+    return " ".join(text.split())
+
+
+def _match_terms(text, terms):
+    found = []
+    lowered = text.lower()
+    for term in terms:
+        if re.search(rf"(?<![\w+#]){re.escape(term.lower())}(?![\w+#])", lowered):
+            found.append(term)
+    return found
+
+
+def _split_items(lines):
+    items = []
+    for line in lines:
+        # "Languages: Python, Go" -> drop the category label
+        if ":" in line and len(line.split(":", 1)[0].split()) <= 3:
+            line = line.split(":", 1)[1]
+        for item in _SPLIT_RE.split(BULLET_RE.sub("", line)):
+            item = item.strip(" .")
+            if item and len(item.split()) <= 4 and item.lower() not in (i.lower() for i in items):
+                items.append(item)
+    return items
+
+
+def _group_entries(lines):
+    """Group section lines into entries of ``{"header": [...], "bullets": [...]}``."""
+    entries = []
+    current = None
+    pending_bullet = False
+    for line in lines:
+        if BULLET_RE.sub("", line) == "":
+            # Bullet glyph extracted as a line of its own
+            pending_bullet = True
+            continue
+        is_bullet = pending_bullet or bool(BULLET_RE.match(line))
+        pending_bullet = False
+        text = BULLET_RE.sub("", line).strip()
+        if is_bullet:
+            if current is None:
+                current = {"header": [], "bullets": []}
+                entries.append(current)
+            current["bullets"].append(text)
+        elif current and current["bullets"] and (text[:1].islower() or not current["bullets"][-1].rstrip().endswith(".")) \
+                and not DATE_RANGE_RE.search(text) and len(text.split()) > 6:
+            # Wrapped continuation of the previous bullet
+            current["bullets"][-1] += " " + text
+        else:
+            if current is None or current["bullets"]:
+                current = {"header": [], "bullets": []}
+                entries.append(current)
+            current["header"].append(text)
+    return entries
+
+
+def _dates(header):
+    """Pull a date range out of header lines: ``(start, end, remaining lines)``."""
+    start = end = ""
+    rest = []
+    for line in header:
+        match = DATE_RANGE_RE.search(line)
+        if match and not start:
+            start, end = match.group(1), match.group(2)
+            line = (line[:match.start()] + line[match.end():]).strip(" |,-–—()")
+        if line:
+            rest.append(line)
+    return start, end, rest
+
+
+def _fragments(lines):
+    fragments = []
+    for line in lines:
+        fragments.extend(part.strip() for part in _HEADER_SPLIT_RE.split(line) if part and part.strip())
+    return fragments
+
+
+def _parse_roles(lines, title_key):
+    entries = []
+    complete = True
+    for entry in _group_entries(lines):
+        start, end, rest = _dates(entry["header"])
+        parts = _fragments(rest)
+        role = {
+            title_key: parts[0] if parts else "",
+            "company": parts[1] if len(parts) > 1 else "",
+            "startDate": start,
+            "endDate": end,
+            "location": ", ".join(parts[2:]),
+            "description": entry["bullets"],
+        }
+        complete = complete and bool(role[title_key] and role["company"] and start)
+        entries.append(role)
+    return entries, (0.9 if entries and complete else 0.4)
+
+
+def _parse_projects(lines):
+    projects = []
+    complete = True
+    for entry in _group_entries(lines):
+        start, end, rest = _dates(entry["header"])
+        tech = ""
+        description = []
+        for bullet in entry["bullets"]:
+            label, _, value = bullet.partition(":")
+            if value and re.search(r"tech|tools|stack|built with", label, re.IGNORECASE):
+                tech = value.strip()
+            else:
+                description.append(bullet)
+        title_parts = _fragments(rest[:1])
+        title = title_parts[0] if title_parts else ""
+        if not tech and len(title_parts) > 1:
+            tech = ", ".join(title_parts[1:])
+        projects.append({"title": title, "startDate": start, "endDate": end, "tech": tech, "description": description})
+        complete = complete and bool(title)
+    return projects, (0.85 if projects and complete else 0.4)
+
+
+def _parse_education(lines):
+    entries = []
+    current = None
+    for line in (BULLET_RE.sub("", line).strip() for line in lines):
+        if DEGREE_RE.search(line) and (current is None or current["degree"]):
+            current = {"degree": "", "school": "", "level": "", "startDate": "", "endDate": "", "location": "", "cgpa": ""}
+            entries.append(current)
+        elif current is None:
+            current = {"degree": "", "school": "", "level": "", "startDate": "", "endDate": "", "location": "", "cgpa": ""}
+            entries.append(current)
+
+        cgpa = CGPA_RE.search(line)
+        if cgpa:
+            current["cgpa"] = cgpa.group(1).strip()
+            line = (line[:cgpa.start()] + line[cgpa.end():]).strip(" |,-–—()")
+        dates = DATE_RANGE_RE.search(line)
+        if dates:
+            current["startDate"], current["endDate"] = dates.group(1), dates.group(2)
+            line = (line[:dates.start()] + line[dates.end():]).strip(" |,-–—()")
+        elif not current["endDate"]:
+            year = re.search(r"\b(19|20)\d{2}\b", line)
+            if year:
+                current["endDate"] = year.group(0)
+                line = (line[:year.start()] + line[year.end():]).strip(" |,-–—()")
+
+        for part in _fragments([line]):
+            if DEGREE_RE.search(part) and not current["degree"]:
+                current["degree"] = part
+            elif SCHOOL_RE.search(part) and not current["school"]:
+                current["school"] = part
+            elif current["school"] and not current["location"]:
+                current["location"] = part
+
+    complete = all(entry["degree"] and entry["school"] for entry in entries)
+    return entries, (0.85 if entries and complete else 0.4)
+
+
+def _split_detail(text):
+    """``"Name - detail"`` / ``"Name: detail"`` -> ``(name, detail)``."""
+    parts = re.split(r"\s[-–—|]\s|:\s", text, maxsplit=1)
+    if len(parts) == 2:
+        return parts[0].strip(), parts[1].strip()
+    return text, ""
+
+
+def _parse_certifications(lines):
+    certifications = []
+    for line in lines:
+        text = BULLET_RE.sub("", line).strip()
+        if not text:
+            continue
+        date = DATE_RE.search(text)
+        if date:
+            text = (text[:date.start()] + text[date.end():]).strip(" |,-–—()")
+        name, issuer = _split_detail(text)
+        issuer_match = re.search(r"\s(?:by|from)\s(.+)$", name)
+        if not issuer and issuer_match:
+            issuer = issuer_match.group(1)
+            name = name[:issuer_match.start()]
+        certifications.append({"name": name.strip(), "issuer": issuer.strip(), "date": date.group(0).strip("()") if date else ""})
+    return certifications
+
+
+def _parse_header(lines, side_lines=()):
+    """Header fields from the lines above the first section.
+
+    ``side_lines`` (.docx page header and footer text) are searched for
+    contact details only: a letterhead or a footer credit is not the
+    candidate's name or title.
+    """
+    text = "\n".join(list(lines) + list(side_lines))
+    header = {field: "" for field in HEADER_FIELDS}
+    confidence = {}
+
+    email = EMAIL_RE.search(text)
+    header["email"] = email.group(0) if email else ""
+    linkedin = LINKEDIN_RE.search(text)
+    header["linkedin"] = linkedin.group(0) if linkedin else ""
+    github = GITHUB_RE.search(text)
+    header["github"] = github.group(0) if github else ""
+    for match in PHONE_RE.finditer(text):
+        digits = re.sub(r"\D", "", match.group(1))
+        if 10 <= len(digits) <= 15:
+            header["phone"] = match.group(1).strip()
+            break
+
+    other = []
+    # Contact lines keep "City, Country" together
+    fragments = [part.strip() for line in lines for part in _CONTACT_SPLIT_RE.split(line) if part.strip()]
+    for fragment in fragments:
+        if EMAIL_RE.search(fragment) or URL_RE.search(fragment) or LINKEDIN_RE.search(fragment) \
+                or GITHUB_RE.search(fragment) or PHONE_RE.search(fragment):
+            continue
+        other.append(fragment)
+
+    if other and 1 <= len(other[0].split()) <= 4 and re.fullmatch(r"[A-Za-z .'-]+", other[0]):
+        header["Name"] = other[0]
+        other = other[1:]
+    for fragment in other:
+        if not header["location"] and LOCATION_RE.match(fragment):
+            header["location"] = fragment
+        elif not header["jobTitle"] and len(fragment.split()) <= 6 and not re.search(r"\d", fragment):
+            header["jobTitle"] = fragment
+
+    # A header with a name and an email is well structured: missing fields are absent, not missed
+    structured = bool(header["Name"] and header["email"])
+    for field in HEADER_FIELDS:
+        confidence[field] = 0.95 if header[field] or structured else 0.3
+    if not header["Name"]:
+        confidence["Name"] = 0.3
+    return header, confidence
+
+
+def parse_resume(layout):
+    """Deterministic first pass over a layout from ``get_resume_layout``.
+
+    Returns ``(resume, confidence, sources)``: the /extract JSON structure,
+    a 0-1 confidence per field, and the text each field was parsed from
+    (what an LLM would need to redo it).
+    """
+    # .docx page header/footer lines repeat on every page and are kept out of the sections
+    side = [i for i, part in enumerate(layout["part"]) if part]
+    side_lines = [layout["text"][i] for i in side]
+    body = layout
+    if side:
+        keep = [i for i, part in enumerate(layout["part"]) if not part]
+        body = {field: [layout[field][i] for i in keep] for field in LAYOUT_FIELDS}
+
+    sections = {}
+    header_lines = []
+    for heading, indexes in layout_sections(body):
+        lines = [body["text"][i] for i in indexes]
+        key = _HEADING_KEYS.get(_normalize_heading(heading)) if heading else None
+        if key:
+            sections.setdefault(key, []).extend(lines)
+        elif not sections:
+            # Name, title and contact details above the first known section
+            header_lines.extend(([heading] if heading else []) + lines)
+        elif heading:
+            # Unknown sub-heading (e.g. a job title set in bold): keep it in the current section
+            sections[list(sections)[-1]].extend([heading] + lines)
+        else:
+            sections[list(sections)[-1]].extend(lines)
+
+    resume, confidence = _parse_header(header_lines, side_lines)
+    sources = {field: header_lines + side_lines for field in HEADER_FIELDS}
+    # With several recognised headings, a section that is not there is genuinely empty
+    structured = len(sections) >= 2
+
+    summary = " ".join(sections.get("summary", []))
+    resume["summary"] = resume["objective"] = summary
+    confidence["summary"] = confidence["objective"] = 0.9 if summary or structured else 0.3
+
+    for key, parse in (("experience", lambda lines: _parse_roles(lines, "jobTitle")),
+                       ("internships", lambda lines: _parse_roles(lines, "role")),
+                       ("education", _parse_education),
+                       ("projects", _parse_projects)):
+        if key in sections:
+            resume[key], confidence[key] = parse(sections[key])
+        else:
+            resume[key], confidence[key] = [], (0.9 if structured else 0.3)
+
+    skill_lines = sections.get("skills", [])
+    skills = _split_items(skill_lines)
+    # Keep the database spelling of known skills
+    known = {skill.lower(): skill for skill in ALL_SKILLS}
+    resume["skills"] = [known.get(skill.lower(), skill) for skill in skills]
+    confidence["skills"] = 0.9 if len(skills) >= 3 or (structured and not skill_lines) else 0.4
+    if not skill_lines and not structured:
+        resume["skills"] = _match_terms(layout_text(layout), ALL_SKILLS)
+
+    for key, terms in (("languages", LANGUAGES), ("interests", INTERESTS)):
+        items = _split_items(sections.get(key, []))
+        resume[key] = items
+        confidence[key] = 0.9 if items or structured else 0.3
+        if not items and not structured:
+            resume[key] = _match_terms(layout_text(layout), terms)
+
+    resume["achievements"] = [
+        {"title": name, "description": detail}
+        for name, detail in (_split_detail(BULLET_RE.sub("", line).strip()) for line in sections.get("achievements", []))
+        if name
+    ]
+    confidence["achievements"] = 0.85 if resume["achievements"] or structured else 0.3
+    resume["certifications"] = _parse_certifications(sections.get("certifications", []))
+    confidence["certifications"] = 0.85 if resume["certifications"] or structured else 0.3
+
+    for key in FIELD_SCHEMAS:
+        if key not in HEADER_FIELDS:
+            source_key = "summary" if key == "objective" else key
+            sources[key] = sections.get(source_key, [])
+
+    ordered = {key: resume[key] for key in FIELD_SCHEMAS}
+    return ordered, confidence, sources
+
+
+def low_confidence_fields(confidence):
+    return [field for field in FIELD_SCHEMAS if confidence.get(field, 0) < CONFIDENT]
+
+
+def fill_text(fields, sources, fallback_text):
+    """Just the resume text ``fields`` came from, or ``fallback_text`` when no source is known."""
+    texts = []
+    for field in fields:
+        lines = sources.get(field)
+        if lines and "\n".join(lines) not in texts:
+            texts.append("\n".join(lines))
+    return "\n\n".join(texts) or fallback_text
+
+
+def fill_prompt(fields, text):
+    """Prompt asking the LLM for ``fields`` only, from ``text`` (see ``fill_text``)."""
+    structure = ",\n".join(f'    "{field}": {FIELD_SCHEMAS[field]}' for field in fields)
+    return f"""Extract only these fields from the resume text below and return them as JSON in this exact structure:
+
+{{
+{structure}
+}}
+
+Use empty strings or empty lists for anything that is not present.
+
+Resume Text:
+{text}"""
+
+
+def merge_fill(resume, fields, response_text):
+    """Overlay the LLM's values for ``fields`` onto the parsed resume."""
+    filled = json.loads(response_text)
+    for field in fields:
+        if field in filled:
+            resume[field] = filled[field]
+    return resume
@@ -0,0 +1,179 @@
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: coalesce within the process only
+    fcntl = None
+
+# Lock and result files left behind by finished flights are swept after this long
+_STALE_SECONDS = 600
+_SWEEP_EVERY = 200
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs one call per key at a time and hands its result to concurrent callers.
+
+    Threads of one process wait on the leader's in-memory flight. Across
+    processes (gunicorn workers) the leader holds an ``flock`` on
+    ``<lock_dir>/<key>.lock`` while it runs. A worker that has to wait
+    holds a shared lock on ``<key>.wait``; if the leader sees one when it
+    finishes, it leaves its JSON result in ``<key>.json`` and the waiter
+    reads that instead of calling again. Results can hold personal data,
+    so they are only written for a waiter, into a directory private to
+    this user. Callers give up waiting after ``wait_timeout`` seconds and
+    make the call themselves.
+    """
+
+    def __init__(self, lock_dir=None, wait_timeout=120, result_ttl=30):
+        self.lock_dir = lock_dir if fcntl is not None else None
+        self.wait_timeout = wait_timeout
+        self.result_ttl = result_ttl
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._writes = 0
+        if self.lock_dir and not self._private_dir(self.lock_dir):
+            self.lock_dir = None
+
+    @staticmethod
+    def _private_dir(path):
+        """Create ``path`` readable by this user only; False if someone else owns it."""
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        info = os.stat(path)
+        if info.st_uid != os.getuid():
+            print(f"[single-flight] {path} belongs to another user; coalescing within this process only")
+            return False
+        if info.st_mode & 0o077:
+            os.chmod(path, 0o700)
+        return True
+
+    def do(self, key, fn, wait_timeout=None):
+        """``(fn(), shared)``; ``shared`` is True when another caller's result was reused.
+
+        ``fn`` must return something JSON-serializable. A leader's exception
+        is raised in the threads that waited on it.
+        """
+        wait_timeout = max(wait_timeout or 0, self.wait_timeout)
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            if not flight.done.wait(wait_timeout):
+                return fn(), False
+            if flight.error is not None:
+                raise flight.error
+            return flight.value, True
+
+        try:
+            flight.value, shared = self._do_locked(key, fn, wait_timeout)
+            return flight.value, shared
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _do_locked(self, key, fn, wait_timeout):
+        if not self.lock_dir:
+            return fn(), False
+        base = os.path.join(self.lock_dir, key)
+        with open(f"{base}.lock", "a+") as lock_file:
+            waited_since = None
+            if not self._try_lock(lock_file):
+                waited_since = time.time()
+                with open(f"{base}.wait", "a+") as wait_file:
+                    # Tells the leader someone wants its result
+                    fcntl.flock(wait_file, fcntl.LOCK_SH)
+                    deadline = time.monotonic() + wait_timeout
+                    while not self._try_lock(lock_file):
+                        if time.monotonic() >= deadline:
+                            # Leader in another worker is stuck; don't hold this request hostage
+                            return fn(), False
+                        time.sleep(0.05)
+            try:
+                os.utime(lock_file.name)
+                if waited_since is not None:
+                    result = self._read_result(base, waited_since)
+                    if result is not None:
+                        return result["value"], True
+                value = fn()
+                if self._has_waiters(base):
+                    self._write_result(base, value)
+                return value, False
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _has_waiters(base):
+        try:
+            with open(f"{base}.wait", "a+") as wait_file:
+                if SingleFlight._try_lock(wait_file):
+                    fcntl.flock(wait_file, fcntl.LOCK_UN)
+                    return False
+                return True
+        except OSError:
+            return False
+
+    @staticmethod
+    def _try_lock(lock_file):
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    def _read_result(self, base, since):
+        """The result another worker wrote while this one was waiting, if any."""
+        try:
+            if os.path.getmtime(f"{base}.json") < since - 1:
+                return None
+            with open(f"{base}.json") as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return result if result.get("expires_at", 0) > time.time() else None
+
+    def _write_result(self, base, value):
+        tmp_path = f"{base}.json.{os.getpid()}.tmp"
+        try:
+            with os.fdopen(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+                json.dump({"value": value, "expires_at": time.time() + self.result_ttl}, f)
+            os.replace(tmp_path, f"{base}.json")
+        except (OSError, TypeError, ValueError) as e:
+            print(f"[single-flight] could not share result: {e}")
+            return
+        self._writes += 1
+        if self._writes % _SWEEP_EVERY == 0:
+            self._sweep()
+
+    def _sweep(self):
+        cutoff = time.time() - _STALE_SECONDS
+        for name in os.listdir(self.lock_dir):
+            path = os.path.join(self.lock_dir, name)
+            try:
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+                if not name.endswith((".lock", ".wait")):
+                    os.remove(path)
+                    continue
+                # Only remove lock files nobody holds, and hold them while removing
+                with open(path, "a+") as lock_file:
+                    if self._try_lock(lock_file):
+                        os.remove(path)
+            except OSError:
+                pass
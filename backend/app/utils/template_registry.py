@@ -0,0 +1,53 @@
+import hashlib
+import os
+import re
+from collections import namedtuple
+
+# One stylesheet per resume template id, e.g. pdf_styles/google.css
+STYLES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static", "pdf_styles")
+
+TemplateStyle = namedtuple("TemplateStyle", ["template_id", "css", "hash"])
+
+_registry = {}
+
+
+def minify_css(css):
+    """Strip comments and redundant whitespace from a stylesheet."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    # Whitespace around these tokens is never significant; a space *before*
+    # ':' is (descendant pseudo-class selectors), so only trim after it.
+    css = re.sub(r"\s*([{};,])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+def _make_style(template_id, css):
+    css = minify_css(css)
+    return TemplateStyle(template_id, css, hashlib.sha256(css.encode("utf-8")).hexdigest()[:16])
+
+
+# Used for unknown template ids so pages still get a stable shell
+EMPTY_STYLE = _make_style("", "")
+
+
+def load_template_styles(styles_dir=STYLES_DIR):
+    """Read and minify every template stylesheet. Called once at startup."""
+    styles = {}
+    for filename in sorted(os.listdir(styles_dir)):
+        template_id, ext = os.path.splitext(filename)
+        if ext != ".css":
+            continue
+        with open(os.path.join(styles_dir, filename), encoding="utf-8") as f:
+            styles[template_id] = _make_style(template_id, f.read())
+
+    _registry.clear()
+    _registry.update(styles)
+    print(f"✅ Loaded {len(styles)} PDF template stylesheets")
+    return styles
+
+
+def get_template_style(template_id):
+    if not _registry:
+        load_template_styles()
+    return _registry.get(template_id, EMPTY_STYLE)
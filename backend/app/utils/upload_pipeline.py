@@ -0,0 +1,159 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from contextlib import ExitStack, contextmanager
+
+import fitz
+from flask import Request, current_app
+from werkzeug.exceptions import RequestEntityTooLarge
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLargeError(RequestEntityTooLarge):
+    """Upload over the configured size or page limits; answered with a 413."""
+
+
+class HashingSpool:
+    """Upload buffer that hashes the body while the form parser writes it.
+
+    Small uploads stay in a BytesIO; past ``max_memory`` bytes they roll
+    over to a named temp file, which PyMuPDF and the .docx reader open by path.
+    Either way the request body is only read once.
+    """
+
+    def __init__(self, max_memory):
+        self._max_memory = max_memory
+        self._file = io.BytesIO()
+        self._hasher = hashlib.sha256()
+        self.path = None
+        self.size = 0
+
+    def write(self, data):
+        self._hasher.update(data)
+        self.size += len(data)
+        if self.path is None and self.size > self._max_memory:
+            self._rollover()
+        return self._file.write(data)
+
+    def _rollover(self):
+        disk = tempfile.NamedTemporaryFile(prefix="upload-", delete=False)
+        with self._file.getbuffer() as view:
+            disk.write(view)
+        self._file = disk
+        self.path = disk.name
+
+    @property
+    def sha256(self):
+        return self._hasher.hexdigest()
+
+    def close(self):
+        self._file.close()
+        if self.path:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    def __getattr__(self, name):
+        # read/seek/tell/readline/flush... go to whichever buffer is current
+        return getattr(self._file, name)
+
+
+class UploadRequest(Request):
+    """Request class that spools file uploads into a ``HashingSpool``."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return HashingSpool(current_app.config.get('UPLOAD_SPOOL_MEMORY', 1024 * 1024))
+
+
+def _spool(file_storage):
+    stream = file_storage.stream
+    if isinstance(stream, HashingSpool):
+        stream.flush()
+        return stream
+    return None
+
+
+def upload_sha256(file_storage):
+    """SHA-256 of an uploaded file, computed during spooling when possible."""
+    spool = _spool(file_storage)
+    if spool is not None:
+        return spool.sha256
+    # Not spooled by UploadRequest: hash it in one chunked pass
+    hasher = hashlib.sha256()
+    file_storage.seek(0)
+    for chunk in iter(lambda: file_storage.read(CHUNK_SIZE), b""):
+        hasher.update(chunk)
+    file_storage.seek(0)
+    return hasher.hexdigest()
+
+
+@contextmanager
+def open_pdf(file_storage):
+    """Open an uploaded PDF straight from its spool, without copying it."""
+    spool = _spool(file_storage)
+    with ExitStack() as stack:
+        if spool is not None and spool.path:
+            doc = fitz.open(spool.path)
+        elif spool is not None:
+            doc = fitz.open(stream=stack.enter_context(spool.getbuffer()), filetype="pdf")
+        else:
+            file_storage.seek(0)
+            doc = fitz.open(stream=file_storage.read(), filetype="pdf")
+        # Closed before the buffer view is released
+        stack.callback(doc.close)
+        yield doc
+
+
+@contextmanager
+def upload_path(file_storage, suffix=""):
+    """A filesystem path holding the upload, for consumers in other processes.
+
+    Rolled-over spools already have one; in-memory uploads are written to a
+    temp file once, removed on exit.
+    """
+    spool = _spool(file_storage)
+    if spool is not None and spool.path:
+        yield spool.path
+        return
+    tmp = tempfile.NamedTemporaryFile(prefix="upload-", suffix=suffix, delete=False)
+    try:
+        with tmp:
+            if spool is not None:
+                with spool.getbuffer() as view:
+                    tmp.write(view)
+            else:
+                file_storage.seek(0)
+                shutil.copyfileobj(file_storage.stream, tmp, CHUNK_SIZE)
+        yield tmp.name
+    finally:
+        os.unlink(tmp.name)
+
+
+def docx_source(file_storage):
+    """Path or rewound stream to open an uploaded .docx (a zip archive) from."""
+    spool = _spool(file_storage)
+    if spool is not None and spool.path:
+        return spool.path
+    file_storage.seek(0)
+    return file_storage.stream
+
+
+def save_upload(file_storage, dest):
+    """Persist an upload from its spool: a hard link or a single buffer write."""
+    spool = _spool(file_storage)
+    if spool is None:
+        file_storage.seek(0)
+        file_storage.save(dest)
+    elif spool.path:
+        try:
+            os.link(spool.path, dest)
+        except OSError:
+            # Different filesystem
+            shutil.copyfile(spool.path, dest)
+    else:
+        with open(dest, "wb") as f, spool.getbuffer() as view:
+            f.write(view)
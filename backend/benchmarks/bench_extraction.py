@@ -0,0 +1,402 @@
+"""Benchmark for resume text extraction (extract_text / extract_text_builder).
+
+Generates a deterministic corpus of synthetic resumes, PDF and .docx, from
+1 to 50 pages in four layouts (plain, two-column, tables, unicode), then
+times every extraction engine on every document. Reports pages/sec,
+MB/sec, peak RSS and output character counts per engine, format, layout
+and length. Runs fully offline; results are JSON so runs can be compared
+with ``--compare``.
+
+    cd backend
+    python -m benchmarks.bench_extraction --out extract.json
+    python -m benchmarks.bench_extraction --corpus /tmp/corpus --pages 1 10 50
+    python -m benchmarks.bench_extraction --engine mine=my_module:extract --compare extract.json
+
+A custom engine is any ``callable(path) -> str``; give it a ``formats``
+attribute (e.g. ``("pdf",)``) to restrict it to some formats.
+"""
+import argparse
+import atexit
+import importlib
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from dotenv import load_dotenv
+
+from benchmarks.bench_pdf_export import BACKEND_DIR, PeakRss, _git_commit
+
+FORMATS = ("pdf", "docx")
+LAYOUTS = ("plain", "columns", "tables", "unicode")
+PAGES = (1, 2, 5, 10, 25, 50)
+
+WORDS = (
+    "built designed migrated scaled reduced latency throughput service pipeline "
+    "python flask react mongodb kubernetes api cache queue metrics dashboard team "
+    "customers revenue tests deployment reliability analytics search onboarding"
+).split()
+UNICODE_WORDS = (
+    "résumé naïve café Zoë Ångström Łódź São Paulo München Ελληνικά Русский "
+    "中文 日本語 한국어 façade coöperate déjà-vu €120k ✓ — “quoted”"
+).split()
+SKILLS = ["Python", "Go", "SQL", "Docker", "Kubernetes", "React", "AWS", "Kafka", "Terraform", "Rust"]
+
+# Blocks (one job with bullets and a skills line) per page of body text
+BLOCKS_PER_PAGE = {"plain": 5, "columns": 9, "tables": 3, "unicode": 5}
+
+
+def _blocks(layout, pages, seed):
+    """Deterministic resume body: ``[(title, bullets, skills)]``."""
+    rng = random.Random(f"{layout}-{pages}-{seed}")
+    words = WORDS + UNICODE_WORDS if layout == "unicode" else WORDS
+
+    def sentence(n=16):
+        return " ".join(rng.choice(words) for _ in range(n)).capitalize() + "."
+
+    # A little more than needed; the PDF writer stops at the page count
+    count = BLOCKS_PER_PAGE[layout] * pages + 2
+    return [
+        (
+            f"Engineer {i + 1} — {rng.choice(words).title()} Corp, {2000 + i % 24}–{2001 + i % 24}",
+            [sentence() for _ in range(4)],
+            rng.sample(SKILLS, 6),
+        )
+        for i in range(count)
+    ]
+
+
+def _header(layout):
+    name = "Zoë Ångström-Łukasz" if layout == "unicode" else "Alex Morgan"
+    return name, "alex.morgan@example.com | +1 555 010 0199 | linkedin.com/in/alexmorgan"
+
+
+def _html(layout, blocks):
+    name, contact = _header(layout)
+    parts = [f"<h1>{name}</h1><p>{contact}</p><h2>Experience</h2>"]
+    for title, bullets, skills in blocks:
+        parts.append(f"<h3>{title}</h3><ul>{''.join(f'<li>{b}</li>' for b in bullets)}</ul>")
+        if layout == "tables":
+            cells = "".join(f"<td>{s}</td>" for s in skills[:3])
+            cells2 = "".join(f"<td>{s}</td>" for s in skills[3:])
+            parts.append(f"<table border='1'><tr>{cells}</tr><tr>{cells2}</tr></table>")
+        else:
+            parts.append(f"<p><b>Skills:</b> {', '.join(skills)}</p>")
+    return "".join(parts)
+
+
+def make_pdf(path, layout, pages, seed=0):
+    """Write a synthetic resume PDF of ``pages`` pages; returns the page count written."""
+    import fitz
+
+    story = fitz.Story(_html(layout, _blocks(layout, pages, seed)), user_css="body {font-size: 10pt;}")
+    page_rect = fitz.paper_rect("letter")
+    if layout == "columns":
+        half = (page_rect.width - 90) / 2
+        frames = [fitz.Rect(36, 36, 36 + half, page_rect.height - 36),
+                  fitz.Rect(54 + half, 36, page_rect.width - 36, page_rect.height - 36)]
+    else:
+        frames = [page_rect + (36, 36, -36, -36)]
+
+    writer = fitz.DocumentWriter(path)
+    written, more = 0, True
+    while more and written < pages:
+        device = writer.begin_page(page_rect)
+        for frame in frames:
+            more, _ = story.place(frame)
+            story.draw(device)
+            if not more:
+                break
+        writer.end_page()
+        written += 1
+    writer.close()
+    return written
+
+
+def make_docx(path, layout, pages, seed=0):
+    """Write a synthetic resume .docx; returns its nominal page count (.docx has no pagination)."""
+    import docx
+    from docx.oxml.ns import qn
+    from docx.oxml import OxmlElement
+
+    document = docx.Document()
+    name, contact = _header(layout)
+    section = document.sections[0]
+    section.header.paragraphs[0].text = contact
+    section.footer.paragraphs[0].text = f"{name} — page footer"
+    if layout == "columns":
+        cols = OxmlElement("w:cols")
+        cols.set(qn("w:num"), "2")
+        section._sectPr.append(cols)
+
+    document.add_heading(name, 0)
+    document.add_heading("Experience", 1)
+    for title, bullets, skills in _blocks(layout, pages, seed):
+        document.add_heading(title, 2)
+        for bullet in bullets:
+            document.add_paragraph(bullet, style="List Bullet")
+        if layout == "tables":
+            table = document.add_table(rows=2, cols=3)
+            for i, skill in enumerate(skills):
+                table.cell(i // 3, i % 3).text = skill
+        else:
+            paragraph = document.add_paragraph()
+            paragraph.add_run("Skills: ").bold = True
+            paragraph.add_run(", ".join(skills))
+    document.save(path)
+    return pages
+
+
+def build_corpus(directory, formats, layouts, pages_list):
+    """Generate any missing corpus files; returns ``[{file, format, layout, pages, bytes, target_pages}]``."""
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, "manifest.json")
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = {entry["file"]: entry for entry in json.load(f)}
+
+    entries = []
+    for fmt in formats:
+        for layout in layouts:
+            for pages in pages_list:
+                name = f"{layout}-{pages:02d}p.{fmt}"
+                path = os.path.join(directory, name)
+                entry = manifest.get(name)
+                if entry is None or not os.path.exists(path):
+                    make = make_pdf if fmt == "pdf" else make_docx
+                    entry = {"file": name, "format": fmt, "layout": layout, "pages": make(path, layout, pages)}
+                entry["bytes"] = os.path.getsize(path)
+                entry["target_pages"] = pages
+                entries.append(entry)
+
+    with open(manifest_path, "w") as f:
+        json.dump(sorted({**manifest, **{e["file"]: e for e in entries}}.values(), key=lambda e: e["file"]),
+                  f, indent=2)
+    return entries
+
+
+def _upload(path):
+    """The file as a request would hand it to the app: spooled through ``HashingSpool``."""
+    from flask import current_app
+    from werkzeug.datastructures import FileStorage
+    from app.utils.upload_pipeline import HashingSpool
+
+    spool = HashingSpool(current_app.config.get('UPLOAD_SPOOL_MEMORY', 1024 * 1024))
+    with open(path, "rb") as f:
+        shutil.copyfileobj(f, spool)
+    spool.seek(0)
+    return FileStorage(stream=spool, filename=os.path.basename(path))
+
+
+def _builtin_engines():
+    from app.utils.file_utils import extract_text, extract_text_builder
+
+    def current_extract_text(upload):
+        return extract_text(upload)
+
+    def current_extract_text_builder(upload):
+        return extract_text_builder(upload, upload.filename)
+
+    def pymupdf_serial(path):
+        import fitz
+        with fitz.open(path) as doc:
+            return " ".join(page.get_text() for page in doc)
+    pymupdf_serial.formats = ("pdf",)
+
+    def python_docx(path):
+        # The paragraphs-only reader extract_text used before the streaming one
+        import docx
+        return "\n".join(p.text for p in docx.Document(path).paragraphs)
+    python_docx.formats = ("docx",)
+
+    # App engines take a spooled upload, the rest a path
+    current_extract_text.takes_upload = True
+    current_extract_text_builder.takes_upload = True
+    return {
+        "extract_text": current_extract_text,
+        "extract_text_builder": current_extract_text_builder,
+        "pymupdf-serial": pymupdf_serial,
+        "python-docx": python_docx,
+    }
+
+
+def _load_engine(spec):
+    name, _, target = spec.partition("=")
+    module_name, _, attr = target.partition(":")
+    if not name or not module_name or not attr:
+        raise SystemExit(f"--engine expects name=module:function, got {spec!r}")
+    return name, getattr(importlib.import_module(module_name), attr)
+
+
+def time_engine(engine, path, repeat):
+    """Run ``engine`` on ``path`` ``repeat`` times; returns (seconds list, chars, peak RSS, error)."""
+    takes_upload = getattr(engine, "takes_upload", False)
+    times, chars = [], None
+    with PeakRss() as rss:
+        for _ in range(repeat):
+            source = _upload(path) if takes_upload else path
+            started = time.perf_counter()
+            try:
+                text = engine(source)
+            except Exception as e:
+                return times, chars, rss.peak, f"{type(e).__name__}: {e}"
+            times.append(time.perf_counter() - started)
+            chars = len(text)
+            if takes_upload:
+                source.close()
+    return times, chars, rss.peak, None
+
+
+def run_benchmark(args):
+    # Whole documents: no page budgets or page limits
+    os.environ["EXTRACT_MAX_PAGES"] = "0"
+    os.environ["PDF_MAX_PAGES"] = "0"
+    if args.workers:
+        os.environ["PDF_EXTRACT_WORKERS"] = str(args.workers)
+    sys.path.insert(0, BACKEND_DIR)
+    load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+    # Extraction never touches MongoDB or the LLM; these only let the app
+    # start on a machine without a .env
+    os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/resume_bench")
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+    corpus_dir = args.corpus
+    if corpus_dir is None:
+        corpus_dir = tempfile.mkdtemp(prefix="bench-extract-corpus-")
+        atexit.register(shutil.rmtree, corpus_dir, True)
+    started = time.perf_counter()
+    corpus = build_corpus(corpus_dir, args.formats, args.layouts, args.pages)
+    print(f"corpus: {len(corpus)} files in {corpus_dir} ({time.perf_counter() - started:.1f}s)")
+
+    from app import create_app
+
+    app = create_app()
+    results = []
+    with app.app_context():
+        engines = _builtin_engines()
+        engines.update(_load_engine(spec) for spec in args.engine or [])
+        if args.engines:
+            engines = {name: engines[name] for name in args.engines}
+
+        for name, engine in engines.items():
+            formats = getattr(engine, "formats", FORMATS)
+            docs = [entry for entry in corpus if entry["format"] in formats]
+            if docs:
+                # Pays for imports and the extraction pool start outside the timings
+                time_engine(engine, os.path.join(corpus_dir, docs[-1]["file"]), 1)
+            for entry in docs:
+                times, chars, peak, error = time_engine(engine, os.path.join(corpus_dir, entry["file"]), args.repeat)
+                median = statistics.median(times) if times and not error else None
+                row = {
+                    "engine": name,
+                    "format": entry["format"],
+                    "layout": entry["layout"],
+                    "pages": entry["pages"],
+                    "bytes": entry["bytes"],
+                    "median_ms": round(median * 1000, 2) if median else None,
+                    "best_ms": round(min(times) * 1000, 2) if median else None,
+                    "pages_per_sec": round(entry["pages"] / median, 1) if median else None,
+                    "mb_per_sec": round(entry["bytes"] / (1024 * 1024) / median, 2) if median else None,
+                    "chars": chars,
+                    "peak_rss_mb": round(peak / (1024 * 1024), 1),
+                    "error": error,
+                }
+                results.append(row)
+                print(
+                    f"{name:<22} {entry['format']:<4} {entry['layout']:<8} {entry['pages']:>3}p "
+                    f"{row['median_ms']}ms {row['pages_per_sec']} pages/s {row['mb_per_sec']} MB/s "
+                    f"chars={chars} rss={row['peak_rss_mb']}MB" + (f" error={error}" if error else "")
+                )
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "extract_workers": int(os.environ.get("PDF_EXTRACT_WORKERS") or os.cpu_count() or 1),
+            "repeat": args.repeat,
+            # .docx page counts are nominal: the generator's page-sized amount of text
+            "docx_pages": "nominal",
+        },
+        "totals": _totals(results),
+        "results": results,
+    }
+
+
+def _totals(results):
+    """Per engine and format: pages/sec and MB/sec over the whole corpus."""
+    totals = {}
+    for row in results:
+        if row["median_ms"] is None:
+            continue
+        key = f"{row['engine']}/{row['format']}"
+        total = totals.setdefault(key, {"pages": 0, "bytes": 0, "seconds": 0.0, "chars": 0})
+        total["pages"] += row["pages"]
+        total["bytes"] += row["bytes"]
+        total["seconds"] += row["median_ms"] / 1000
+        total["chars"] += row["chars"]
+    for total in totals.values():
+        seconds = total.pop("seconds")
+        total["pages_per_sec"] = round(total["pages"] / seconds, 1)
+        total["mb_per_sec"] = round(total.pop("bytes") / (1024 * 1024) / seconds, 2)
+    return totals
+
+
+def _row_key(row):
+    return row["engine"], row["format"], row["layout"], row["pages"]
+
+
+def compare(baseline, current):
+    """Print throughput and output-size changes against a previous run."""
+    before = {_row_key(row): row for row in baseline["results"]}
+    print(f"\nvs {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')})")
+    for row in current["results"]:
+        old = before.get(_row_key(row))
+        if not old or not old["pages_per_sec"] or not row["pages_per_sec"]:
+            continue
+        rate_change = (row["pages_per_sec"] - old["pages_per_sec"]) / old["pages_per_sec"] * 100
+        chars_change = row["chars"] - old["chars"]
+        flag = "  <-- regression" if rate_change < -10 else ""
+        print(
+            f"{row['engine']:<22} {row['format']:<4} {row['layout']:<8} {row['pages']:>3}p "
+            f"pages/s {rate_change:+.1f}%  chars {chars_change:+d}{flag}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark resume text extraction")
+    parser.add_argument("--corpus", help="corpus directory, generated if missing (default: temporary)")
+    parser.add_argument("--formats", nargs="*", default=list(FORMATS), choices=list(FORMATS))
+    parser.add_argument("--layouts", nargs="*", default=list(LAYOUTS), choices=list(LAYOUTS))
+    parser.add_argument("--pages", nargs="*", type=int, default=list(PAGES))
+    parser.add_argument("--engines", nargs="*", help="engine names to run (default: all)")
+    parser.add_argument("--engine", action="append", help="extra engine as name=module:function")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per document")
+    parser.add_argument("--workers", type=int, help="PDF_EXTRACT_WORKERS for the app engines")
+    parser.add_argument("--out", help="write results JSON here (default: stdout)")
+    parser.add_argument("--compare", help="previous results JSON to diff against")
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
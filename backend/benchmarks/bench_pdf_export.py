@@ -0,0 +1,341 @@
+"""Benchmark for the PDF export endpoint (POST /download_pdf).
+
+Runs fully offline against the app's own render path: every template id,
+three resume sizes, cold (cache miss) and warm (cache hit) requests, at
+several concurrency levels. Results are written as JSON so runs from
+different commits can be compared with ``--compare``.
+
+    cd backend
+    playwright install chromium   # once
+    python -m benchmarks.bench_pdf_export --out bench.json
+    python -m benchmarks.bench_pdf_export --compare bench.json --out bench-new.json
+"""
+import argparse
+import atexit
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SIZES = {
+    # jobs, bullets per job, projects, skills
+    "small": (1, 3, 1, 6),
+    "typical": (3, 5, 3, 15),
+    "large": (15, 12, 10, 60),
+}
+
+WORDS = (
+    "built designed migrated scaled reduced latency throughput service pipeline "
+    "python flask react mongodb kubernetes api cache queue metrics dashboard team "
+    "customers revenue tests deployment reliability analytics search onboarding"
+).split()
+
+
+def make_resume(size, seed=0):
+    """Deterministic synthetic resume content in the builder's form shape."""
+    jobs, bullets, projects, skills = SIZES[size]
+    rng = random.Random(f"{size}-{seed}")
+
+    def sentence(n=14):
+        return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+    return {
+        "Name": "Alex Morgan",
+        "email": "alex.morgan@example.com",
+        "phone": "+1 555 010 0199",
+        "location": "austin, tx",
+        "linkedin": "linkedin.com/in/alexmorgan",
+        "github": "github.com/alexmorgan",
+        "summary": sentence(40),
+        "objective": sentence(30),
+        "skills": [rng.choice(WORDS) for _ in range(skills)],
+        "languages": ["english", "spanish"],
+        "interests": ["cycling", "chess"],
+        "experience": [
+            {
+                "jobTitle": f"Engineer {i + 1}",
+                "company": f"Company {i + 1}",
+                "location": "remote",
+                "startDate": f"{2010 + i % 10}-01",
+                "endDate": f"{2011 + i % 10}-06",
+                "description": "\n".join(sentence() for _ in range(bullets)),
+            }
+            for i in range(jobs)
+        ],
+        "projects": [
+            {
+                "title": f"Project {i + 1}",
+                "tech": ", ".join(rng.choice(WORDS) for _ in range(4)),
+                "description": "\n".join(sentence() for _ in range(3)),
+            }
+            for i in range(projects)
+        ],
+        "education": [
+            {"degree": "B.S. Computer Science", "school": "state university", "location": "austin",
+             "startDate": "2006-08", "endDate": "2010-05", "cgpa": "3.7"},
+        ],
+        "certifications": [{"name": "Cloud Practitioner", "issuer": "AWS", "date": "2020-03"}],
+        "achievements": [{"title": "Hackathon winner", "description": sentence()}],
+        "toggle": "experienced",
+    }
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _tree_rss_bytes(root_pid):
+    """RSS of ``root_pid`` and all its descendants (the Chromium processes)."""
+    children = {}
+    rss = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            with open(f"/proc/{entry}/statm") as f:
+                rss[int(entry)] = int(f.read().split()[1]) * resource.getpagesize()
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total
+
+
+class PeakRss:
+    """Samples the RSS of this process tree in the background and keeps the peak."""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        if os.path.isdir("/proc"):
+            return _tree_rss_bytes(os.getpid())
+        # No /proc (macOS): own peak only, ru_maxrss is in bytes there
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._sample())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = self._sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_requests(client, payloads, concurrency):
+    """POST every payload to /download_pdf; returns (latencies_ms, errors, wall_s)."""
+    def one(payload):
+        started = time.perf_counter()
+        response = client.post("/download_pdf", json=payload)
+        elapsed = (time.perf_counter() - started) * 1000
+        ok = response.status_code == 200 and response.data[:5] == b"%PDF-"
+        return elapsed, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one, payloads))
+    wall = time.perf_counter() - started
+    latencies = [elapsed for elapsed, ok in results if ok]
+    return latencies, len(results) - len(latencies), wall
+
+
+def summarize(latencies, errors, wall, peak_rss):
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else None,
+        "p50_ms": _round(percentile(latencies, 50)),
+        "p95_ms": _round(percentile(latencies, 95)),
+        "p99_ms": _round(percentile(latencies, 99)),
+        "pdfs_per_sec": round(len(latencies) / wall, 2) if wall else None,
+        "peak_rss_mb": round(peak_rss / (1024 * 1024), 1),
+    }
+
+
+def _round(value):
+    return None if value is None else round(value, 2)
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(args):
+    cache_dir = tempfile.mkdtemp(prefix="bench-pdf-cache-")
+    atexit.register(shutil.rmtree, cache_dir, True)
+    # Fresh, isolated render cache and no network fetches for assets
+    os.environ["PDF_CACHE_DIR"] = cache_dir
+    os.environ["PDF_ASSET_FETCH"] = "false"
+    os.environ["PDF_POOL_SIZE"] = str(args.pool_size)
+    sys.path.insert(0, BACKEND_DIR)
+    load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+    # The export path never touches MongoDB or the LLM; these only let the
+    # app start on a machine without a .env
+    os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/resume_bench")
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+    from app import create_app
+    from app.utils.pdf_backends import get_pdf_backends
+    from app.utils.resume_html import render_resume_html
+
+    app = create_app()
+    client = app.test_client()
+
+    with app.app_context():
+        templates = args.templates or sorted(
+            os.path.splitext(name)[0]
+            for name in os.listdir(os.path.join(BACKEND_DIR, "app", "templates", "pdf"))
+        )
+        backends = {t: [b.name for b in get_pdf_backends().chain(t)] for t in templates}
+        html = {
+            (t, size): render_resume_html(make_resume(size), t)
+            for t in templates for size in args.sizes
+        }
+
+    # First request of the process: pays for the browser pool launch
+    started = time.perf_counter()
+    first = client.post("/download_pdf", json={"html": html[(templates[0], args.sizes[0])] + "<!-- startup -->",
+                                               "template": templates[0]})
+    startup_ms = round((time.perf_counter() - started) * 1000, 2)
+    if first.status_code != 200:
+        raise SystemExit(f"Warm-up render failed: {first.get_data(as_text=True)}")
+
+    results = []
+    run_id = 0
+    for template_id in templates:
+        for size in args.sizes:
+            body = html[(template_id, size)]
+            for concurrency in args.concurrency:
+                run_id += 1
+                # Cold: every request has unique HTML, so every one misses the cache
+                cold = [
+                    {"html": f"{body}<!-- bench {run_id}-{i} -->", "template": template_id}
+                    for i in range(args.requests)
+                ]
+                with PeakRss() as rss:
+                    cold_stats = run_requests(client, cold, concurrency)
+                # Warm: the same document repeatedly, served from the cache
+                warm = [cold[0]] * args.requests
+                with PeakRss() as warm_rss:
+                    warm_stats = run_requests(client, warm, concurrency)
+
+                for phase, stats, peak in (("cold", cold_stats, rss.peak), ("warm", warm_stats, warm_rss.peak)):
+                    row = {
+                        "template": template_id,
+                        "size": size,
+                        "html_bytes": len(body.encode("utf-8")),
+                        "backend": backends[template_id][0] if backends[template_id] else None,
+                        "phase": phase,
+                        "concurrency": concurrency,
+                    }
+                    row.update(summarize(*stats, peak))
+                    results.append(row)
+                    print(
+                        f"{template_id:<10} {size:<8} {phase:<5} c={concurrency:<3} "
+                        f"p50={row['p50_ms']}ms p95={row['p95_ms']}ms "
+                        f"{row['pdfs_per_sec']} pdf/s rss={row['peak_rss_mb']}MB errors={row['errors']}"
+                    )
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "pool_size": args.pool_size,
+            "requests_per_run": args.requests,
+            "backends": backends,
+        },
+        "startup_ms": startup_ms,
+        "results": results,
+    }
+
+
+def _row_key(row):
+    return row["template"], row["size"], row["phase"], row["concurrency"]
+
+
+def compare(baseline, current):
+    """Print p95 and throughput changes against a previous run."""
+    before = {_row_key(row): row for row in baseline["results"]}
+    print(f"\nvs {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')})")
+    for row in current["results"]:
+        old = before.get(_row_key(row))
+        if not old or not old["p95_ms"] or not row["p95_ms"]:
+            continue
+        p95_change = (row["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+        rate_change = (row["pdfs_per_sec"] - old["pdfs_per_sec"]) / old["pdfs_per_sec"] * 100
+        flag = "  <-- regression" if p95_change > 10 else ""
+        print(
+            f"{row['template']:<10} {row['size']:<8} {row['phase']:<5} c={row['concurrency']:<3} "
+            f"p95 {p95_change:+.1f}%  pdf/s {rate_change:+.1f}%{flag}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF export (POST /download_pdf)")
+    parser.add_argument("--templates", nargs="*", help="template ids (default: all)")
+    parser.add_argument("--sizes", nargs="*", default=list(SIZES), choices=list(SIZES))
+    parser.add_argument("--concurrency", nargs="*", type=int, default=[1, 4, 8])
+    parser.add_argument("--requests", type=int, default=20, help="requests per template/size/phase/concurrency")
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--out", help="write results JSON here (default: stdout)")
+    parser.add_argument("--compare", help="previous results JSON to diff against")
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
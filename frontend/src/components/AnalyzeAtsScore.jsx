@@ -23,7 +23,6 @@ const AnalyzeAtsScore = () => {
     setCurrentStep,
     analysis,
     setQuestions,
-    parsedResumeText,
     keywordGaps,
     setKeywordGaps,
     questions,
@@ -120,9 +119,11 @@ const AnalyzeAtsScore = () => {
           {
             method: "POST",
             headers: { "Content-Type": "application/json" },
+            // The server keeps the parsed text; send its ids, not the text
             body: JSON.stringify({
               jd_text: jdText,
-              resume_text: newParsedText,
+              file_id: analysisData.file_id,
+              resume_hash: analysisData.resume_hash,
             }),
           }
         );
@@ -149,7 +150,7 @@ const AnalyzeAtsScore = () => {
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({
           jd_text: jdText,
-          resume_text: parsedResumeText,
+          file_id: fileId,
         }),
       });
       const data = await res.json();